@@ -1,9 +1,25 @@
 import streamlit as st
 import pandas as pd
 import time
+import html
+import logging
+import threading
 from src.recommender import TravelRecommender
 from src.llm_explainer import TravelLLMExplainer
 from src.youtube_manager import YouTubeVlogManager
+from src.catalog_watcher import CatalogWatcher
+from src.result_cache import RecommendationCache
+from src.result_cursor import CursorStore
+from src.itinerary import ItineraryPlanner
+from src.api_scheduler import ApiScheduler
+from src.degradation import DegradationController
+from src.diversity import SHORTLIST_SIZE
+from src.user_store import UserStore
+from src.media_cache import MediaCache
+from src import profile_options as options
+
+# The src modules only create their loggers; output is configured here
+logging.basicConfig(level=logging.INFO)
 
 # Page Configuration
 st.set_page_config(
@@ -121,53 +137,174 @@ st.markdown("""
     .profile-icon {
         font-size: 18px;
     }
+
+    .hero-image, .vlog-thumb {
+        width: 100%;
+        border-radius: 10px;
+    }
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def load_user_store():
+    # Saved profiles and their precomputed user vectors
+    return UserStore()
+
+@st.cache_resource
+def load_recommender():
+    # One engine per process, shared by all sessions.
+    # The watcher hot-swaps in new catalog/encoder versions in the background,
+    # and stored user vectors are re-encoded whenever the encoder changes.
+    recommender = TravelRecommender()
+    users = load_user_store()
+    threading.Thread(target=users.recompute_vectors, args=(recommender.feature_engine,),
+                     name="user-vectors", daemon=True).start()
+    CatalogWatcher(recommender, on_change=users.on_catalog_change).start()
+    return recommender
+
+@st.cache_resource
+def load_recommendation_cache():
+    # Process-wide memo of recommend() results; fills itself in the background
+    cache = RecommendationCache(load_recommender(), controller=load_degradation_controller())
+    cache.prewarm_async()
+    return cache
+
+@st.cache_resource
+def load_cursor_store():
+    # Ranked result lists behind "Load more"; sessions hold only a token
+    return CursorStore()
+
+@st.cache_resource
+def load_api_scheduler():
+    # Process-wide queue in front of Gemini/YouTube; the token buckets behind
+    # it are shared with every other process through data/quota.db
+    return ApiScheduler()
+
+@st.cache_resource
+def load_degradation_controller():
+    # Process-wide view of load; flips every session into lite mode together
+    return DegradationController()
+
+@st.cache_resource
+def load_media_cache():
+    # Thumbnails and static images downloaded once, then served from this host
+    return MediaCache(controller=load_degradation_controller())
+
+@st.cache_resource
+def load_vlog_manager():
+    # Shared, so the last good vlogs per destination can be served under load
+    return YouTubeVlogManager(scheduler=load_api_scheduler(), controller=load_degradation_controller())
+
+# Results shown per page ("Load more" adds another page)
+PAGE_SIZE = 5
+
+HERO_IMAGE_URL = "https://images.unsplash.com/photo-1469854523086-cc02fe5d8800?q=80&w=2021&auto=format&fit=crop"
+
 # Initialize Session State
 if 'recommender' not in st.session_state:
     with st.spinner("Initializing VoyageSense Engine..."):
-        st.session_state.recommender = TravelRecommender()
+        st.session_state.recommender = load_recommender()
+if 'recommendation_cache' not in st.session_state:
+    st.session_state.recommendation_cache = load_recommendation_cache()
 if 'explainer' not in st.session_state:
-    st.session_state.explainer = TravelLLMExplainer()
+    st.session_state.explainer = TravelLLMExplainer(scheduler=load_api_scheduler(),
+                                                    controller=load_degradation_controller())
 if 'youtube' not in st.session_state:
-    st.session_state.youtube = YouTubeVlogManager()
+    st.session_state.youtube = load_vlog_manager()
 if 'recommendations' not in st.session_state:
     st.session_state.recommendations = None
+if 'cursor_token' not in st.session_state:
+    st.session_state.cursor_token = None
+    st.session_state.pages_shown = 0
+    st.session_state.has_more = False
 if 'user_profile' not in st.session_state:
     st.session_state.user_profile = {}
+    st.session_state.user_vector = None
+    st.session_state.returning_user = None
+if 'planner' not in st.session_state:
+    st.session_state.planner = ItineraryPlanner(st.session_state.recommender)
+if 'itinerary' not in st.session_state:
+    st.session_state.itinerary = None
+
+def load_more():
+    """
+    Appends the next page of results. The ranking is computed once per search
+    and kept server-side; each click only materialises and explains PAGE_SIZE rows.
+    """
+    store = load_cursor_store()
+    cursor = store.get(st.session_state.cursor_token) if st.session_state.cursor_token else None
+    if cursor is None:
+        # First "Load more", or the cursor expired: rank again (fewer candidates under load)
+        controller = load_degradation_controller()
+        with controller.track():
+            cursor = st.session_state.recommender.open_cursor(
+                st.session_state.user_profile, page_size=PAGE_SIZE,
+                limit=controller.candidate_limit(SHORTLIST_SIZE),
+                user_vector=st.session_state.user_vector
+            )
+        st.session_state.cursor_token = store.put(cursor)
+
+    shown = st.session_state.recommendations
+    page = cursor.page(st.session_state.pages_shown)
+    # Guards against repeats if the catalog changed since the first page
+    page = page[~page['id'].isin(shown['id'])] if not page.empty else page
+    st.session_state.recommendations = pd.concat([shown, page])
+    st.session_state.pages_shown += 1
+    st.session_state.has_more = st.session_state.pages_shown < cursor.n_pages
 
 # --- Sidebar: User Profile ---
 with st.sidebar:
     st.title("🪧 User Profile")
 
+    # Returning users get their last profile's results straight away (?user=<name> works too)
+    username = st.text_input(
+        "👤 Your Name (optional)",
+        value=st.query_params.get("user", ""),
+        placeholder="Saves your preferences for next time"
+    ).strip()
+    if username and st.session_state.returning_user != username:
+        st.session_state.returning_user = username
+        stored = load_user_store().load(username, st.session_state.recommender.feature_engine)
+        if stored is not None and st.session_state.recommendations is None:
+            st.session_state.user_profile = stored.profile
+            st.session_state.user_vector = stored.user_vector
+            st.session_state.recommendations = st.session_state.recommendation_cache.recommend(
+                stored.profile, top_n=PAGE_SIZE, user_vector=stored.user_vector
+            )
+            st.session_state.cursor_token = None
+            st.session_state.pages_shown = 1
+            st.session_state.has_more = len(st.session_state.recommendations) == PAGE_SIZE
+            st.caption(f"Welcome back, {username}! Showing picks from your last search.")
+
     st.markdown('<hr class="colorful-separator">', unsafe_allow_html=True)
 
+    search_query = st.text_input(
+        "🔎 Search Destinations",
+        placeholder="e.g. tea gardens near Munnar, Mughal tombs"
+    )
+
     st.markdown("### 🧍 Travel Preferences")
 
     activity_type = st.selectbox(
         "Preferred Activity Type",
-        ["Nature", "Heritage", "Adventure", "Religious", "Leisure"]
+        options.ACTIVITY_TYPES
     )
 
     purpose = st.selectbox(
         "Travel Interest / Purpose",
-        ["Relaxation", "Exploration", "Pilgrimage", "Family outing", "Photography"]
+        options.PURPOSES
     )
 
     st.markdown("### ⏱️ Time & Budget")
 
     time_raw = st.radio(
         "Available Travel Time",
-        ["1 Day", "2 Days", "3+ Days"]
+        options.TRAVEL_TIMES
     )
 
-    duration_map = {"1 Day": "Short", "2 Days": "Medium", "3+ Days": "Long"}
-    duration_bucket = duration_map[time_raw]
-
     budget_pref = st.select_slider(
         "Budget Preference",
-        options=["Low", "Medium", "High"],
+        options=options.BUDGETS,
         value="Medium"
     )
 
@@ -180,60 +317,94 @@ with st.sidebar:
 
     current_region = st.selectbox(
         "Current Location / Region",
-        ["North", "South", "East", "West", "Central"]
+        options.REGIONS
     )
 
     target_zone = st.selectbox(
         "Preferred Zone",
-        ["Northern", "Southern", "Eastern", "Western", "NorthEastern", "Central"],
+        options.ZONES,
         index=1
     )
 
+    max_distance = st.selectbox(
+        "Maximum Travel Distance",
+        options.DISTANCE_LIMITS
+    )
+
+    prefer_nearby = st.checkbox("Prefer places closer to me")
+
+    # As-you-type place lookup, served from the recommender's in-memory prefix index
+    around_text = st.text_input(
+        "Plan Around a Place",
+        placeholder="Start typing a destination, city or state"
+    )
+    around = None
+    suggestions = [
+        s for s in st.session_state.recommender.suggest(around_text)
+        if not (pd.isna(s.latitude) or pd.isna(s.longitude))
+    ] if around_text else []
+    if suggestions:
+        picked = st.selectbox(
+            "Suggestions",
+            suggestions,
+            format_func=lambda s: f"{s.label} · {s.detail}"
+        )
+        around = (picked.latitude, picked.longitude)
+    elif around_text:
+        st.caption("No matching places.")
+
     st.markdown("### 🧠 Context")
 
     job_type = st.radio(
         "Job Type (Time Flexibility)",
-        ["Fixed Schedule", "Flexible / Remote"]
+        options.JOB_TYPES
     )
 
-    job_backend = "Flexible" if "Flexible" in job_type else "Fixed Schedule"
-
     season = st.selectbox(
         "Preferred Travel Season",
-        ["Any", "Summer", "Winter", "Monsoon"]
+        options.SEASONS
     )
 
+    diversify = st.checkbox("Mix it up (avoid near-identical places)")
+
     st.markdown("---")
 
     if st.button("🚀 Find My Destinations", type="primary"):
 
-        profile = {
-            "type": activity_type,
-            "significance": purpose,
-            "budget_bucket": budget_pref,
-            "duration_bucket": duration_bucket,
-            "zone": target_zone,
-            "job_type": job_backend,
-            "season": season,
-            "current_region": current_region
-        }
-
-        if profile["type"] == "Heritage":
-            profile["type"] = "Historical"
-        if profile["type"] == "Leisure":
-            profile["type"] = "Relaxation"
+        profile = options.build_profile(
+            activity_type, purpose, time_raw, budget_pref,
+            target_zone, job_type, season, current_region,
+            max_distance, prefer_nearby, diversify,
+            max_budget_inr=expected_cost, query=search_query, around=around
+        )
 
         st.session_state.user_profile = profile
+        st.session_state.user_vector = None
+        st.session_state.itinerary = None
+        if username:
+            # Saved with its vector, ready for the next visit
+            stored = load_user_store().save(username, profile, st.session_state.recommender.feature_engine)
+            st.session_state.user_vector = stored.user_vector
 
         with st.spinner("Analyzing preferences & computing similarity scores..."):
-            st.session_state.recommendations = (
-                st.session_state.recommender.recommend(profile, top_n=5)
-            )
+            with load_degradation_controller().track():
+                st.session_state.recommendations = (
+                    st.session_state.recommendation_cache.recommend(
+                        profile, top_n=PAGE_SIZE, user_vector=st.session_state.user_vector
+                    )
+                )
+        # The full ranking is only kept once the user asks for more
+        st.session_state.cursor_token = None
+        st.session_state.pages_shown = 1
+        st.session_state.has_more = len(st.session_state.recommendations) == PAGE_SIZE
 
 # --- Main Content ---
 st.markdown('<p class="big-font">🚞 VoyageSense</p>', unsafe_allow_html=True)
 st.markdown('<p class="sub-font">An Intelligent Travel Recommendation System</p>', unsafe_allow_html=True)
 
+if load_degradation_controller().degraded:
+    st.caption("⚡ Lite mode: we're busy, so insights are summarised and vlogs may be from our archive.")
+
 if st.session_state.recommendations is not None:
     # --- Profile Summary Card ---
     p = st.session_state.user_profile
@@ -251,13 +422,18 @@ if st.session_state.recommendations is not None:
 
 if st.session_state.recommendations is None:
     st.info("👈 Please configure your profile in the sidebar and click **Find My Destinations** to start.")
-    st.image("https://images.unsplash.com/photo-1469854523086-cc02fe5d8800?q=80&w=2021&auto=format&fit=crop", caption="Where will you go next?")
+    st.markdown(
+        f'<img class="hero-image" src="{html.escape(load_media_cache().url_for(HERO_IMAGE_URL))}" '
+        f'alt="Where will you go next?">',
+        unsafe_allow_html=True
+    )
+    st.caption("Where will you go next?")
 
 else:
     recs = st.session_state.recommendations
     
     if recs.empty:
-        st.warning("No destinations found matching your strict criteria. Try loosening the 'Job Type' or 'Budget' filters.")
+        st.warning("No destinations found matching your strict criteria. Try loosening the 'Job Type', 'Budget' or 'Maximum Travel Distance' filters.")
     else:
         # Iterate over recommendations
         for index, row in recs.iterrows():
@@ -272,6 +448,7 @@ else:
                 col1, col2 = st.columns([3, 1])
                 
                 match_score = int(row['match_score'] * 100)
+                distance = f" &nbsp;|&nbsp; <b>Distance:</b> ~{int(row['distance_km'])} km" if 'distance_km' in row else ""
                 
                 with col1:
                     # Meta Data (App2 Style but with BOLD Location, Match, Rating)
@@ -280,6 +457,7 @@ else:
                         f"<b>Location:</b> {row['city']}, {row['state']} &nbsp;|&nbsp; "
                         f"<b>Match:</b> {match_score}% &nbsp;|&nbsp; "
                         f"<b>Rating:</b> {row['google_rating']} ⭐"
+                        f"{distance}"
                         f"</div>",
                         unsafe_allow_html=True
                     )
@@ -314,6 +492,13 @@ else:
                         st.write(f"- **Best Time:** {row.get('best_time_to_visit', 'All Year')}")
                         st.write(f"- **Time Needed:** {row.get('duration_bucket')}")
                         st.write(f"- **Est. Entry Fee:** ₹{row.get('entrance_fee', 0)}")
+
+                        # Precomputed neighbours: instant, no catalog scan per click
+                        similar = st.session_state.recommender.similar_destinations(row['id'], k=3)
+                        if not similar.empty:
+                            st.markdown("#### 🧭 Similar places")
+                            for _, place in similar.iterrows():
+                                st.write(f"- **{place['name']}** ({place['city']}, {place['state']})")
                         
                     with detail_col2:
                         st.markdown("### 🎥 Experience It")
@@ -322,11 +507,46 @@ else:
                             vlogs = st.session_state.youtube.search_vlogs(row['name'])
                             
                             if vlogs:
-                                # Embed the first video (Top Result)
                                 top_video = vlogs[0]
-                                st.video(f"https://www.youtube.com/watch?v={top_video['video_id']}")
-                                st.caption(f"Playing: {top_video['title']}")
+                                if st.session_state.get(f"play_{index}", False):
+                                    # Embed the first video (Top Result) only once asked for
+                                    st.video(f"https://www.youtube.com/watch?v={top_video['video_id']}")
+                                    st.caption(f"Playing: {top_video['title']}")
+                                else:
+                                    # Cached thumbnail first: no player, no remote fetch
+                                    thumbnail = load_media_cache().url_for(top_video['thumbnail'])
+                                    st.markdown(
+                                        f'<img class="vlog-thumb" src="{html.escape(thumbnail)}" '
+                                        f'alt="{html.escape(top_video["title"])}" loading="lazy">',
+                                        unsafe_allow_html=True
+                                    )
+                                    st.caption(top_video['title'])
+                                    st.button("▶️ Play video", key=f"play_btn_{index}",
+                                              on_click=st.session_state.__setitem__, args=(f"play_{index}", True))
                             else:
                                 st.warning("No relevant vlogs found.")
                     st.info("Tip: Check local guidelines and weather before booking.")
                 st.markdown('<hr class="colorful-separator">', unsafe_allow_html=True) # Colorful Separator
+
+        if st.session_state.has_more:
+            st.button("⬇️ Load more", on_click=load_more)
+
+        # --- Itinerary: pack nearby places into a trip that fits time & budget ---
+        if st.button("🗺️ Plan My Trip"):
+            with st.spinner("Packing destinations into your trip..."):
+                st.session_state.itinerary = st.session_state.planner.plan(st.session_state.user_profile)
+
+        itinerary = st.session_state.itinerary
+        if itinerary is not None:
+            if itinerary.empty:
+                st.warning("Couldn't fit any destinations into your trip. Try a larger budget or a longer trip.")
+            else:
+                st.markdown("### 🗺️ Your Itinerary")
+                for day, stops in itinerary.groupby('day', sort=True):
+                    travel = stops['travel_km'].iloc[0]
+                    hop = f" (~{int(travel)} km from previous stop)" if travel >= 1 else ""
+                    st.markdown(f"#### Day {day}: {stops['city'].iloc[0]}{hop}")
+                    for _, stop in stops.iterrows():
+                        st.write(f"{stop['stop']}. **{stop['name']}** · {stop['time_needed_hrs']} hrs · ₹{stop['entrance_fee']}")
+                st.caption(f"Total: {itinerary['time_needed_hrs'].sum():.1f} hrs of visits, "
+                           f"₹{itinerary['entrance_fee'].sum():.0f} in entry fees.")
@@ -0,0 +1,295 @@
+import os
+import time
+import heapq
+import sqlite3
+import itertools
+import threading
+import logging
+from collections import namedtuple
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from src.degradation import UPSTREAM_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Get project root (parent of src)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Kept out of travel.db so quota bookkeeping doesn't wake the CatalogWatcher
+QUOTA_DB_PATH = os.path.join(PROJECT_ROOT, "data", "quota.db")
+
+# Lower runs first
+PRIORITY_INTERACTIVE = 0   # A user is waiting on it ("View Details")
+PRIORITY_BACKGROUND = 1    # Prefetch / pre-warm; may be delayed or dropped
+
+# capacity: burst size in units; refill_per_sec: sustained rate; cost: units per call;
+# background_reserve: share of capacity only interactive calls may use
+Quota = namedtuple('Quota', ['capacity', 'refill_per_sec', 'cost', 'background_reserve'])
+
+QUOTAS = {
+    # Gemini free tier: 15 requests per minute
+    'gemini': Quota(capacity=5, refill_per_sec=15 / 60, cost=1, background_reserve=0.4),
+    # YouTube Data API: 10,000 units per day, a search costs 100
+    'youtube': Quota(capacity=10_000, refill_per_sec=10_000 / 86_400, cost=100, background_reserve=0.3),
+}
+
+# How long an interactive call may wait for quota before we degrade instead
+INTERACTIVE_TIMEOUT = 10.0
+BACKGROUND_TIMEOUT = 120.0
+# How long call() waits on a call that has started (one upstream request)
+RUN_TIMEOUT = sum(UPSTREAM_TIMEOUT)
+
+
+class QuotaExceeded(Exception):
+    """
+    Raised when a call can't get quota before its deadline. `retry_after`
+    is the earliest time (seconds from now) the bucket could serve it.
+    """
+
+    def __init__(self, bucket, retry_after):
+        super().__init__(f"{bucket} quota exhausted, retry in {retry_after:.1f}s")
+        self.bucket = bucket
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Token bucket shared by every process on the machine through one SQLite row.
+
+    Each acquire refills the bucket for the time elapsed since the last one
+    and takes `cost` units, inside a BEGIN IMMEDIATE transaction, so
+    concurrent Streamlit sessions and worker processes never overspend.
+    Background calls may not dip into the last `background_reserve` of the
+    capacity, which keeps headroom for users who are waiting.
+    """
+
+    def __init__(self, name, quota, db_path=QUOTA_DB_PATH):
+        self.name = name
+        self.quota = quota
+        self.db_path = db_path
+        conn = self._connect()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS token_buckets (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL   -- Unix seconds of the last refill
+                )
+            ''')
+            conn.execute("INSERT OR IGNORE INTO token_buckets VALUES (?, ?, ?)",
+                         (name, float(quota.capacity), time.time()))
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, isolation_level=None, timeout=30.0)
+        conn.execute("PRAGMA journal_mode = WAL")
+        return conn
+
+    def _floor(self, priority):
+        # Tokens that must remain after a call of this priority
+        if priority >= PRIORITY_BACKGROUND:
+            return self.quota.capacity * self.quota.background_reserve
+        return 0.0
+
+    def _wait_for(self, tokens, priority):
+        missing = self.quota.cost + self._floor(priority) - tokens
+        return max(missing, 0.0) / self.quota.refill_per_sec
+
+    def try_acquire(self, priority=PRIORITY_INTERACTIVE):
+        """
+        Takes one call's worth of tokens if available.
+
+        Returns: (granted, seconds until it could be granted)
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            tokens, updated_at = conn.execute(
+                "SELECT tokens, updated_at FROM token_buckets WHERE name = ?", (self.name,)
+            ).fetchone()
+            now = time.time()
+            tokens = min(self.quota.capacity, tokens + max(now - updated_at, 0.0) * self.quota.refill_per_sec)
+            wait = self._wait_for(tokens, priority)
+            if wait == 0.0:
+                tokens -= self.quota.cost
+            conn.execute("UPDATE token_buckets SET tokens = ?, updated_at = ? WHERE name = ?",
+                         (tokens, now, self.name))
+            conn.execute("COMMIT")
+            return wait == 0.0, wait
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def wait_estimate(self, priority=PRIORITY_INTERACTIVE, calls_ahead=0):
+        """
+        Seconds until a call could be admitted behind `calls_ahead` others, without taking anything.
+        """
+        conn = self._connect()
+        try:
+            tokens, updated_at = conn.execute(
+                "SELECT tokens, updated_at FROM token_buckets WHERE name = ?", (self.name,)
+            ).fetchone()
+        finally:
+            conn.close()
+        tokens = min(self.quota.capacity, tokens + max(time.time() - updated_at, 0.0) * self.quota.refill_per_sec)
+        return self._wait_for(tokens - calls_ahead * self.quota.cost, priority)
+
+
+_Job = namedtuple('_Job', ['priority', 'seq', 'bucket', 'fn', 'deadline', 'future'])
+
+
+class ApiScheduler:
+    """
+    Priority queue in front of the external APIs.
+
+    Calls are queued per process and run by a small pool of threads, always
+    highest priority first (then FIFO), each after taking its bucket's quota.
+    A call that can't be served before its deadline is rejected with
+    QuotaExceeded: at submit time if the bucket's refill rate already rules
+    it out, otherwise as soon as that becomes clear. Callers then degrade
+    (fallback text, cached data) instead of hanging on a timeout.
+    """
+
+    def __init__(self, quotas=QUOTAS, db_path=QUOTA_DB_PATH, n_workers=4):
+        self.buckets = {name: TokenBucket(name, quota, db_path) for name, quota in quotas.items()}
+        self.rejected = 0
+
+        # One heap per bucket, so a bucket waiting to refill doesn't hold up the others
+        self._queues = {name: [] for name in quotas}
+        self._ready_at = {name: 0.0 for name in quotas}  # Monotonic time the bucket is next worth trying
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._threads = [
+            threading.Thread(target=self._run, name=f"api-scheduler-{i}", daemon=True)
+            for i in range(n_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, bucket, fn, priority=PRIORITY_INTERACTIVE, timeout=None):
+        """
+        Queues fn() to run once `bucket` has quota.
+
+        Returns: Future with fn's result, or QuotaExceeded if it can't start within `timeout`.
+        """
+        timeout = self._timeout(priority, timeout)
+        future = Future()
+
+        with self._cond:
+            # Calls that would run before this one, and the wait they imply
+            ahead = sum(1 for job in self._queues[bucket] if job.priority <= priority)
+        wait = self.buckets[bucket].wait_estimate(priority, calls_ahead=ahead)
+        if wait > timeout:
+            self._reject(future, bucket, wait)
+            return future
+
+        with self._cond:
+            queue = self._queues[bucket]
+            job = _Job(priority, next(self._seq), bucket, fn, time.monotonic() + timeout, future)
+            heapq.heappush(queue, job)
+            if queue[0] is job:
+                # A more urgent call may fit where the parked one didn't (background reserve)
+                self._ready_at[bucket] = 0.0
+            self._cond.notify()
+        return future
+
+    def call(self, bucket, fn, priority=PRIORITY_INTERACTIVE, timeout=None):
+        """
+        submit() and wait for the result. Raises QuotaExceeded when rejected,
+        or if the call hasn't started by its deadline (however the workers fare).
+        """
+        timeout = self._timeout(priority, timeout)
+        future = self.submit(bucket, fn, priority, timeout)
+        try:
+            return future.result(timeout=timeout + RUN_TIMEOUT)
+        except FutureTimeout:
+            if future.cancel():
+                raise QuotaExceeded(bucket, timeout) from None
+            raise
+
+    @staticmethod
+    def _timeout(priority, timeout):
+        if timeout is None:
+            return INTERACTIVE_TIMEOUT if priority == PRIORITY_INTERACTIVE else BACKGROUND_TIMEOUT
+        return timeout
+
+    def pending(self):
+        with self._cond:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def _reject(self, future, bucket, retry_after):
+        # A caller that gave up may have cancelled it already
+        if future.set_running_or_notify_cancel():
+            self.rejected += 1
+            future.set_exception(QuotaExceeded(bucket, retry_after))
+
+    def _next_job(self):
+        """
+        Pops the most urgent job among buckets that may have quota.
+        Called with the condition held; blocks until there is one (None once stopped).
+        """
+        while not self._stopped:
+            now = time.monotonic()
+            ready = [q for name, q in self._queues.items() if q and self._ready_at[name] <= now]
+            if ready:
+                return heapq.heappop(min(ready, key=lambda q: q[0]))
+            waits = [self._ready_at[name] - now for name, q in self._queues.items() if q]
+            self._cond.wait(timeout=min(waits) if waits else None)
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+            if job is None:
+                return
+            if job.future.cancelled():
+                continue
+
+            try:
+                granted, wait = self.buckets[job.bucket].try_acquire(job.priority)
+            except Exception as e:
+                # e.g. quota.db locked past busy_timeout: fail this call, keep the worker
+                logger.warning(f"Could not take {job.bucket} quota: {e}")
+                if job.future.set_running_or_notify_cancel():
+                    job.future.set_exception(e)
+                continue
+            if not granted:
+                # Park the bucket until it refills. Anything queued on it that
+                # can't start by its deadline, given the calls ahead of it,
+                # is rejected now rather than left to time out.
+                ready_at = time.monotonic() + wait
+                interval = self.buckets[job.bucket].quota.cost / self.buckets[job.bucket].quota.refill_per_sec
+                with self._cond:
+                    queue = self._queues[job.bucket]
+                    queue.append(job)
+                    queue.sort()
+                    expired = [j for i, j in enumerate(queue) if j.deadline < ready_at + i * interval]
+                    queue[:] = [j for i, j in enumerate(queue) if j.deadline >= ready_at + i * interval]
+                    self._ready_at[job.bucket] = ready_at
+                for j in expired:
+                    self._reject(j.future, j.bucket, wait)
+                continue
+
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            try:
+                job.future.set_result(job.fn())
+            except Exception as e:
+                job.future.set_exception(e)
+
+    def close(self):
+        with self._cond:
+            self._stopped = True
+            pending = [job for queue in self._queues.values() for job in queue]
+            for queue in self._queues.values():
+                queue.clear()
+            self._cond.notify_all()
+        for job in pending:
+            job.future.cancel()
+        for thread in self._threads:
+            thread.join()
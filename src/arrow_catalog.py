@@ -0,0 +1,224 @@
+import os
+import json
+import time
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # Optional: only needed to write or serve the Arrow catalog
+    pa = None
+
+from src.feature_engine import TravelFeatureEngine, ARTIFACTS_DIR, ENCODER_PATH
+from src.destination_store import DestinationStore, TEXT_COLUMNS
+from src.vector_store import DestinationVectorStore
+from src.recommender import DB_PATH, read_catalog
+
+CATALOG_PATH = os.path.join(ARTIFACTS_DIR, "catalog.arrow")
+
+# Columns besides the DestinationStore's own
+VECTOR_COLUMN = '__vector'
+ROW_HASH_COLUMN = '__row_hash'
+
+
+def available():
+    return pa is not None
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("The Arrow catalog needs pyarrow (pip install pyarrow).")
+
+
+def write_catalog(db_path=DB_PATH, path=CATALOG_PATH, encoder_path=ENCODER_PATH):
+    """
+    Encodes the catalog in `db_path` and writes it as a single uncompressed
+    Arrow IPC file: the store's columns (categoricals dictionary-encoded),
+    the text columns, the destination vectors, per-row hashes and, in the
+    schema metadata, the pickled encoder itself. A serving node needs nothing
+    else to answer recommend().
+    """
+    _require_pyarrow()
+    df = read_catalog(db_path)
+    engine = TravelFeatureEngine()
+    engine.load_encoders(encoder_path)
+    snapshot = DestinationVectorStore(engine).load(df, feature_engine=engine)
+    store = snapshot.destinations
+
+    conn = sqlite3.connect(db_path)
+    text = pd.read_sql_query(f"SELECT id, {', '.join(TEXT_COLUMNS)} FROM destinations", conn).set_index('id')
+    conn.close()
+    text = text.reindex(store.ids)
+
+    fields = {'id': pa.array(store.ids)}
+    for col in store.column_names:
+        values = store[col]
+        if isinstance(values, pd.Categorical):
+            codes = values.codes
+            fields[col] = pa.DictionaryArray.from_arrays(pa.array(codes, mask=codes < 0),
+                                                         pa.array(values.categories.tolist()))
+        else:
+            fields[col] = pa.array(values)
+    for col in TEXT_COLUMNS:
+        fields[col] = pa.array(text[col].tolist(), type=pa.string())
+    vectors = snapshot.vectors if snapshot.vectors is not None else np.empty((0, 0))
+    fields[VECTOR_COLUMN] = pa.FixedSizeListArray.from_arrays(pa.array(vectors.ravel()), max(vectors.shape[1], 1))
+    fields[ROW_HASH_COLUMN] = pa.array(snapshot.row_hashes)
+
+    with open(encoder_path, "rb") as f:
+        encoder = f.read()
+    metadata = {'column_order': json.dumps(store.column_order), 'encoder': encoder}
+    table = pa.table(fields).replace_schema_metadata(metadata)
+
+    # One record batch, so every column is a single contiguous buffer in the file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=max(len(table), 1))
+    os.replace(tmp_path, path)
+    return path
+
+
+class ArrowCatalog:
+    """
+    A catalog served straight from a memory-mapped Arrow IPC file.
+
+    Numeric columns, dictionary codes, vectors and row hashes are numpy views
+    of the mapped file: nothing is parsed or copied at load, and pages are read
+    from the OS page cache on first touch (shared by every process serving the
+    same file). Only the small category vocabularies are materialised, plus
+    the codes of categorical columns that contain nulls.
+    """
+
+    def __init__(self, table, source=None):
+        self.table = table
+        self.source = source  # The mapping the table's buffers point into
+        metadata = table.schema.metadata
+        self.column_order = json.loads(metadata[b'column_order'])
+        self.feature_engine = TravelFeatureEngine()
+        self.feature_engine.load_payload(metadata[b'encoder'])
+
+        skip = {'id', VECTOR_COLUMN, ROW_HASH_COLUMN, *TEXT_COLUMNS}
+        columns = {}
+        for name in table.column_names:
+            if name in skip:
+                continue
+            chunk = self._chunk(name)
+            if pa.types.is_dictionary(chunk.type):
+                indices = chunk.indices.fill_null(-1) if chunk.null_count else chunk.indices
+                columns[name] = pd.Categorical.from_codes(
+                    indices.to_numpy(zero_copy_only=True), dtype=pd.CategoricalDtype(chunk.dictionary.to_pylist()),
+                    validate=False)
+            else:
+                columns[name] = chunk.to_numpy(zero_copy_only=True)
+
+        ids = self._chunk('id').to_numpy(zero_copy_only=True)
+        self.destinations = DestinationStore(ids, columns, self.column_order, text_loader=self.load_text)
+
+        vectors = self._chunk(VECTOR_COLUMN)
+        self.vectors = vectors.flatten().to_numpy(zero_copy_only=True).reshape(len(vectors), -1) if len(vectors) else None
+        self.row_hashes = self._chunk(ROW_HASH_COLUMN).to_numpy(zero_copy_only=True)
+
+    def _chunk(self, name):
+        column = self.table.column(name)
+        return column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+
+    @classmethod
+    def open(cls, path=CATALOG_PATH):
+        _require_pyarrow()
+        source = pa.memory_map(path, 'r')
+        return cls(pa.ipc.open_file(source).read_all(), source)
+
+    def load_text(self, ids, columns):
+        """
+        Text columns for the given destination ids, as the SQLite text loader
+        returns them. Returns: DataFrame indexed by id
+        """
+        ids = np.asarray(ids)
+        positions = self.destinations.position_of(ids)
+        # Ids not in this catalog are left out, as a SQL `IN` would; -1 isn't a valid take index
+        found = positions >= 0
+        positions = pa.array(positions[found])
+        data = {'id': ids[found].tolist()}
+        for col in columns:
+            data[col] = self._chunk(col).take(positions).to_pylist()
+        return pd.DataFrame(data).set_index('id')
+
+    def texts(self, columns):
+        """
+        Whole columns (text or categorical) for every row, plus 'id'.
+        """
+        data = {'id': self.destinations.ids}
+        for col in columns:
+            if col in TEXT_COLUMNS:
+                data[col] = self._chunk(col).to_pylist()
+            else:
+                data[col] = np.asarray(self.destinations[col], dtype=object)
+        return pd.DataFrame(data)
+
+
+def _rss_kb():
+    # (resident, anonymous) memory of this process; mapped file pages count
+    # towards the first but are shared, the second is what each process pays
+    with open("/proc/self/status") as f:
+        status = dict(line.split(":", 1) for line in f)
+    return int(status['VmRSS'].split()[0]), int(status['RssAnon'].split()[0])
+
+
+def _measure_load(args):
+    kind, db_path, catalog_path = args
+    import gc
+    gc.collect()
+    before = _rss_kb()
+    start = time.perf_counter()
+    if kind == 'sqlite':
+        store = DestinationVectorStore(TravelFeatureEngine())
+        snapshot = store.load(read_catalog(db_path))
+    else:
+        catalog = ArrowCatalog.open(catalog_path)
+        store = DestinationVectorStore(catalog.feature_engine, text_loader=catalog.load_text)
+        snapshot = store.adopt(catalog.destinations, catalog.vectors, catalog.row_hashes, catalog.feature_engine)
+    seconds = time.perf_counter() - start
+    # Touch what every request touches: the whole vector matrix
+    float(snapshot.vectors.sum())
+    after = _rss_kb()
+    return seconds, (after[0] - before[0]) / 1024, (after[1] - before[1]) / 1024
+
+
+if __name__ == "__main__":
+    # Benchmark: catalog load time and memory, SQLite + encode vs memory-mapped Arrow,
+    # on synthetic catalogs built by repeating the real rows
+    import tempfile
+    import multiprocessing as mp
+
+    _require_pyarrow()
+    conn = sqlite3.connect(DB_PATH)
+    base = pd.read_sql_query("SELECT * FROM destinations", conn)
+    schema = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'destinations'").fetchone()[0]
+    conn.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in [100_000, 1_000_000]:
+            db_path = os.path.join(tmp, f"travel_{n}.db")
+            catalog_path = os.path.join(tmp, f"catalog_{n}.arrow")
+            rows = base.iloc[np.arange(n) % len(base)].reset_index(drop=True)
+            rows['id'] = np.arange(1, n + 1)
+            rows['name'] = rows['name'] + " " + rows['id'].astype(str)
+            conn = sqlite3.connect(db_path)
+            conn.execute(schema)
+            rows.to_sql('destinations', conn, if_exists='append', index=False)
+            conn.close()
+
+            start = time.perf_counter()
+            write_catalog(db_path, catalog_path)
+            print(f"{n:>9,} rows: wrote {os.path.getsize(catalog_path) / 2**20:.0f} MB Arrow catalog "
+                  f"in {time.perf_counter() - start:.1f}s")
+
+            ctx = mp.get_context('spawn')
+            for kind in ['sqlite', 'arrow']:
+                with ctx.Pool(1) as pool:  # Fresh process per measurement
+                    seconds, rss_mb, anon_mb = pool.apply(_measure_load, ((kind, db_path, catalog_path),))
+                print(f"   {kind:7s} load {seconds:6.2f}s   RSS +{rss_mb:6.0f} MB   private (anon) +{anon_mb:6.0f} MB")
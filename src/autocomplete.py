@@ -0,0 +1,178 @@
+import re
+import time
+import unicodedata
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Suggestions returned per keystroke
+MAX_SUGGESTIONS = 8
+# Prefixes up to this length match so many keys that their answers are precomputed
+SHORT_PREFIX = 2
+
+# One thing the user can pick: a destination, a city or a state
+Suggestion = namedtuple('Suggestion', ['label', 'kind', 'detail', 'destination_id', 'latitude', 'longitude'])
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text):
+    """
+    Lower-case, accents and punctuation stripped ("Humayun's Tomb" -> "humayun s tomb").
+    """
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode()
+    return _NON_WORD.sub(' ', text.lower()).strip()
+
+
+def normalize_all(texts):
+    """
+    normalize() over a whole column at once.
+    """
+    return (pd.Series(texts, dtype=object).astype(str).str.normalize('NFKD')
+            .str.encode('ascii', 'ignore').str.decode('ascii').str.lower()
+            .str.replace(_NON_WORD, ' ', regex=True).str.strip().tolist())
+
+
+def popularity(ratings, review_lakhs):
+    """
+    Rating weighted by (log) review volume, so a 4.8 with 50 reviews doesn't
+    outrank a 4.6 with a lakh of them.
+    """
+    ratings = np.nan_to_num(np.asarray(ratings, dtype=np.float64), nan=0.0)
+    reviews = np.nan_to_num(np.asarray(review_lakhs, dtype=np.float64), nan=0.0) * 1e5
+    return ratings * np.log1p(reviews)
+
+
+class PrefixIndex:
+    """
+    As-you-type lookup over destination, city and state names.
+
+    Every word start of every name is a key ("tomb" finds "Humayun's Tomb"),
+    held in one sorted array, so a prefix is a contiguous range found with two
+    binary searches. Keys are pre-ranked (whole-name matches first, then by
+    popularity), so the best suggestions in a range are its smallest ranks.
+    Answers for one- and two-letter prefixes, whose ranges are huge, are
+    precomputed.
+    """
+
+    def __init__(self, entries, weights, max_suggestions=MAX_SUGGESTIONS):
+        """
+        Args:
+            entries (list of Suggestion): Everything that can be suggested.
+            weights (array): Popularity of each entry (higher first).
+        """
+        self.entries = entries
+        self.max_suggestions = max_suggestions
+
+        keys, owners, whole = [], [], []
+        for i, name in enumerate(normalize_all([e.label for e in entries])):
+            keys.append(name)
+            owners.append(i)
+            whole.append(True)
+            space = name.find(' ')
+            while space >= 0:
+                keys.append(name[space + 1:])
+                owners.append(i)
+                whole.append(False)
+                space = name.find(' ', space + 1)
+
+        keys = np.array(keys, dtype=str)
+        owners = np.array(owners, dtype=np.int64)
+        # Rank: matches at the start of a name first, then popularity, then entry order
+        weights = np.asarray(weights, dtype=np.float64)
+        priority = np.lexsort((owners, -weights[owners], ~np.array(whole, dtype=bool)))
+        ranks = np.empty(len(keys), dtype=np.int64)
+        ranks[priority] = np.arange(len(keys))
+
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.owners = owners[order]
+        self.ranks = ranks[order]
+
+        self._short = {}
+        for n in range(1, SHORT_PREFIX + 1):
+            for prefix in np.unique(self.keys.astype(f'<U{n}')).tolist():
+                self._short[prefix] = self._lookup(prefix)
+
+    def _lookup(self, prefix):
+        lo = np.searchsorted(self.keys, prefix, side='left')
+        hi = np.searchsorted(self.keys, prefix + '\uffff', side='left')
+        if hi <= lo:
+            return []
+        ranks = self.ranks[lo:hi]
+        # An entry can own several keys in the range; over-fetch, then de-duplicate
+        k = min(len(ranks), self.max_suggestions * 4)
+        best = np.argpartition(ranks, k - 1)[:k] if len(ranks) > k else np.arange(len(ranks))
+        best = best[np.argsort(ranks[best], kind='stable')]
+        return list(dict.fromkeys(self.owners[lo + best].tolist()))[:self.max_suggestions]
+
+    def suggest(self, text, k=None):
+        """
+        Returns: Up to k Suggestions whose name has a word starting with `text`.
+        """
+        prefix = normalize(text)
+        if not prefix:
+            return []
+        found = self._short.get(prefix) if len(prefix) <= SHORT_PREFIX else None
+        if found is None:
+            found = self._lookup(prefix)
+        return [self.entries[i] for i in found[:k or self.max_suggestions]]
+
+    @classmethod
+    def from_catalog(cls, df, max_suggestions=MAX_SUGGESTIONS):
+        """
+        Builds the index from destinations rows (id, name, city, state,
+        google_rating, latitude, longitude and google_review_lakhs if present,
+        else review_count). Cities and states are suggested too, ranked by the
+        total popularity of their destinations and located at their mean position.
+        """
+        volume = df['google_review_lakhs'] if 'google_review_lakhs' in df else df['review_count'] / 1e5
+        df = df.assign(popularity=popularity(df['google_rating'], volume))
+
+        columns = [df[c].tolist() for c in ['id', 'name', 'city', 'state', 'latitude', 'longitude']]
+        entries = [
+            Suggestion(name, 'destination', f"{city}, {state}", int(i), lat, lon)
+            for i, name, city, state, lat, lon in zip(*columns)
+        ]
+        weights = [df['popularity'].to_numpy()]
+
+        for kind, keys in [('city', ['city', 'state']), ('state', ['state'])]:
+            groups = df.groupby(keys, observed=True, sort=True).agg(
+                popularity=('popularity', 'sum'), latitude=('latitude', 'mean'), longitude=('longitude', 'mean')
+            ).reset_index()
+            entries.extend(
+                Suggestion(name, kind, state if kind == 'city' else 'State', None, lat, lon)
+                for name, state, lat, lon in zip(groups[kind], groups['state'], groups['latitude'], groups['longitude'])
+            )
+            weights.append(groups['popularity'].to_numpy())
+
+        return cls(entries, np.concatenate(weights), max_suggestions)
+
+
+if __name__ == "__main__":
+    # Benchmark: per-keystroke latency on a synthetic 1M-destination catalog
+    rng = np.random.default_rng(0)
+    words = ["Fort", "Palace", "Temple", "Lake", "Beach", "Garden", "Tomb", "Falls", "Hill", "Caves",
+             "Sri", "Maha", "Raja", "Lakshmi", "Ganesh", "Kali", "Shiva", "Golden", "Old", "New"]
+    n = 1_000_000
+    names = [" ".join(rng.choice(words, 3)) + f" {i}" for i in range(n)]
+    cities = [f"City {c}" for c in rng.integers(0, 5000, n)]
+    catalog = pd.DataFrame({
+        'id': np.arange(1, n + 1), 'name': names, 'city': cities,
+        'state': [f"State {s}" for s in rng.integers(0, 36, n)],
+        'google_rating': np.round(rng.uniform(3.0, 5.0, n), 1),
+        'google_review_lakhs': rng.exponential(0.4, n),
+        'latitude': rng.uniform(8, 34, n), 'longitude': rng.uniform(69, 95, n),
+    })
+
+    start = time.perf_counter()
+    index = PrefixIndex.from_catalog(catalog)
+    print(f"Build: {len(index.entries):,} entries, {len(index.keys):,} keys in {time.perf_counter() - start:.1f}s")
+
+    for typed in ["g", "go", "gol", "golden t", "golden temple 12", "city 42", "xyz"]:
+        start = time.perf_counter()
+        for _ in range(1000):
+            found = index.suggest(typed)
+        us = (time.perf_counter() - start) / 1000 * 1e6
+        print(f"{typed!r:20} {us:7.1f} us  {[s.label for s in found[:3]]}")
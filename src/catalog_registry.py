@@ -0,0 +1,267 @@
+import os
+import threading
+import logging
+from collections import namedtuple
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from src.feature_engine import TravelFeatureEngine, ARTIFACTS_DIR
+from src.destination_store import DestinationStore
+from src.vector_store import DestinationVectorStore
+from src.geo_index import GeoGridIndex, haversine_km
+from src.diversity import mmr_rerank, SHORTLIST_SIZE
+from src.recommender import TravelRecommender, DB_PATH, read_catalog, read_text_columns, explain_rows
+from src.profile_options import ZONE_ALIASES
+
+logger = logging.getLogger(__name__)
+
+# The rows of one catalog in one zone, encoded and indexed on their own
+CatalogSegment = namedtuple('CatalogSegment', [
+    'zone',             # Zone value shared by every row (None for rows without one)
+    'destinations',     # DestinationStore over the segment's rows
+    'vectors',          # Encoded rows, L2-normalised, aligned with `destinations`
+    'geo_index',        # GeoGridIndex over the segment's coordinates (None if not geocoded)
+])
+
+# One immutable version of a registered catalog; swapped whole on reload
+RegisteredCatalog = namedtuple('RegisteredCatalog', [
+    'name',
+    'version',          # Bumped every time this catalog is (re)loaded
+    'db_path',          # SQLite file the catalog is read from
+    'encoder_path',     # Where the catalog's own encoder lives, if it needed one
+    'feature_engine',   # Encoder behind every segment's vectors; may be shared with other catalogs
+    'segments',         # {zone: CatalogSegment}
+])
+
+
+def encoder_path_for(name):
+    return os.path.join(ARTIFACTS_DIR, f"feature_encoder_{name}.pkl")
+
+
+class CatalogRegistry:
+    """
+    Serves several catalogs (e.g. regional subsets and an international one)
+    from one process, each loaded and reloaded on its own schedule.
+
+    - Encoders are shared: a catalog reuses an encoder already serving another
+      catalog whenever its rows fall inside that encoder's vocabulary and
+      ranges, and only gets its own (fitted once and saved) otherwise.
+    - Each catalog is held as zone partitions, so memory follows the rows
+      actually loaded, and a request is scored against the segment for its
+      profile's 'zone' only (every segment of the catalog if it has none, or
+      one the catalog doesn't hold).
+
+    Ranking uses the same scoring, constraints and tie-breaks as
+    TravelRecommender, per segment. Free-text search and the CF blend stay
+    with TravelRecommender; 'query' is ignored here.
+    """
+
+    def __init__(self):
+        self._catalogs = {}  # name -> RegisteredCatalog; replaced whole, never mutated
+        # Serialises writers only. Readers never take this lock.
+        self._write_lock = threading.Lock()
+
+    @property
+    def names(self):
+        return sorted(self._catalogs)
+
+    def catalog(self, name):
+        catalog = self._catalogs.get(name)
+        if catalog is None:
+            raise KeyError(f"No catalog registered as '{name}'")
+        return catalog
+
+    def feature_engines(self):
+        """
+        Distinct encoders currently in use. Returns: {encoder_version: [catalog names]}
+        """
+        engines = {}
+        for catalog in self._catalogs.values():
+            engines.setdefault(catalog.feature_engine.encoder_version, []).append(catalog.name)
+        return engines
+
+    def register(self, name, db_path=DB_PATH, encoder_path=None):
+        """
+        Loads (or reloads) a catalog from `db_path` and swaps it in under `name`.
+        encoder_path: The catalog's own encoder, used (or fitted and saved there)
+                      only if no encoder already in the registry covers it.
+        Returns: The RegisteredCatalog now being served.
+        """
+        df = read_catalog(db_path)
+        with self._write_lock:
+            previous = self._catalogs.get(name)
+            encoder_path = encoder_path or (previous.encoder_path if previous is not None else encoder_path_for(name))
+            engine = self._engine_for(name, df, encoder_path)
+            catalog = RegisteredCatalog(
+                name=name,
+                version=previous.version + 1 if previous is not None else 1,
+                db_path=db_path,
+                encoder_path=encoder_path,
+                feature_engine=engine,
+                segments=self._partition(df, engine, partial(read_text_columns, db_path=db_path)),
+            )
+            catalogs = dict(self._catalogs)
+            catalogs[name] = catalog
+            # Single reference assignment: atomic for readers.
+            self._catalogs = catalogs
+
+        shared = [other for other in self.feature_engines()[engine.encoder_version] if other != name]
+        logger.info(f"Catalog '{name}' v{catalog.version}: {len(df)} destinations in {len(catalog.segments)} zones, "
+                    f"encoder {engine.encoder_version}" + (f" (shared with {', '.join(shared)})" if shared else ""))
+        return catalog
+
+    def reload(self, name):
+        """
+        Re-reads one catalog from its source. The others are untouched.
+        """
+        return self.register(name, self.catalog(name).db_path)
+
+    def unregister(self, name):
+        with self._write_lock:
+            catalogs = dict(self._catalogs)
+            catalogs.pop(name, None)
+            self._catalogs = catalogs
+
+    def _engine_for(self, name, df, encoder_path):
+        """
+        An encoder that can encode `df` without losing information: one already
+        in use (this catalog's own first), else the one at encoder_path, else
+        a new one fitted on `df` and saved to encoder_path.
+        """
+        live = sorted(self._catalogs.values(), key=lambda catalog: catalog.name != name)
+        engines = {}
+        for catalog in live:
+            engines.setdefault(catalog.feature_engine.encoder_version, catalog.feature_engine)
+        for engine in engines.values():
+            if not engine.needs_refit(df):
+                return engine
+
+        engine = TravelFeatureEngine()
+        if os.path.exists(encoder_path):
+            engine.load_encoders(encoder_path)
+            if not engine.needs_refit(df):
+                return engine
+            logger.info(f"Encoder at {encoder_path} doesn't cover catalog '{name}'. Refitting...")
+        engine.fit_and_save(df, encoder_path)
+        return engine
+
+    @staticmethod
+    def _partition(df, engine, text_loader):
+        """
+        Splits the catalog by zone and encodes each part into its own segment.
+        Rows keep their catalog order within a segment.
+        """
+        segments = {}
+        zones = df['zone'].astype(object).where(df['zone'].notna(), None)
+        for zone in pd.unique(zones):
+            part = df[(zones == zone).to_numpy()].reset_index(drop=True)
+            part.attrs = df.attrs
+            destinations = DestinationStore.from_frame(part, text_loader)
+            geo_index = None
+            if 'latitude' in destinations and 'longitude' in destinations:
+                geo_index = GeoGridIndex(destinations['latitude'], destinations['longitude'])
+            segments[zone] = CatalogSegment(zone, destinations, DestinationVectorStore._encode(engine, part), geo_index)
+        return segments
+
+    def route(self, catalog, profile):
+        """
+        The segments a profile is scored against: its zone's (sidebar spellings
+        normalised through ZONE_ALIASES), or all of them if it doesn't name a
+        zone or names one the catalog doesn't have.
+        """
+        zone = profile.get('zone')
+        if zone is None:
+            return list(catalog.segments.values())
+        segment = catalog.segments.get(ZONE_ALIASES.get(zone, zone))
+        if segment is None:
+            logger.warning(f"Catalog '{catalog.name}' has no zone '{zone}'; scoring all of its segments.")
+            return list(catalog.segments.values())
+        return [segment]
+
+    def rank(self, name, user_profile, top_n=5):
+        """
+        Scores and ranks the routed segments of one catalog.
+        Returns: (catalog used, [(segment, row positions, match scores)] in rank order)
+        """
+        # Pin one catalog version for the whole request
+        catalog = self.catalog(name)
+        segments = self.route(catalog, user_profile)
+        if not segments:
+            return catalog, []
+        user_vector = catalog.feature_engine.create_user_vector(user_profile)
+
+        diversity = user_profile.get('diversity') or 0.0
+        shortlist_n = max(top_n, SHORTLIST_SIZE) if diversity else top_n
+
+        # Each segment ranks its own rows; the local top-n lists are merged
+        found = []
+        for segment in segments:
+            top, scores = TravelRecommender._score_and_rank(segment.destinations, segment.vectors, user_vector,
+                                                            user_profile, shortlist_n, geo_index=segment.geo_index)
+            found += [(segment, row, score) for row, score in zip(top, scores)]
+        ratings = np.array([segment.destinations['google_rating'][row] for segment, row, _ in found])
+        scores = np.array([score for _, _, score in found])
+        order = np.lexsort((-ratings, -scores))[:shortlist_n]
+        found = [found[i] for i in order]
+
+        if diversity and found:
+            vectors = np.stack([segment.vectors[row] for segment, row, _ in found])
+            picked = mmr_rerank(vectors, np.array([score for _, _, score in found]), top_n, diversity)
+            found = [found[i] for i in picked]
+        return catalog, found
+
+    def recommend(self, name, user_profile, top_n=5):
+        """
+        Same contract as TravelRecommender.recommend, against catalog `name`.
+        Returns: DataFrame of up to top_n destinations with 'match_score'
+        """
+        _, found = self.rank(name, user_profile, top_n)
+        if not found:
+            return pd.DataFrame()
+
+        # Materialise only the rows we return, a segment at a time
+        parts = []
+        for segment in {id(segment): segment for segment, _, _ in found}.values():
+            picks = [(rank, row, score) for rank, (other, row, score) in enumerate(found) if other is segment]
+            rows = segment.destinations.take([row for _, row, _ in picks])
+            rows['match_score'] = [score for _, _, score in picks]
+            rows.index = [rank for rank, _, _ in picks]
+            parts.append(rows)
+        results = pd.concat(parts).sort_index()
+
+        origin = TravelRecommender._distance_origin(user_profile)
+        if origin is not None:
+            results['distance_km'] = haversine_km(results['latitude'], results['longitude'], *origin)
+        results['explanation'] = explain_rows(results, user_profile)
+        return results.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    # Demo: the full catalog plus a Southern-only regional catalog, which
+    # shares the full catalog's encoder instead of fitting its own
+    import sqlite3
+    import tempfile
+    from src.feature_engine import ENCODER_PATH
+
+    logging.basicConfig(level=logging.INFO)
+    registry = CatalogRegistry()
+    registry.register("india", DB_PATH, encoder_path=ENCODER_PATH)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        south_db = os.path.join(tmp, "south.db")
+        with sqlite3.connect(DB_PATH) as source, sqlite3.connect(south_db) as target:
+            schema = source.execute("SELECT sql FROM sqlite_master WHERE name = 'destinations'").fetchone()[0]
+            target.execute(schema)
+            rows = source.execute("SELECT * FROM destinations WHERE zone = 'Southern'").fetchall()
+            target.executemany(f"INSERT INTO destinations VALUES ({', '.join('?' * len(rows[0]))})", rows)
+        registry.register("south", south_db)
+        print(f"Encoders in use: {registry.feature_engines()}")
+
+        profile = {'type': 'Nature', 'significance': 'Relaxation', 'duration_bucket': 'Short',
+                   'budget_bucket': 'Low', 'zone': 'Southern'}
+        pd.set_option('display.max_colwidth', None)
+        for name in registry.names:
+            print(f"\n--- {name} ---")
+            print(registry.recommend(name, profile)[['name', 'zone', 'match_score', 'explanation']])
@@ -0,0 +1,172 @@
+import os
+import hashlib
+import sqlite3
+import threading
+import logging
+
+from src.recommender import DB_PATH
+from src.feature_engine import ENCODER_PATH
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogWatcher:
+    """
+    Background thread that hot-reloads a TravelRecommender when `travel.db`
+    or `feature_encoder.pkl` change on disk. A recommender serving an Arrow
+    catalog (catalog_path) is reloaded when that file is replaced instead:
+    its rows, vectors and encoder all come from the file.
+
+    All rebuild work happens on this thread. The recommender swaps in the new
+    snapshot with a single reference assignment, so requests already running
+    finish on the version they started with and new requests see the new one.
+    """
+
+    def __init__(self, recommender, interval=5.0, db_path=DB_PATH, encoder_path=ENCODER_PATH, on_change=None):
+        """
+        on_change: Optional f(previous snapshot, new snapshot), called on this
+                   thread after each swap (e.g. UserStore.on_catalog_change).
+        """
+        self.recommender = recommender
+        self.on_change = on_change
+        self.interval = interval
+        self.db_path = db_path
+        self.encoder_path = encoder_path
+
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._conn = None
+        self._conn_inode = None
+        self._db_state = None
+        self._encoder_mtime = None
+        self._catalog_state = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        # Record the current on-disk state so the first poll doesn't reload needlessly
+        self._db_state = self._read_db_state()
+        self._encoder_mtime = self._mtime(self.encoder_path)
+        self._catalog_state = self._read_catalog_state()
+        self._thread = threading.Thread(target=self._run, name="catalog-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _inode(path):
+        try:
+            return os.stat(path).st_ino
+        except FileNotFoundError:
+            return None
+
+    def _read_db_state(self):
+        """
+        `PRAGMA data_version` changes whenever another connection commits, which
+        also catches WAL-mode writes that leave the main file's mtime alone.
+        It is only meaningful on a long-lived connection, so we keep one open.
+        """
+        inode = self._inode(self.db_path)
+        try:
+            if self._conn is not None and inode != self._conn_inode:
+                # The file was replaced (e.g. a pipeline bundle was published);
+                # the old connection would keep watching the unlinked one
+                self._conn.close()
+                self._conn = None
+            if self._conn is None:
+                self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                self._conn_inode = inode
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error as e:
+            logger.error(f"Catalog watcher could not read {self.db_path}: {e}")
+            data_version = None
+        return (self._mtime(self.db_path), inode, data_version)
+
+    def _read_catalog_state(self):
+        """
+        (mtime, inode) of the Arrow catalog file, or None when not serving one.
+        write_catalog swaps in a new file, so the inode changes on every publish.
+        """
+        path = getattr(self.recommender, 'catalog_path', None)
+        if path is None:
+            return None
+        return (self._mtime(path), self._inode(path))
+
+    def _encoder_changed(self):
+        """
+        Returns the encoder file's mtime if it holds an encoder other than the
+        one being served, else None. The caller records the mtime only once
+        the reload succeeded, so a failed reload is retried on the next poll.
+        """
+        mtime = self._mtime(self.encoder_path)
+        if mtime is None or mtime == self._encoder_mtime:
+            return None
+
+        # mtime moved; only reload if the content differs from what we serve
+        # (a refit saved by this process writes this file too).
+        with open(self.encoder_path, "rb") as f:
+            file_version = hashlib.sha1(f.read()).hexdigest()[:12]
+        if file_version == self.recommender.vector_store.snapshot.encoder_version:
+            self._encoder_mtime = mtime
+            return None
+        return mtime
+
+    def check(self):
+        """
+        Runs one poll. Returns True if a new catalog version was swapped in.
+        """
+        previous = self.recommender.vector_store.snapshot
+
+        if self._catalog_state is not None:
+            # travel.db and the encoder pickle aren't read in this mode
+            catalog_state = self._read_catalog_state()
+            if catalog_state == self._catalog_state or catalog_state[0] is None:
+                return False
+            logger.info("Arrow catalog replaced on disk. Reloading catalog...")
+            self.recommender.reload()
+            self._catalog_state = catalog_state
+        else:
+            encoder_mtime = self._encoder_changed()
+            if encoder_mtime is not None:
+                logger.info("Encoder artifact changed on disk. Reloading catalog...")
+                db_state = self._read_db_state()
+                self.recommender.reload()
+                self._encoder_mtime = encoder_mtime
+                self._db_state = db_state
+            else:
+                db_state = self._read_db_state()
+                if db_state == self._db_state:
+                    return False
+                logger.info("Catalog database changed. Applying incremental refresh...")
+                self.recommender.refresh()
+                self._db_state = db_state
+
+        current = self.recommender.vector_store.snapshot
+        if current is not previous:
+            logger.info(f"Now serving catalog version {current.version} (encoder {current.encoder_version}).")
+            if self.on_change is not None:
+                self.on_change(previous, current)
+            return True
+        return False
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                # Keep serving the last good version; try again next poll
+                logger.error(f"Catalog reload failed: {e}")
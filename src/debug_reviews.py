@@ -1,7 +1,10 @@
 
+import os
 import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 try:
-    df = pd.read_csv(r'D:\Travel RS\data\raw\tripadvisor_hotel_reviews.csv')
+    df = pd.read_csv(os.path.join(PROJECT_ROOT, "data", "raw", "tripadvisor_hotel_reviews.csv"))
     print("--- First 5 Reviews Sample ---")
     for i, review in enumerate(df['Review'].head(5)):
         print(f"Review {i+1}: {review[:200]}...") 
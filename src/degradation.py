@@ -0,0 +1,165 @@
+import time
+import threading
+import logging
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODE_FULL = "full"
+MODE_DEGRADED = "degraded"   # Rule-based text, cached/mock vlogs, smaller candidate sets, no prefetch
+
+# (connect, read) timeout for every Gemini/YouTube HTTP call, in seconds
+UPSTREAM_TIMEOUT = (3.05, 10.0)
+
+# Each signal has an enter and a (lower) exit threshold, so a load hovering
+# around one value doesn't flip the mode on every request
+ENTER_IN_FLIGHT, EXIT_IN_FLIGHT = 8, 4                 # Concurrent tracked operations
+ENTER_LATENCY, EXIT_LATENCY = 4.0, 2.0                 # p90 upstream latency (s) over the window
+ENTER_REQUEST_LATENCY, EXIT_REQUEST_LATENCY = 1.0, 0.5 # p90 of the app's own tracked requests (s)
+MIN_DEGRADED_SECONDS = 30.0                            # Stay degraded at least this long
+LATENCY_WINDOW = 50                                    # Recent calls kept per upstream (and for requests)...
+LATENCY_MAX_AGE = 120.0                                # ...if no older than this (s)
+EVALUATE_EVERY = 1.0                                   # Re-check signals at most this often (s)
+
+# Candidate cap for "Load more" cursors in degraded mode
+DEGRADED_CANDIDATES = 50
+
+
+class DegradationController:
+    """
+    Decides, from live load signals, whether the app should serve its full
+    experience or a cheaper degraded one.
+
+    Signals: operations in flight (tracked with `track()`), recent latency of
+    each upstream API and of user requests. Request latency stands in for
+    CPU pressure: a machine-wide load average also counts the app's own
+    pre-warming and scorer workers, so the app could degrade itself, while
+    this only moves when users are actually being served slowly.
+
+    Any signal above its enter threshold switches to degraded; full mode
+    only returns once every signal is below its exit threshold and the
+    minimum dwell time has passed (hysteresis).
+
+    One controller is shared by every session in the process.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._mode = MODE_FULL
+        self._since = clock()
+        self._checked_at = None
+        self._reasons = []
+        self._in_flight = 0
+        self._latencies = {}   # upstream -> deque of (finished at, seconds)
+        self._requests = deque(maxlen=LATENCY_WINDOW)  # (finished at, seconds) of untagged blocks
+        self._transitions = 0
+        self._degraded_total = 0.0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def track(self, upstream=None):
+        """
+        Counts the wrapped block as in flight and records its duration,
+        failures included: per upstream ('gemini', 'youtube'), or as a user
+        request when `upstream` is None. Background work shouldn't be tracked.
+        """
+        start = self.clock()
+        with self._lock:
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            finished = self.clock()
+            with self._lock:
+                self._in_flight -= 1
+                if upstream is not None:
+                    window = self._latencies.setdefault(upstream, deque(maxlen=LATENCY_WINDOW))
+                else:
+                    window = self._requests
+                window.append((finished, finished - start))
+
+    @staticmethod
+    def _p90(window, now):
+        while window and now - window[0][0] > LATENCY_MAX_AGE:
+            window.popleft()
+        if not window:
+            return None
+        return float(np.percentile([seconds for _, seconds in window], 90))
+
+    def _latency_p90(self, now):
+        p90 = {upstream: self._p90(window, now) for upstream, window in self._latencies.items()}
+        return {upstream: seconds for upstream, seconds in p90.items() if seconds is not None}
+
+    def _evaluate(self, now):
+        latencies = self._latency_p90(now)
+        request_p90 = self._p90(self._requests, now)
+        slowest = max(latencies.values(), default=0.0)
+
+        if self._mode == MODE_FULL:
+            reasons = []
+            if self._in_flight >= ENTER_IN_FLIGHT:
+                reasons.append(f"{self._in_flight} requests in flight")
+            reasons += [f"{name} p90 latency {p90:.1f}s" for name, p90 in latencies.items() if p90 >= ENTER_LATENCY]
+            if request_p90 is not None and request_p90 >= ENTER_REQUEST_LATENCY:
+                reasons.append(f"request p90 latency {request_p90:.2f}s")
+            if reasons:
+                self._switch(MODE_DEGRADED, now, reasons)
+        else:
+            recovered = (self._in_flight <= EXIT_IN_FLIGHT and slowest <= EXIT_LATENCY
+                         and (request_p90 is None or request_p90 <= EXIT_REQUEST_LATENCY))
+            if recovered and now - self._since >= MIN_DEGRADED_SECONDS:
+                self._switch(MODE_FULL, now, [])
+
+    def _switch(self, mode, now, reasons):
+        if self._mode == MODE_DEGRADED:
+            self._degraded_total += now - self._since
+        self._mode = mode
+        self._since = now
+        self._reasons = reasons
+        self._transitions += 1
+        if mode == MODE_DEGRADED:
+            logger.warning(f"Switching to degraded mode: {', '.join(reasons)}")
+        else:
+            logger.info("Load back to normal. Restoring full mode.")
+
+    @property
+    def mode(self):
+        now = self.clock()
+        with self._lock:
+            if self._checked_at is None or now - self._checked_at >= EVALUATE_EVERY:
+                self._checked_at = now
+                self._evaluate(now)
+            return self._mode
+
+    @property
+    def degraded(self):
+        return self.mode == MODE_DEGRADED
+
+    def candidate_limit(self, default):
+        """
+        How many candidates to rank for paging: `default`, or fewer when degraded.
+        """
+        return min(default, DEGRADED_CANDIDATES) if self.degraded else default
+
+    def metrics(self):
+        """
+        Current mode and the signals behind it, for dashboards and logs.
+        """
+        mode = self.mode
+        now = self.clock()
+        with self._lock:
+            degraded_seconds = self._degraded_total + (now - self._since if mode == MODE_DEGRADED else 0.0)
+            return {
+                'mode': mode,
+                'degraded': int(mode == MODE_DEGRADED),
+                'reasons': list(self._reasons),
+                'mode_seconds': now - self._since,
+                'in_flight': self._in_flight,
+                'latency_p90': self._latency_p90(now),
+                'request_latency_p90': self._p90(self._requests, now),
+                'transitions': self._transitions,
+                'degraded_seconds_total': degraded_seconds,
+            }
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+# Columns kept as dictionary-encoded categoricals (small-int codes + one shared vocabulary)
+CATEGORICAL_COLUMNS = [
+    'zone', 'state', 'city', 'type', 'significance',
+    'duration_bucket', 'budget_bucket', 'best_time_to_visit', 'weekly_off'
+]
+
+# Bulky free text. Never held in memory, fetched by id for displayed rows only.
+TEXT_COLUMNS = ['name', 'sample_reviews']
+
+
+class DestinationStore:
+    """
+    Read-only columnar view of the destinations catalog.
+
+    - Categorical columns are pandas Categoricals (int8/int16 codes over a shared vocabulary).
+    - Numeric columns are float32 (or int32 for integer columns) numpy arrays.
+    - Text columns are not stored; `take()` fetches them by id through `text_loader`.
+
+    Columns are accessed like a DataFrame (`store['zone'] == 'Southern'`) without
+    copying, and only `take()` materialises rows, for the handful being displayed.
+    """
+
+    def __init__(self, ids, columns, column_order, text_loader=None):
+        self.ids = ids
+        self._columns = columns
+        self.column_order = column_order
+        self.text_loader = text_loader
+
+    @classmethod
+    def from_frame(cls, df, text_loader=None, previous=None):
+        """
+        Builds the store from a catalog DataFrame (with or without text columns).
+
+        Args:
+            df (DataFrame): Catalog rows; must contain 'id'.
+            text_loader (callable): f(ids, columns) -> DataFrame indexed by id.
+            previous (DestinationStore): Store being replaced. Vocabularies that did
+                not change are reused rather than duplicated.
+        """
+        columns = {}
+        for col in df.columns:
+            if col == 'id' or col in TEXT_COLUMNS:
+                continue
+            values = df[col]
+            if col in CATEGORICAL_COLUMNS or not pd.api.types.is_numeric_dtype(values):
+                dtype = pd.CategoricalDtype(sorted(values.dropna().unique()))
+                if previous is not None and col in previous and previous[col].dtype == dtype:
+                    dtype = previous[col].dtype
+                columns[col] = pd.Categorical(values, dtype=dtype)
+            elif pd.api.types.is_integer_dtype(values):
+                columns[col] = values.to_numpy(dtype=np.int32)
+            else:
+                columns[col] = values.to_numpy(dtype=np.float32)
+
+        column_order = list(df.attrs.get('column_order', df.columns))
+        for col in TEXT_COLUMNS:
+            if col not in column_order:
+                column_order.append(col)
+
+        ids = df['id'].to_numpy(dtype=np.int64)
+        return cls(ids, columns, column_order, text_loader)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, col):
+        return col in self._columns
+
+    def __getitem__(self, col):
+        if col == 'id':
+            return self.ids
+        return self._columns[col]
+
+    @property
+    def column_names(self):
+        """
+        Every stored column, including internal ones not in column_order.
+        """
+        return list(self._columns)
+
+    @property
+    def empty(self):
+        return len(self.ids) == 0
+
+    def slice(self, start, stop):
+        """
+        Store over rows [start, stop). Columns are views, nothing is copied.
+        """
+        columns = {col: values[start:stop] for col, values in self._columns.items()}
+        return DestinationStore(self.ids[start:stop], columns, self.column_order, self.text_loader)
+
+    def subset(self, positions):
+        """
+        Store over the given (sorted) row positions. Columns are copied, so keep
+        this for small candidate sets such as the rows inside a search radius.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        columns = {col: values[positions] for col, values in self._columns.items()}
+        return DestinationStore(self.ids[positions], columns, self.column_order, self.text_loader)
+
+    def position_of(self, destination_ids):
+        """
+        Maps destination ids to row positions (-1 for unknown ids).
+        """
+        return pd.Index(self.ids).get_indexer(destination_ids)
+
+    def take(self, positions, with_text=True):
+        """
+        Materialises the given row positions as a DataFrame indexed by position.
+
+        Numeric values are widened back to float64 via their shortest decimal
+        form, so a stored 4.6 displays as 4.6 rather than 4.599999904632568.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        data = {'id': self.ids[positions]}
+        for col, values in self._columns.items():
+            if isinstance(values, pd.Categorical):
+                data[col] = values.take(positions).astype(object)
+            elif values.dtype == np.float32:
+                data[col] = values[positions].astype(str).astype(np.float64)
+            else:
+                data[col] = values[positions].astype(np.int64)
+
+        df = pd.DataFrame(data, index=pd.Index(positions))
+
+        if with_text and self.text_loader is not None and len(positions) > 0:
+            text = self.text_loader(data['id'].tolist(), TEXT_COLUMNS)
+            for col in TEXT_COLUMNS:
+                df[col] = text[col].reindex(data['id']).to_numpy()
+
+        return df[[c for c in self.column_order if c in df.columns]]
+
+    def to_frame(self, with_text=True):
+        """
+        Materialises the whole catalog. Expensive; meant for offline jobs and debugging.
+        """
+        return self.take(np.arange(len(self.ids)), with_text=with_text)
@@ -0,0 +1,92 @@
+import time
+
+import numpy as np
+
+# Size of the relevance-ranked shortlist the re-ranker chooses from
+SHORTLIST_SIZE = 200
+
+
+def mmr_rerank(unit_vectors, relevance, k, diversity):
+    """
+    Maximal marginal relevance over a shortlist.
+
+    Picks k items one at a time, each maximising
+        (1 - diversity) * relevance - diversity * (max similarity to the items already picked)
+    The max-similarity column is updated incrementally with one matrix-vector
+    product per pick, so the cost is O(k * shortlist * dims) and the full
+    pairwise matrix is never built.
+
+    Args:
+        unit_vectors (array): L2-normalised vectors of the shortlist, best first.
+        relevance (array): Match scores aligned with unit_vectors.
+        k (int): Number of items to return.
+        diversity (float): 0 keeps the relevance order, 1 only maximises novelty.
+
+    Returns: Positions within the shortlist, in pick order.
+    """
+    n = len(relevance)
+    k = min(k, n)
+    if k == 0:
+        return np.empty(0, dtype=np.int64)
+
+    gain = (1.0 - diversity) * np.asarray(relevance, dtype=np.float64)
+    max_similarity = np.full(n, -np.inf)
+    available = np.ones(n, dtype=bool)
+    picked = np.empty(k, dtype=np.int64)
+
+    # First pick has nothing to be redundant with: the most relevant item.
+    # np.argmax returns the first maximum, so ties keep the shortlist order.
+    picked[0] = np.argmax(gain)
+    available[picked[0]] = False
+    for i in range(1, k):
+        np.maximum(max_similarity, unit_vectors @ unit_vectors[picked[i - 1]], out=max_similarity)
+        marginal = np.where(available, gain - diversity * max_similarity, -np.inf)
+        picked[i] = np.argmax(marginal)
+        available[picked[i]] = False
+    return picked
+
+
+def intra_list_similarity(unit_vectors):
+    """
+    Mean pairwise cosine similarity of a result list (lower = more diverse).
+    """
+    n = len(unit_vectors)
+    if n < 2:
+        return 0.0
+    similarities = unit_vectors @ unit_vectors.T
+    return float((similarities.sum() - np.trace(similarities)) / (n * (n - 1)))
+
+
+if __name__ == "__main__":
+    # Benchmark: latency of re-ranking a shortlist vs. the diversity it buys
+    import warnings
+    warnings.filterwarnings('ignore')
+
+    from src.recommender import TravelRecommender
+    from src.profile_options import reachable_profiles
+
+    recommender = TravelRecommender()
+    state = recommender.vector_store.snapshot
+    profiles = list(reachable_profiles())[::50]
+
+    for diversity in [0.0, 0.3, 0.5, 0.7]:
+        timings, similarity, cities, relevance = [], [], [], []
+        for profile in profiles:
+            user_vector = state.feature_engine.create_user_vector(profile)
+            top, scores = TravelRecommender._score_and_rank(
+                state.destinations, state.vectors, user_vector, profile, SHORTLIST_SIZE
+            )
+            if len(top) < 5:
+                continue
+            start = time.perf_counter()
+            picked = mmr_rerank(state.vectors[top], scores, 5, diversity)
+            timings.append(time.perf_counter() - start)
+
+            chosen = top[picked]
+            similarity.append(intra_list_similarity(state.vectors[chosen]))
+            cities.append(len(set(state.destinations['city'][chosen])))
+            relevance.append(scores[picked].mean())
+
+        print(f"diversity={diversity:.1f}: {np.mean(timings) * 1e6:6.1f} us/re-rank  "
+              f"intra-list sim {np.mean(similarity):.3f}  distinct cities {np.mean(cities):.2f}/5  "
+              f"mean match {np.mean(relevance):.3f}")
@@ -0,0 +1,246 @@
+import os
+import sys
+import time
+import json
+import sqlite3
+import argparse
+import multiprocessing as mp
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.collaborative import ACTION_WEIGHTS
+from src import profile_options as options
+
+# Get project root (parent of src)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(PROJECT_ROOT, "data", "travel.db")
+USERS_DB_PATH = os.path.join(PROJECT_ROOT, "data", "users.db")
+
+# One replayed request: the profile to send and the destination ids the user engaged with
+EvalCase = namedtuple('EvalCase', ['user_id', 'profile', 'relevant'])
+
+# An engine setup to evaluate.
+#   engine_kwargs:     TravelRecommender(**engine_kwargs) (cf_model=True builds an ItemCooccurrenceModel)
+#   profile_overrides: merged into every profile (e.g. {'diversity': 0.3})
+EngineConfig = namedtuple('EngineConfig', ['name', 'engine_kwargs', 'profile_overrides'],
+                          defaults=[{}, {}])
+
+METRICS = ['precision', 'recall', 'ndcg', 'hit_rate', 'coverage', 'p50_ms', 'p95_ms', 'throughput']
+
+
+def _user_profile(row):
+    return {
+        'user_id': row['user_id'],
+        'type': options.TYPE_ALIASES.get(row['activity_type_pref'], row['activity_type_pref']),
+        'significance': row['travel_interest_pref'],
+        'duration_bucket': row['duration_pref'],
+        'budget_bucket': row['budget_pref'],
+        'zone': row['location_zone_pref'],
+        'job_type': 'Flexible',
+    }
+
+
+def load_logged_cases(db_path=DB_PATH, users_db_path=USERS_DB_PATH):
+    """
+    Cases from the `users` table (users.db, see user_store; travel.db's own
+    before the app first ran), with each user's positively weighted
+    `interactions` as ground truth. Users without any are skipped.
+    """
+    conn = sqlite3.connect(users_db_path if os.path.exists(users_db_path) else db_path)
+    try:
+        users = pd.read_sql_query("SELECT * FROM users", conn)
+    finally:
+        conn.close()
+    conn = sqlite3.connect(db_path)
+    try:
+        events = pd.read_sql_query("SELECT user_id, destination_id, action_type FROM interactions", conn)
+    finally:
+        conn.close()
+
+    positive = events[events['action_type'].map(ACTION_WEIGHTS).fillna(0.0) > 0]
+    relevant = positive.groupby('user_id')['destination_id'].agg(frozenset)
+    return [
+        EvalCase(row['user_id'], _user_profile(row), relevant[row['user_id']])
+        for _, row in users.iterrows() if row['user_id'] in relevant.index
+    ]
+
+
+def synthetic_cases(destinations, n_users=1000, n_relevant=5, seed=0):
+    """
+    Simulated users with sidebar-style preferences. Each "likes" destinations
+    drawn with probability rising with how many preferences they match and
+    their rating, so ground truth doesn't come from the engine being measured.
+
+    Args:
+        destinations (DataFrame): Catalog rows (type, significance, zone, budget_bucket, google_rating).
+    """
+    rng = np.random.default_rng(seed)
+    ids = destinations['id'].to_numpy()
+    rating = np.nan_to_num(destinations['google_rating'].to_numpy(dtype=float), nan=3.0)
+
+    cases = []
+    for user_id in range(1, n_users + 1):
+        profile = options.build_profile(
+            rng.choice(options.ACTIVITY_TYPES), rng.choice(options.PURPOSES),
+            rng.choice(options.TRAVEL_TIMES), rng.choice(options.BUDGETS),
+            rng.choice(options.ZONES), rng.choice(options.JOB_TYPES),
+            rng.choice(options.SEASONS), rng.choice(options.REGIONS),
+        )
+        profile['user_id'] = -user_id  # Never collides with logged users
+
+        affinity = (
+            2.0 * (destinations['type'] == profile['type']).to_numpy()
+            + 1.0 * (destinations['significance'] == profile['significance']).to_numpy()
+            + 1.5 * (destinations['zone'] == profile['zone']).to_numpy()
+            + 0.5 * (destinations['budget_bucket'] == profile['budget_bucket']).to_numpy()
+            + 0.5 * (rating - 4.0)
+        )
+        weights = np.exp(2.0 * affinity)
+        liked = rng.choice(ids, size=min(n_relevant, len(ids)), replace=False, p=weights / weights.sum())
+        cases.append(EvalCase(profile['user_id'], profile, frozenset(liked.tolist())))
+    return cases
+
+
+# Per-worker engine, built once by the pool initializer
+_engine = {'recommender': None}
+
+
+def _init_worker(engine_kwargs):
+    import warnings
+    warnings.filterwarnings('ignore')
+    from src.recommender import TravelRecommender
+
+    engine_kwargs = dict(engine_kwargs)
+    if engine_kwargs.get('cf_model') is True:
+        from src.collaborative import ItemCooccurrenceModel
+        engine_kwargs['cf_model'] = ItemCooccurrenceModel()
+    _engine['recommender'] = TravelRecommender(**engine_kwargs)
+
+
+def _replay(cases, k, profile_overrides):
+    """
+    Worker task: runs a chunk of cases.
+    Returns: list of (recommended ids, latency in seconds)
+    """
+    recommender = _engine['recommender']
+    results = []
+    for case in cases:
+        start = time.perf_counter()
+        recs = recommender.recommend(dict(case.profile, **profile_overrides), top_n=k)
+        elapsed = time.perf_counter() - start
+        results.append((recs['id'].tolist() if not recs.empty else [], elapsed))
+    return results
+
+
+def ranking_metrics(recommended, relevant, k):
+    """
+    Binary-relevance precision@k, recall@k and nDCG@k for one list.
+    """
+    gains = np.array([1.0 if r in relevant else 0.0 for r in recommended[:k]])
+    hits = gains.sum()
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    dcg = (gains * discounts[:len(gains)]).sum()
+    ideal = discounts[:min(len(relevant), k)].sum()
+    return {
+        'precision': hits / k,
+        'recall': hits / len(relevant) if relevant else 0.0,
+        'ndcg': dcg / ideal if ideal > 0 else 0.0,
+        'hit_rate': float(hits > 0),
+    }
+
+
+def evaluate(config, cases, catalog_size, k=5, n_workers=None, chunk_size=50):
+    """
+    Replays every case through one engine configuration on a process pool.
+
+    Returns: (summary dict of METRICS, list of recommended id lists aligned with cases)
+    """
+    n_workers = n_workers or os.cpu_count()
+    chunks = [cases[i:i + chunk_size] for i in range(0, len(cases), chunk_size)]
+
+    # 'spawn' keeps workers independent of whatever threads the caller runs
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context('spawn'),
+                             initializer=_init_worker, initargs=(config.engine_kwargs,)) as pool:
+        # Engines load once per worker; keep that out of the throughput figure
+        list(pool.map(_replay, [[]] * n_workers, [k] * n_workers, [{}] * n_workers))
+        start = time.perf_counter()
+        replies = list(pool.map(_replay, chunks, [k] * len(chunks), [config.profile_overrides] * len(chunks)))
+        wall = time.perf_counter() - start
+
+    results = [r for chunk in replies for r in chunk]
+    recommended = [ids for ids, _ in results]
+    latencies = np.array([t for _, t in results]) * 1000
+
+    per_case = pd.DataFrame([ranking_metrics(ids, case.relevant, k) for ids, case in zip(recommended, cases)])
+    summary = per_case.mean().to_dict()
+    summary['coverage'] = len({i for ids in recommended for i in ids}) / max(catalog_size, 1)
+    summary['p50_ms'] = float(np.percentile(latencies, 50))
+    summary['p95_ms'] = float(np.percentile(latencies, 95))
+    summary['throughput'] = len(cases) / wall
+    return summary, recommended
+
+
+def compare(baseline, candidate, cases, catalog_size, k=5, n_workers=None):
+    """
+    Evaluates two configurations on the same cases.
+
+    Returns: DataFrame with one row per metric (baseline, candidate, delta), plus
+    'overlap@k': mean Jaccard overlap of the two engines' lists per case.
+    """
+    base_summary, base_lists = evaluate(baseline, cases, catalog_size, k, n_workers)
+    cand_summary, cand_lists = evaluate(candidate, cases, catalog_size, k, n_workers)
+
+    overlap = np.mean([
+        len(set(a) & set(b)) / len(set(a) | set(b)) if (a or b) else 1.0
+        for a, b in zip(base_lists, cand_lists)
+    ])
+    table = pd.DataFrame({baseline.name: base_summary, candidate.name: cand_summary}).loc[METRICS]
+    table['delta'] = table[candidate.name] - table[baseline.name]
+    table.loc[f'overlap@{k}'] = [1.0, overlap, overlap - 1.0]
+    return table
+
+
+def _load_catalog(db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
+    try:
+        return pd.read_sql_query(
+            "SELECT id, type, significance, zone, budget_bucket, google_rating FROM destinations", conn
+        )
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline ranking evaluation of TravelRecommender configurations.")
+    parser.add_argument("--cases", choices=["synthetic", "logged"], default="synthetic")
+    parser.add_argument("--users", type=int, default=1000, help="Synthetic users to simulate")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--baseline", default="{}",
+                        help='JSON config, e.g. \'{"engine_kwargs": {}, "profile_overrides": {}}\'')
+    parser.add_argument("--candidate", default=None,
+                        help='JSON config to diff against the baseline, e.g. \'{"profile_overrides": {"diversity": 0.3}}\'')
+    parser.add_argument("--max-ndcg-drop", type=float, default=None,
+                        help="Exit non-zero if the candidate's nDCG falls more than this below the baseline")
+    args = parser.parse_args()
+
+    catalog = _load_catalog()
+    cases = load_logged_cases() if args.cases == "logged" else synthetic_cases(catalog, n_users=args.users)
+    if not cases:
+        sys.exit("No evaluation cases (no users with positive interactions?)")
+    print(f"Replaying {len(cases):,} {args.cases} profiles against {len(catalog):,} destinations (k={args.k})")
+
+    baseline = EngineConfig("baseline", **json.loads(args.baseline))
+    if args.candidate is None:
+        summary, _ = evaluate(baseline, cases, len(catalog), args.k, args.workers)
+        print(pd.Series(summary)[METRICS].to_string(float_format=lambda v: f"{v:.4f}"))
+    else:
+        candidate = EngineConfig("candidate", **json.loads(args.candidate))
+        table = compare(baseline, candidate, cases, len(catalog), args.k, args.workers)
+        print(table.to_string(float_format=lambda v: f"{v:+.4f}" if v < 0 else f"{v:.4f}"))
+        ndcg_drop = -table.loc['ndcg', 'delta']
+        if args.max_ndcg_drop is not None and ndcg_drop > args.max_ndcg_drop:
+            sys.exit(f"nDCG dropped by {ndcg_drop:.4f}, over the {args.max_ndcg_drop:.4f} budget")
@@ -2,6 +2,7 @@
 import pandas as pd
 import numpy as np
 import pickle
+import hashlib
 import os
 from sklearn.preprocessing import OneHotEncoder, MinMaxScaler
 from sklearn.compose import ColumnTransformer
@@ -10,18 +11,22 @@ from sklearn.compose import ColumnTransformer
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_PATH = os.path.join(PROJECT_ROOT, "data", "processed", "destinations_with_sentiment.csv")
 ARTIFACTS_DIR = os.path.join(PROJECT_ROOT, "data", "artifacts")
+ENCODER_PATH = os.path.join(ARTIFACTS_DIR, "feature_encoder.pkl")
 
 class TravelFeatureEngine:
     def __init__(self):
         self.column_transformer = None
         self.scaler = None
+        # Short content hash of the pickled encoder, so vectors built with
+        # different encoders are never mixed.
+        self.encoder_version = None
         self.feature_columns = [
             'type', 'significance', 'duration_bucket', 
             'budget_bucket', 'zone'
         ]
         self.numerical_columns = ['google_rating', 'sentiment_score', 'review_count']
         
-    def fit_and_save(self, df):
+    def fit_and_save(self, df, path=ENCODER_PATH):
         print("Fitting feature encoders...")
         
         # Rename CSV columns to match DB/clean schema
@@ -44,25 +49,73 @@ class TravelFeatureEngine:
         self.column_transformer.fit(df)
         
         # Save the transformer
-        if not os.path.exists(ARTIFACTS_DIR):
-            os.makedirs(ARTIFACTS_DIR)
+        if not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
             
-        with open(os.path.join(ARTIFACTS_DIR, "feature_encoder.pkl"), "wb") as f:
-            pickle.dump(self.column_transformer, f)
+        payload = pickle.dumps(self.column_transformer)
+        self.encoder_version = hashlib.sha1(payload).hexdigest()[:12]
+        # Written beside the target and swapped in: readers (other processes'
+        # watchers) see the old encoder or the new one, never a partial file
+        tmp_path = f"{path}.{self.encoder_version}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
             
         print("Encoders saved successfully.")
         
-    def load_encoders(self):
-        with open(os.path.join(ARTIFACTS_DIR, "feature_encoder.pkl"), "rb") as f:
-            self.column_transformer = pickle.load(f)
+    def load_encoders(self, path=ENCODER_PATH):
+        with open(path, "rb") as f:
+            self.load_payload(f.read())
+
+    def load_payload(self, payload):
+        """
+        Loads the encoder from its pickled bytes (as saved by fit_and_save).
+        """
+        self.column_transformer = pickle.loads(payload)
+        self.encoder_version = hashlib.sha1(payload).hexdigest()[:12]
+
+    def needs_refit(self, df):
+        """
+        Returns True if any row falls outside what the fitted encoder knows:
+        an unseen category (which handle_unknown='ignore' would silently zero out)
+        or a numeric value outside the MinMaxScaler's fitted range.
+        """
+        if self.column_transformer is None:
+            self.load_encoders()
+
+        if 'google_review_rating' in df.columns:
+            df = df.rename(columns={'google_review_rating': 'google_rating'})
+
+        encoder = self.column_transformer.named_transformers_['cat']
+        for col, categories in zip(self.feature_columns, encoder.categories_):
+            unseen = df[col].notna() & ~df[col].isin(categories)
+            if unseen.any():
+                return True
+
+        scaler = self.column_transformer.named_transformers_['num']
+        values = df[self.numerical_columns].to_numpy(dtype=float)
+        out_of_range = (values < scaler.data_min_) | (values > scaler.data_max_)
+        return bool(out_of_range.any())
     
-    def transform(self, df):
+    def transform(self, df, clip=False):
+        """
+        clip: Saturate numeric columns at the fitted range instead of
+              extrapolating past it. Used for catalog rows, whose live values
+              (e.g. review counts) can outgrow the encoder until it is refitted;
+              user profiles ask for more than the catalog has on purpose.
+        """
         if self.column_transformer is None:
             self.load_encoders()
             
         # Ensure schema matches what was fitted
         if 'google_review_rating' in df.columns:
             df = df.rename(columns={'google_review_rating': 'google_rating'})
+
+        if clip:
+            scaler = self.column_transformer.named_transformers_['num']
+            df = df.copy()
+            df[self.numerical_columns] = df[self.numerical_columns].astype(float).clip(
+                scaler.data_min_, scaler.data_max_, axis=1)
             
         return self.column_transformer.transform(df)
 
@@ -80,8 +133,20 @@ class TravelFeatureEngine:
         }
         """
         # Create a single-row DataFrame
-        user_df = pd.DataFrame([user_dict])
-        
+        return self._transform_profiles(pd.DataFrame([user_dict]))
+
+    def create_user_vectors(self, user_dicts):
+        """
+        Batch version of create_user_vector: one row per profile, in order.
+        """
+        user_df = pd.DataFrame(list(user_dicts))
+        # A field missing from some profiles is unset for them (None, as in a single profile)
+        user_df = user_df.reindex(columns=list(dict.fromkeys([*user_df.columns, *self.feature_columns])))
+        user_df[self.feature_columns] = user_df[self.feature_columns].astype(object).where(
+            user_df[self.feature_columns].notna(), None)
+        return self._transform_profiles(user_df)
+
+    def _transform_profiles(self, user_df):
         # We need to ensure columns exist. 
         # Add numerical cols with "ideal" values
         # e.g., User wants 5.0 rating, 1.0 sentiment, 1000 reviews (popularity)
@@ -0,0 +1,183 @@
+import os
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Get project root (parent of src)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GAZETTEER_PATH = os.path.join(PROJECT_ROOT, "data", "geo", "india_cities.csv")
+
+EARTH_RADIUS_KM = 6371.0
+
+# Distance at which the proximity score has decayed to 1/e
+DECAY_KM = 500.0
+
+# Where a traveller from each sidebar region is assumed to start: a major hub
+# of the region rather than its geometric centre, which is often remote.
+REGION_ORIGINS = {
+    'North': (28.6139, 77.2090),    # Delhi
+    'South': (12.9716, 77.5946),    # Bengaluru
+    'East': (22.5726, 88.3639),     # Kolkata
+    'West': (19.0760, 72.8777),     # Mumbai
+    'Central': (23.2599, 77.4126),  # Bhopal
+}
+
+
+def _key(name):
+    return str(name).strip().casefold()
+
+
+@lru_cache(maxsize=None)
+def load_gazetteer(path=GAZETTEER_PATH):
+    """
+    Returns: DataFrame of city, state, latitude, longitude from the bundled CSV.
+    Read once per path and shared; treat it as read-only.
+    """
+    return pd.read_csv(path)
+
+
+def geocode(cities, states, gazetteer=None):
+    """
+    Offline geocoding of catalog rows by city name.
+
+    Cities are matched case-insensitively; a city missing from the gazetteer
+    falls back to the mean position of its state's known cities.
+
+    Returns: (latitudes, longitudes) as float arrays, NaN where nothing matched.
+    """
+    gazetteer = load_gazetteer() if gazetteer is None else gazetteer
+    by_city = gazetteer.groupby(gazetteer['city'].map(_key))[['latitude', 'longitude']].first()
+    by_state = gazetteer.groupby(gazetteer['state'].map(_key))[['latitude', 'longitude']].mean()
+
+    city_keys = pd.Index(pd.Series(cities).map(_key))
+    state_keys = pd.Index(pd.Series(states).map(_key))
+    coords = by_city.reindex(city_keys).to_numpy()
+    missing = np.isnan(coords[:, 0])
+    if missing.any():
+        coords[missing] = by_state.reindex(state_keys[missing]).to_numpy()
+    return coords[:, 0], coords[:, 1]
+
+
+def haversine_km(latitudes, longitudes, lat, lon):
+    """
+    Great-circle distance (km) from one point to each of the given coordinates.
+    Element-wise, so any subset of rows gets exactly the values the full catalog would.
+    """
+    lat1 = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon1 = np.radians(np.asarray(longitudes, dtype=np.float64))
+    lat2, lon2 = np.radians(lat), np.radians(lon)
+    a = np.sin((lat1 - lat2) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon1 - lon2) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def distance_decay(distances, decay_km=DECAY_KM):
+    """
+    Proximity score in [0, 1]: 1 at the origin, exp(-d / decay_km) further out.
+    Destinations without coordinates score 0.
+    """
+    return np.nan_to_num(np.exp(-np.asarray(distances) / decay_km), nan=0.0)
+
+
+def resolve_origin(profile, gazetteer=None):
+    """
+    The user's location from a profile, or None.
+
+    Checked in order: an explicit 'origin' (lat, lon) pair, an 'origin_city'
+    looked up in the gazetteer, then the 'current_region' hub.
+    """
+    origin = profile.get('origin')
+    if origin is not None:
+        return float(origin[0]), float(origin[1])
+    city = profile.get('origin_city')
+    if city:
+        lat, lon = geocode([city], [None], gazetteer)
+        if not np.isnan(lat[0]):
+            return float(lat[0]), float(lon[0])
+    return REGION_ORIGINS.get(profile.get('current_region'))
+
+
+class GeoGridIndex:
+    """
+    Uniform lat/lon grid over destination positions, for radius queries.
+
+    Rows are sorted by cell key (cell row * width + cell column), so all cells
+    of one grid row that intersect a query's bounding box form one contiguous
+    slice. A query gathers those slices and checks exact haversine distance on
+    them only, instead of scanning the whole catalog.
+    """
+
+    def __init__(self, latitudes, longitudes, cell_degrees=1.0):
+        self.cell_degrees = cell_degrees
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+
+        located = np.flatnonzero(~(np.isnan(self.latitudes) | np.isnan(self.longitudes)))
+        rows = np.floor((self.latitudes[located] + 90.0) / cell_degrees).astype(np.int64)
+        cols = np.floor((self.longitudes[located] + 180.0) / cell_degrees).astype(np.int64)
+        self.width = int(np.ceil(360.0 / cell_degrees)) + 1
+        self.height = int(np.ceil(180.0 / cell_degrees)) + 1
+
+        keys = rows * self.width + cols
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.positions = located[order]
+
+    def __len__(self):
+        return len(self.positions)
+
+    def within(self, lat, lon, radius_km):
+        """
+        Returns: Sorted row positions within radius_km of (lat, lon).
+        """
+        if len(self.positions) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        # Bounding box in degrees; longitude degrees shrink towards the poles
+        dlat = np.degrees(radius_km / EARTH_RADIUS_KM)
+        cos_lat = np.cos(np.radians(min(abs(lat) + dlat, 89.9)))
+        dlon = min(np.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)), 180.0)
+
+        size = self.cell_degrees
+        row_lo = max(int(np.floor((lat - dlat + 90.0) / size)), 0)
+        row_hi = min(int(np.floor((lat + dlat + 90.0) / size)), self.height - 1)
+        col_lo = max(int(np.floor((lon - dlon + 180.0) / size)), 0)
+        col_hi = min(int(np.floor((lon + dlon + 180.0) / size)), self.width - 1)
+
+        grid_rows = np.arange(row_lo, row_hi + 1) * self.width
+        starts = np.searchsorted(self.keys, grid_rows + col_lo, side='left')
+        stops = np.searchsorted(self.keys, grid_rows + col_hi, side='right')
+        if not (stops > starts).any():
+            return np.empty(0, dtype=np.int64)
+        candidates = np.concatenate([self.positions[a:b] for a, b in zip(starts, stops) if b > a])
+
+        distances = haversine_km(self.latitudes[candidates], self.longitudes[candidates], lat, lon)
+        return np.sort(candidates[distances <= radius_km])
+
+
+if __name__ == "__main__":
+    # Benchmark: radius queries on a synthetic catalog spread over India
+    rng = np.random.default_rng(0)
+    n = 1_000_000
+    lats = rng.uniform(8.0, 35.0, n).astype(np.float32)
+    lons = rng.uniform(68.0, 97.0, n).astype(np.float32)
+
+    start = time.perf_counter()
+    index = GeoGridIndex(lats, lons)
+    print(f"Build: {n:,} points in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    origins = list(REGION_ORIGINS.values())
+    for radius in [100, 300, 1000]:
+        start = time.perf_counter()
+        for lat, lon in origins:
+            found = index.within(lat, lon, radius)
+        indexed_ms = (time.perf_counter() - start) / len(origins) * 1000
+
+        start = time.perf_counter()
+        for lat, lon in origins:
+            scanned = np.flatnonzero(haversine_km(lats, lons, lat, lon) <= radius)
+        scan_ms = (time.perf_counter() - start) / len(origins) * 1000
+
+        print(f"{radius:5d} km: grid {indexed_ms:6.1f} ms  full scan {scan_ms:6.1f} ms  "
+              f"({len(found):,} hits, identical={np.array_equal(found, scanned)})")
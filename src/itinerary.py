@@ -0,0 +1,236 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.diversity import SHORTLIST_SIZE
+from src.geo_index import haversine_km, resolve_origin
+from src.visit_calendar import TIMES_OF_DAY
+
+# Sightseeing hours available per trip day
+HOURS_PER_DAY = 8.0
+# Knapsack resolution for time_needed_hrs
+TIME_STEP_HRS = 0.5
+# Average road speed, used to charge inter-city travel against the day's hours
+TRAVEL_SPEED_KMH = 50.0
+# Longest hop between consecutive days' cities ("nearby")
+MAX_HOP_KM = 300.0
+# Used when a destination has no time_needed_hrs
+DEFAULT_VISIT_HRS = 2.0
+
+# Trip length implied by the sidebar's travel time
+TRIP_DAYS = {'Short': 1, 'Medium': 2, 'Long': 3}
+
+
+def best_day(slots, values, capacity):
+    """
+    0/1 knapsack: the subset of items with the highest total value whose
+    slots fit in `capacity`. Vectorised over capacities, one pass per item.
+
+    Returns: (indices of the chosen items, total value)
+    """
+    n = len(slots)
+    table = np.zeros((n + 1, capacity + 1))
+    for i in range(n):
+        table[i + 1] = table[i]
+        if slots[i] <= capacity:
+            with_item = table[i, :capacity + 1 - slots[i]] + values[i]
+            np.maximum(table[i + 1, slots[i]:], with_item, out=table[i + 1, slots[i]:])
+
+    chosen = []
+    c = capacity
+    for i in range(n, 0, -1):
+        if table[i, c] != table[i - 1, c]:
+            chosen.append(i - 1)
+            c -= slots[i - 1]
+    return chosen[::-1], table[n, capacity]
+
+
+def plan_trip(destinations, candidates, scores, days, budget=None, origin=None,
+              hours_per_day=HOURS_PER_DAY, max_hop_km=MAX_HOP_KM):
+    """
+    Orienteering heuristic over a ranked shortlist.
+
+    Candidates are grouped by city. Each day, every city with unused places
+    proposes its best one-day plan (a knapsack over its places' visit hours,
+    less the travel time to get there), and the most valuable proposal that
+    fits the remaining budget is taken. Cities further than max_hop_km from
+    the previous day's city are not considered.
+
+    A city's proposal only changes when its own places are used or its travel
+    time changes, so proposals are memoised per (city, unused places, hours)
+    and most cities are solved once per trip.
+
+    Args:
+        destinations (DestinationStore): Catalog snapshot.
+        candidates (array): Row positions of the shortlist.
+        scores (array): Match scores aligned with candidates (the value of a visit).
+        days (int): Trip length.
+        budget (float): Total entrance fees allowed (None = unlimited).
+        origin ((lat, lon)): Where the trip starts, if known.
+
+    Returns: List of (day, row positions in visiting order, travel km to reach that day's city)
+    """
+    if len(candidates) == 0:
+        return []
+
+    hours = np.asarray(destinations['time_needed_hrs'][candidates], dtype=np.float64)
+    hours = np.where(np.isnan(hours) | (hours <= 0), DEFAULT_VISIT_HRS, hours)
+    slots = np.ceil(hours / TIME_STEP_HRS).astype(np.int64)
+    fees = np.nan_to_num(np.asarray(destinations['entrance_fee'][candidates], dtype=np.float64))
+    scores = np.asarray(scores, dtype=np.float64)
+    visit_times = np.asarray(destinations['visit_times'][candidates])
+    lats = np.asarray(destinations['latitude'][candidates], dtype=np.float64)
+    lons = np.asarray(destinations['longitude'][candidates], dtype=np.float64)
+
+    # Per-city groups of shortlist indices (kept in score order)
+    city_ids, city_of = np.unique(destinations['city'].codes[candidates], return_inverse=True)
+    order = np.argsort(city_of, kind='stable')
+    groups = np.split(order, np.cumsum(np.bincount(city_of, minlength=len(city_ids)))[:-1])
+    # City centre = mean position of its geocoded places (NaN if none)
+    located = ~np.isnan(lats)
+    counts = np.bincount(city_of[located], minlength=len(city_ids))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centre_lats = np.bincount(city_of[located], lats[located], minlength=len(city_ids)) / counts
+        centre_lons = np.bincount(city_of[located], lons[located], minlength=len(city_ids)) / counts
+
+    used = np.zeros(len(candidates), dtype=bool)
+    remaining_budget = np.inf if budget is None else float(budget)
+    memo = {}
+    location = origin
+    plan = []
+
+    for day in range(1, days + 1):
+        if location is not None:
+            hops = np.nan_to_num(haversine_km(centre_lats, centre_lons, *location))
+        else:
+            hops = np.zeros(len(groups))
+        capacities = ((hours_per_day - hops / TRAVEL_SPEED_KMH) / TIME_STEP_HRS).astype(np.int64)
+        # The first day may start far from home; later days stay nearby
+        reachable = (capacities > 0) & ((day == 1) | (hops <= max_hop_km))
+
+        best = None
+        for city in np.flatnonzero(reachable):
+            items = groups[city]
+            available = items[~used[items]]
+            if len(available) == 0:
+                continue
+            hop_km, capacity = float(hops[city]), int(capacities[city])
+
+            key = (city, available.tobytes(), capacity)
+            if key not in memo:
+                picked, _ = best_day(slots[available], scores[available], capacity)
+                memo[key] = available[picked]
+            chosen = memo[key]
+
+            # Over budget: drop the least valuable visits until it fits
+            if fees[chosen].sum() > remaining_budget:
+                chosen = chosen[np.argsort(-scores[chosen], kind='stable')]
+                within = np.cumsum(fees[chosen]) <= remaining_budget
+                chosen = chosen[within]
+            if len(chosen) == 0:
+                continue
+
+            value = scores[chosen].sum()
+            if best is None or value > best[0]:
+                best = (value, city, chosen, hop_km)
+
+        if best is None:
+            break
+        _, city, chosen, hop_km = best
+        used[chosen] = True
+        remaining_budget -= fees[chosen].sum()
+        location = (centre_lats[city], centre_lons[city])
+
+        # Within a day: earliest suitable time of day first, then best match
+        earliest = np.array([(int(t) & -int(t)).bit_length() if t else len(TIMES_OF_DAY) for t in visit_times[chosen]])
+        order = np.lexsort((-scores[chosen], earliest))
+        plan.append((day, candidates[chosen[order]], hop_km))
+
+    return plan
+
+
+class ItineraryPlanner:
+    """
+    Packs recommender results into a day-by-day trip that fits the user's
+    time and budget.
+    """
+
+    def __init__(self, recommender, shortlist_size=SHORTLIST_SIZE):
+        self.recommender = recommender
+        self.shortlist_size = shortlist_size
+
+    def plan(self, user_profile, days=None, budget=None):
+        """
+        Args:
+            user_profile (dict): Same profile recommend() takes.
+            days (int): Trip length (default: from the profile's duration_bucket).
+            budget (float): Total entrance fees (default: profile's 'max_budget_inr').
+
+        Returns:
+            DataFrame: One row per stop with 'day', 'stop', 'match_score' and
+            'travel_km' (distance to reach the day's city, on its first stop).
+        """
+        days = days or TRIP_DAYS.get(user_profile.get('duration_bucket'), 1)
+        budget = budget if budget is not None else user_profile.get('max_budget_inr')
+
+        # The trip length is enforced by the planner, so the per-place duration
+        # filter for fixed schedules would only hide useful short visits
+        shortlist_profile = dict(user_profile, job_type='Flexible', diversity=0.0)
+        state, top, scores = self.recommender.rank(shortlist_profile, self.shortlist_size)
+        if state.vectors is None or len(top) == 0:
+            return pd.DataFrame()
+
+        trip = plan_trip(state.destinations, top, scores, days, budget=budget,
+                         origin=resolve_origin(user_profile))
+        if not trip:
+            return pd.DataFrame()
+
+        positions = np.concatenate([stops for _, stops, _ in trip])
+        stops = state.destinations.take(positions)
+        score_of = dict(zip(top.tolist(), scores.tolist()))
+        stops['match_score'] = [score_of[p] for p in positions.tolist()]
+        stops['day'] = np.concatenate([[day] * len(s) for day, s, _ in trip])
+        stops['stop'] = np.concatenate([np.arange(1, len(s) + 1) for _, s, _ in trip])
+        stops['travel_km'] = np.concatenate([[hop] + [0.0] * (len(s) - 1) for _, s, hop in trip])
+        return stops
+
+
+if __name__ == "__main__":
+    # Benchmark: planning latency vs. shortlist size on a large synthetic catalog
+    from src.destination_store import DestinationStore
+
+    rng = np.random.default_rng(0)
+    n, n_cities = 500_000, 2_000
+    city_lat = rng.uniform(8.0, 34.0, n_cities)
+    city_lon = rng.uniform(69.0, 95.0, n_cities)
+    city = rng.integers(0, n_cities, n)
+    catalog = pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'city': pd.Categorical([f"City {c}" for c in city]),
+        'time_needed_hrs': rng.choice([0.5, 1.0, 1.5, 2.0, 3.0, 4.0, 6.0], n),
+        'entrance_fee': rng.choice([0.0, 0.0, 20.0, 50.0, 100.0, 500.0], n),
+        'visit_times': rng.choice([15, 1, 2, 4, 8], n),
+        'latitude': city_lat[city] + rng.normal(0, 0.05, n),
+        'longitude': city_lon[city] + rng.normal(0, 0.05, n),
+    })
+    destinations = DestinationStore.from_frame(catalog)
+    print(f"Synthetic catalog: {n:,} destinations in {n_cities:,} cities")
+
+    for shortlist in [200, 1_000, 5_000]:
+        for days in [1, 3, 7]:
+            timings = []
+            for _ in range(20):
+                # A shortlist concentrated in a region, like a real zone-filtered query
+                centre = rng.integers(0, n_cities)
+                near = np.flatnonzero(haversine_km(catalog['latitude'], catalog['longitude'],
+                                                   city_lat[centre], city_lon[centre]) < 600)
+                candidates = np.sort(rng.choice(near, min(shortlist, len(near)), replace=False))
+                scores = np.sort(rng.random(len(candidates)))[::-1]
+                start = time.perf_counter()
+                trip = plan_trip(destinations, candidates, scores, days, budget=1_000,
+                                 origin=(city_lat[centre], city_lon[centre]))
+                timings.append(time.perf_counter() - start)
+            stops = sum(len(s) for _, s, _ in trip)
+            print(f"shortlist {shortlist:5,d}, {days} days: {np.mean(timings) * 1000:6.2f} ms  "
+                  f"(last trip: {len(trip)} days, {stops} stops)")
@@ -1,29 +1,47 @@
 import requests
 import json
+import math
 import logging
+from contextlib import nullcontext
 from src.config import GEMINI_API_KEY, GEMINI_MODEL
+from src.api_scheduler import QuotaExceeded, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from src.degradation import UPSTREAM_TIMEOUT
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class TravelLLMExplainer:
-    def __init__(self):
+    def __init__(self, scheduler=None, controller=None):
+        """
+        scheduler: Optional ApiScheduler shared across sessions; calls then
+                   wait their turn for the 'gemini' quota instead of racing for it.
+        controller: Optional DegradationController; while it reports degraded
+                    mode Gemini isn't called and the rule-based explanation is used.
+        """
+        self.scheduler = scheduler
+        self.controller = controller
         self.api_key = GEMINI_API_KEY
         self.model = GEMINI_MODEL
         self.api_url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:generateContent?key={self.api_key}"
 
-    def generate_detailed_explanation(self, destination, user_profile):
+    def generate_detailed_explanation(self, destination, user_profile, priority=PRIORITY_INTERACTIVE):
         """
         Generates a personalized explanation using Gemini API.
         
         Args:
             destination (dict): Destination details (name, reviews, type, etc.)
             user_profile (dict): User preferences.
+            priority (int): Scheduler priority (PRIORITY_BACKGROUND for prefetch).
             
         Returns:
             str: Generated text or fallback message.
         """
+        if self.controller is not None and self.controller.degraded:
+            # Under load: no prefetching at all, and the rule-based text for users
+            if priority == PRIORITY_BACKGROUND:
+                return None
+            return destination.get('explanation') or "Live guide notes are paused while we're busy. Please try again shortly."
         
         # Construct the prompt
         prompt = f"""
@@ -60,7 +78,11 @@ class TravelLLMExplainer:
         headers = {'Content-Type': 'application/json'}
         
         try:
-            response = requests.post(self.api_url, headers=headers, data=json.dumps(payload))
+            post = lambda: self._post(headers, payload)
+            if self.scheduler is not None:
+                response = self.scheduler.call('gemini', post, priority)
+            else:
+                response = post()
             
             if response.status_code == 200:
                 result = response.json()
@@ -74,11 +96,20 @@ class TravelLLMExplainer:
             else:
                 logger.error(f"API Error {response.status_code}: {response.text}")
                 return "Service temporarily unavailable."
+
+        except QuotaExceeded as e:
+            # Rejected up front rather than left to time out
+            logger.warning(f"Gemini call not admitted: {e}")
+            return f"Our guide is busy right now. Please try again in {math.ceil(e.retry_after)} seconds."
                 
         except Exception as e:
             logger.error(f"Exception calling Gemini API: {e}")
             return "Could not connect to explanation service."
 
+    def _post(self, headers, payload):
+        with self.controller.track('gemini') if self.controller is not None else nullcontext():
+            return requests.post(self.api_url, headers=headers, data=json.dumps(payload), timeout=UPSTREAM_TIMEOUT)
+
 if __name__ == "__main__":
     # Test Block
     explainer = TravelLLMExplainer()
@@ -0,0 +1,216 @@
+import os
+import time
+import hashlib
+import threading
+import logging
+
+import requests
+
+from src.degradation import UPSTREAM_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Get project root (parent of src)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Streamlit serves ./static (next to app.py) at app/static/ when
+# server.enableStaticServing is on (see .streamlit/config.toml)
+MEDIA_DIR = os.path.join(PROJECT_ROOT, "static", "media")
+MEDIA_URL_PREFIX = "app/static/media"
+
+MAX_CACHE_BYTES = 200 * 2**20   # Total size of cached files before the least recently used go
+MAX_ITEM_BYTES = 5 * 2**20      # Larger downloads are not cached
+RETRY_AFTER = 300.0             # Seconds before a failed URL is tried again
+TOUCH_INTERVAL = 3600.0         # Recency is written back to disk at most this often per file
+
+# Leading bytes of the image formats we cache, and the extension they are stored with
+IMAGE_SIGNATURES = [
+    (b'\xff\xd8\xff', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', '.png'),
+    (b'GIF87a', '.gif'),
+    (b'GIF89a', '.gif'),
+]
+
+
+def sniff_extension(head):
+    """
+    File extension for an image from its first bytes, or None if it isn't one we serve.
+    """
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return '.webp'
+    for signature, extension in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    return None
+
+
+class MediaCache:
+    """
+    Size-bounded on-disk LRU of remote images (vlog thumbnails, the hero image),
+    served by the app host itself instead of fetched remotely on every view.
+
+    Files are named by a hash of their source URL and never change once
+    written, so their URLs carry a ?v= version: Streamlit's static file
+    handler then sends far-future Cache-Control/Expires headers and browsers
+    stop asking at all. Recency is tracked by file mtime, so the LRU order
+    survives restarts.
+    """
+
+    def __init__(self, cache_dir=MEDIA_DIR, max_bytes=MAX_CACHE_BYTES, url_prefix=MEDIA_URL_PREFIX, controller=None):
+        """
+        controller: Optional DegradationController; while degraded, uncached
+                    images are left to the browser instead of downloaded here.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.url_prefix = url_prefix
+        self.controller = controller
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._files = {}       # digest -> [file name, size, last used]
+        self._failed = {}      # digest -> time of the last failed download
+        self._fetching = {}    # digest -> lock held while it downloads (present until it finishes)
+        self._lock = threading.Lock()
+        for name in os.listdir(cache_dir):
+            digest, extension = os.path.splitext(name)
+            if extension and not name.endswith('.tmp'):
+                stat = os.stat(os.path.join(cache_dir, name))
+                self._files[digest] = [name, stat.st_size, stat.st_mtime]
+        self._total = sum(size for _, size, _ in self._files.values())
+
+    @staticmethod
+    def digest(url):
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()[:20]
+
+    def url_for(self, url):
+        """
+        Where the browser should load `url` from: the cached copy on the app
+        host, or `url` itself while it isn't cached (or can't be). Never
+        downloads on the caller's thread; a miss is fetched in the background
+        and served locally from a later render on.
+        """
+        digest = self.digest(url)
+        name = self._hit(digest)
+        if name is not None:
+            return f"{self.url_prefix}/{name}?v={digest}"
+        fetch_lock = self._claim(digest)
+        if fetch_lock is not None:
+            threading.Thread(target=self._fill, args=(url, digest, fetch_lock),
+                             name="media-cache-fill", daemon=True).start()
+        return url
+
+    def path_for(self, url):
+        """
+        Local path of the cached copy of `url` (downloading it if needed), or None.
+        """
+        digest = self.digest(url)
+        name = self._hit(digest)
+        if name is None:
+            # Already being fetched elsewhere: wait for that download instead
+            with self._lock:
+                fetch_lock = self._fetching.get(digest)
+            fetch_lock = fetch_lock or self._claim(digest)
+            if fetch_lock is not None:
+                name = self._fill(url, digest, fetch_lock)
+        return os.path.join(self.cache_dir, name) if name is not None else None
+
+    def _claim(self, digest):
+        """
+        Registers a download of `digest`. Returns the lock to run it under, or
+        None if it is already running, failed recently, or the app is degraded.
+        """
+        if self.controller is not None and self.controller.degraded:
+            return None
+        with self._lock:
+            failed_at = self._failed.get(digest)
+            if failed_at is not None and time.time() - failed_at < RETRY_AFTER:
+                return None
+            if digest in self._fetching:
+                return None
+            fetch_lock = self._fetching[digest] = threading.Lock()
+        return fetch_lock
+
+    def _fill(self, url, digest, fetch_lock):
+        # One download per URL; path_for callers wanting the same image wait for it
+        try:
+            with fetch_lock:
+                name = self._hit(digest)
+                if name is None:
+                    self.misses += 1
+                    name = self._download(url, digest)
+        finally:
+            with self._lock:
+                self._fetching.pop(digest, None)
+        return name
+
+    def _hit(self, digest):
+        with self._lock:
+            entry = self._files.get(digest)
+            if entry is None:
+                return None
+            self.hits += 1
+            now = time.time()
+            if now - entry[2] >= TOUCH_INTERVAL:
+                try:
+                    os.utime(os.path.join(self.cache_dir, entry[0]))
+                except FileNotFoundError:
+                    del self._files[digest]
+                    self._total -= entry[1]
+                    return None
+            entry[2] = now
+            return entry[0]
+
+    def _download(self, url, digest):
+        try:
+            response = requests.get(url, timeout=UPSTREAM_TIMEOUT, stream=True)
+            response.raise_for_status()
+            content = bytearray()
+            for chunk in response.iter_content(64 * 1024):
+                content += chunk
+                if len(content) > MAX_ITEM_BYTES:
+                    raise ValueError(f"larger than {MAX_ITEM_BYTES} bytes")
+            extension = sniff_extension(bytes(content[:16]))
+            if extension is None:
+                raise ValueError("not an image")
+        except Exception as e:
+            logger.warning(f"Could not cache {url}: {e}")
+            with self._lock:
+                self._failed[digest] = time.time()
+            return None
+
+        name = digest + extension
+        path = os.path.join(self.cache_dir, name)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._files[digest] = [name, len(content), time.time()]
+            self._total += len(content)
+            self._failed.pop(digest, None)
+            self._evict(keep=digest)
+        return name
+
+    def _evict(self, keep):
+        """
+        Drops least recently used files until the cache fits in max_bytes.
+        """
+        if self._total <= self.max_bytes:
+            return
+        for digest, (name, size, _) in sorted(self._files.items(), key=lambda item: item[1][2]):
+            if self._total <= self.max_bytes:
+                break
+            if digest == keep:
+                continue
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+            del self._files[digest]
+            self._total -= size
+
+    def stats(self):
+        with self._lock:
+            return {'files': len(self._files), 'bytes': self._total, 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,383 @@
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import hashlib
+import argparse
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import pandas as pd
+
+# Add project root to path (this file is run as a script)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import process_data, setup_database
+from src.feature_engine import TravelFeatureEngine, ENCODER_PATH
+from src.vector_store import DestinationVectorStore
+from src.similarity_index import SimilarityIndex, INDEX_PATH, snapshot_fingerprint
+from src.search_index import SearchIndex, SEARCH_INDEX_PATH, SEARCH_COLUMNS, text_fingerprint
+from src.review_store import ReviewStore
+from src.recommender import DB_PATH, read_catalog
+from src import arrow_catalog
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(PROJECT_ROOT, "src")
+BUNDLES_DIR = os.path.join(PROJECT_ROOT, "data", "bundles")
+# Working directory of the latest build; stage outputs are reused from here
+BUILD_DIR = os.path.join(BUNDLES_DIR, "build")
+STATE_FILE = "pipeline_state.json"
+MANIFEST_FILE = "manifest.json"
+# Record of the bundle currently deployed to the serving paths
+DEPLOYED_MANIFEST = os.path.join(PROJECT_ROOT, "data", "artifacts", "bundle.json")
+
+# User-owned tables copied from the live database into a bundle on publish
+CARRY_OVER_TABLES = ['users', 'interactions']
+
+# A build step. `inputs`/`outputs` are artifact names (see artifact_paths);
+# `code` lists the modules whose source is hashed into the stage key, so
+# editing the code reruns the stage just like editing its data.
+Stage = namedtuple('Stage', ['name', 'inputs', 'outputs', 'code', 'run'])
+
+
+def artifact_paths(build_dir=BUILD_DIR):
+    return {
+        'raw_destinations': process_data.DEST_FILE,
+        'raw_reviews': process_data.REVIEW_FILE,
+        # The processed CSV stays where it's tracked, so hand edits to it feed the build
+        'processed': process_data.OUTPUT_FILE,
+        'encoder': os.path.join(build_dir, "feature_encoder.pkl"),
+        'database': os.path.join(build_dir, "travel.db"),
+        'similarity_index': os.path.join(build_dir, "similarity_index.npz"),
+        'search_index': os.path.join(build_dir, "search_index.npz"),
+        'arrow_catalog': os.path.join(build_dir, "catalog.arrow"),
+    }
+
+
+# Artifacts that make up a bundle, with where each is deployed
+SERVING_PATHS = {
+    'search_index': SEARCH_INDEX_PATH,
+    'similarity_index': INDEX_PATH,
+    'encoder': ENCODER_PATH,
+    'database': DB_PATH,
+}
+
+
+def _process(paths):
+    process_data.main(paths['raw_destinations'], paths['raw_reviews'], paths['processed'])
+
+
+def _encoder(paths):
+    TravelFeatureEngine().fit_and_save(pd.read_csv(paths['processed']), path=paths['encoder'])
+
+
+def _database(paths):
+    setup_database.init_db(paths['database'])
+    setup_database.populate_destinations(paths['database'], paths['processed'])
+    # Seeded sentiment dates from the processed data, not the build, so
+    # rebuilding the same data gives a byte-identical database
+    setup_database.init_reviews(paths['database'], seeded_at=int(os.path.getmtime(paths['processed'])))
+
+
+def _similarity_index(paths):
+    # Same catalog read and encoding as TravelRecommender, so the fingerprint
+    # matches and the serving node loads this table instead of rebuilding it
+    engine = TravelFeatureEngine()
+    engine.load_encoders(paths['encoder'])
+    snapshot = DestinationVectorStore(engine).load(read_catalog(paths['database']), feature_engine=engine)
+    index = SimilarityIndex().build(snapshot.destinations.ids, snapshot.vectors,
+                                    fingerprint=snapshot_fingerprint(snapshot))
+    index.save(paths['similarity_index'])
+
+
+def _search_index(paths):
+    conn = sqlite3.connect(paths['database'])
+    texts = pd.read_sql_query(f"SELECT id, {', '.join(SEARCH_COLUMNS)} FROM destinations", conn)
+    conn.close()
+    index = SearchIndex().build(texts['id'], texts, fingerprint=text_fingerprint(texts['id'], texts))
+    index.save(paths['search_index'])
+
+
+def _arrow_catalog(paths):
+    arrow_catalog.write_catalog(paths['database'], paths['arrow_catalog'], encoder_path=paths['encoder'])
+
+
+STAGES = [
+    Stage('process', ['raw_destinations', 'raw_reviews'], ['processed'],
+          ['process_data.py', 'sentiment.py'], _process),
+    Stage('encoder', ['processed'], ['encoder'], ['feature_engine.py'], _encoder),
+    Stage('database', ['processed'], ['database'], ['setup_database.py', 'review_store.py'], _database),
+    Stage('similarity_index', ['database', 'encoder'], ['similarity_index'],
+          ['recommender.py', 'vector_store.py', 'similarity_index.py', 'geo_index.py', 'visit_calendar.py'],
+          _similarity_index),
+    Stage('search_index', ['database'], ['search_index'], ['search_index.py'], _search_index),
+]
+if arrow_catalog.available():
+    # Memory-mapped catalog for read-only serving nodes (needs pyarrow)
+    STAGES.append(Stage('arrow_catalog', ['database', 'encoder'], ['arrow_catalog'],
+                        ['arrow_catalog.py', 'recommender.py', 'vector_store.py', 'destination_store.py',
+                         'geo_index.py', 'visit_calendar.py'],
+                        _arrow_catalog))
+    SERVING_PATHS = {'arrow_catalog': arrow_catalog.CATALOG_PATH, **SERVING_PATHS}
+
+
+class ContentHasher:
+    """
+    SHA-1 of files, memoised on (size, mtime) so unchanged inputs aren't re-read
+    on every build. The memo is persisted with the pipeline state.
+    """
+
+    def __init__(self, memo=None):
+        self.memo = memo or {}
+        self._lock = threading.Lock()
+
+    def __call__(self, path):
+        stat = os.stat(path)
+        key = [stat.st_size, stat.st_mtime_ns]
+        with self._lock:
+            cached = self.memo.get(path)
+        if cached is not None and cached[:2] == key:
+            return cached[2]
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        with self._lock:
+            self.memo[path] = key + [digest.hexdigest()]
+        return digest.hexdigest()
+
+
+class Pipeline:
+    """
+    Builds the serving artifacts (database, encoder, similarity and search
+    indexes) from the raw CSVs as a DAG of stages.
+
+    Each stage is keyed by the content hashes of its inputs and code. A stage
+    whose key and outputs match the last run is skipped, so a small data edit
+    only reruns what depends on it. Stages whose inputs are ready run in
+    parallel. The result is packed into a versioned bundle that publish()
+    deploys.
+    """
+
+    def __init__(self, stages=STAGES, build_dir=BUILD_DIR, bundles_dir=BUNDLES_DIR, n_workers=4):
+        self.stages = {stage.name: stage for stage in stages}
+        self.build_dir = build_dir
+        self.bundles_dir = bundles_dir
+        self.paths = artifact_paths(build_dir)
+        self.n_workers = n_workers
+        self.state_path = os.path.join(build_dir, STATE_FILE)
+        self.state = {'stages': {}, 'hashes': {}}
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                self.state = json.load(f)
+        self.hash = ContentHasher(self.state['hashes'])
+        self._lock = threading.Lock()
+
+    def _producers(self):
+        return {output: stage.name for stage in self.stages.values() for output in stage.outputs}
+
+    def _stage_key(self, stage):
+        digest = hashlib.sha1(stage.name.encode())
+        for name in stage.inputs:
+            digest.update(f"{name}={self.hash(self.paths[name])}".encode())
+        for module in stage.code:
+            digest.update(f"{module}={self.hash(os.path.join(SRC_DIR, module))}".encode())
+        return digest.hexdigest()
+
+    def _outputs_intact(self, stage, record):
+        for name in stage.outputs:
+            path = self.paths[name]
+            if not os.path.exists(path) or self.hash(path) != record['outputs'].get(name):
+                return False
+        return True
+
+    def _save_state(self):
+        with self._lock:
+            payload = json.dumps(self.state, indent=1, sort_keys=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(payload)
+        os.replace(tmp_path, self.state_path)
+
+    def _execute(self, stage, force=False):
+        """
+        Runs one stage unless it's up to date. Returns its status.
+        """
+        missing = [name for name in stage.inputs if not os.path.exists(self.paths[name])]
+        if missing:
+            if all(os.path.exists(self.paths[name]) for name in stage.outputs):
+                # e.g. the raw review dump isn't in this checkout: build from the tracked processed CSV
+                return f"inputs unavailable ({', '.join(missing)}), using existing output"
+            raise FileNotFoundError(f"Stage '{stage.name}' is missing inputs: {missing}")
+
+        key = self._stage_key(stage)
+        record = self.state['stages'].get(stage.name)
+        if not force and record is not None and record['key'] == key and self._outputs_intact(stage, record):
+            return "up to date"
+
+        start = time.perf_counter()
+        stage.run(self.paths)
+        record = {'key': key, 'outputs': {name: self.hash(self.paths[name]) for name in stage.outputs}}
+        with self._lock:
+            self.state['stages'][stage.name] = record
+        self._save_state()
+        return f"built in {time.perf_counter() - start:.2f}s"
+
+    def build(self, force=()):
+        """
+        Runs every stage in dependency order, independent ones in parallel.
+
+        Args:
+            force: Stage names to rerun even if up to date.
+
+        Returns: {stage name: status}
+        """
+        os.makedirs(self.build_dir, exist_ok=True)
+        producers = self._producers()
+        deps = {name: {producers[i] for i in stage.inputs if i in producers}
+                for name, stage in self.stages.items()}
+        done, running, statuses = set(), {}, {}
+
+        with ThreadPoolExecutor(max_workers=self.n_workers) as executor:
+            while len(done) < len(self.stages):
+                for name, stage in self.stages.items():
+                    if name not in done and name not in running.values() and deps[name] <= done:
+                        running[executor.submit(self._execute, stage, name in force)] = name
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    statuses[name] = future.result()  # A failed stage stops the build
+                    print(f"[{name}] {statuses[name]}")
+                    done.add(name)
+        return statuses
+
+    def bundle(self):
+        """
+        Packs the serving artifacts of the last build into data/bundles/<id>/,
+        where <id> is derived from their content. Rebuilding unchanged data
+        gives the same bundle.
+
+        Returns: Path of the bundle directory.
+        """
+        artifacts = {name: {'file': os.path.basename(self.paths[name]), 'sha1': self.hash(self.paths[name]),
+                            'bytes': os.path.getsize(self.paths[name])}
+                     for name in SERVING_PATHS}
+        bundle_id = hashlib.sha1(json.dumps(artifacts, sort_keys=True).encode()).hexdigest()[:12]
+        bundle_dir = os.path.join(self.bundles_dir, bundle_id)
+        if os.path.exists(os.path.join(bundle_dir, MANIFEST_FILE)):
+            return bundle_dir
+
+        # Assembled next to its final place and renamed, so a bundle directory is always complete
+        tmp_dir = f"{bundle_dir}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for name, artifact in artifacts.items():
+            shutil.copy2(self.paths[name], os.path.join(tmp_dir, artifact['file']))
+        manifest = {
+            'bundle_id': bundle_id,
+            'created_at': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            'artifacts': artifacts,
+            'stages': {name: record['key'] for name, record in self.state['stages'].items()},
+        }
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp_dir, bundle_dir)
+        return bundle_dir
+
+
+def _carry_over(staged_db, live_db):
+    """
+    Copies user-owned rows (and submitted reviews) from the live database into
+    a staged copy of the bundle's, so publishing a catalog doesn't lose them.
+    Returns: True if replayed reviews changed the staged destinations.
+    """
+    if not os.path.exists(live_db):
+        return False
+    conn = sqlite3.connect(staged_db)
+    try:
+        conn.execute("ATTACH DATABASE ? AS live", (live_db,))
+        for table in CARRY_OVER_TABLES:
+            live_columns = {row[1] for row in conn.execute(f"PRAGMA live.table_info({table})")}
+            columns = [row[1] for row in conn.execute(f"PRAGMA main.table_info({table})") if row[1] in live_columns]
+            if not columns:
+                continue
+            column_list = ', '.join(columns)
+            conn.execute(f"DELETE FROM main.{table}")
+            conn.execute(f"INSERT INTO main.{table} ({column_list}) SELECT {column_list} FROM live.{table}")
+        has_reviews = conn.execute(
+            "SELECT 1 FROM live.sqlite_master WHERE type = 'table' AND name = 'reviews'").fetchone()
+        reviews = conn.execute(
+            "SELECT destination_id, text, created_at FROM live.reviews ORDER BY id").fetchall() if has_reviews else []
+        conn.commit()
+        conn.execute("DETACH DATABASE live")
+    finally:
+        conn.close()
+    if reviews:
+        # Replayed, not copied, so the new catalog's sentiment aggregates include them
+        ids, texts, timestamps = zip(*reviews)
+        ReviewStore(staged_db).add_reviews(list(ids), list(texts), list(timestamps))
+    return bool(reviews)
+
+
+def publish(bundle_dir, serving_paths=SERVING_PATHS, live_db=DB_PATH):
+    """
+    Deploys a bundle to the serving paths.
+
+    Every file is staged beside its target and swapped in with os.replace, so
+    readers see either the old or the new file, never a partial one. Indexes go
+    first and the database last: the CatalogWatcher's next poll then sees the
+    new encoder and database together, and the reload finds indexes whose
+    fingerprints already match. Should a poll land mid-publish, the mismatched
+    index is simply rebuilt. If live reviews are replayed into the database,
+    the Arrow catalog is re-encoded from it before anything is swapped in.
+    """
+    with open(os.path.join(bundle_dir, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+
+    staged = {}
+    try:
+        for name, target in serving_paths.items():
+            artifact = manifest['artifacts'][name]
+            source = os.path.join(bundle_dir, artifact['file'])
+            if ContentHasher()(source) != artifact['sha1']:
+                raise ValueError(f"Bundle {manifest['bundle_id']} is corrupt: {artifact['file']} doesn't match its hash")
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            staged[name] = f"{target}.{os.getpid()}.tmp"
+            shutil.copy2(source, staged[name])
+        if _carry_over(staged['database'], live_db) and 'arrow_catalog' in staged:
+            # The bundle's Arrow catalog predates the replayed reviews; rebuild
+            # it from the staged database so both serving paths agree
+            encoder = os.path.join(bundle_dir, manifest['artifacts']['encoder']['file'])
+            arrow_catalog.write_catalog(staged['database'], staged['arrow_catalog'], encoder_path=encoder)
+
+        for name, target in serving_paths.items():
+            os.replace(staged.pop(name), target)
+    finally:
+        for path in staged.values():
+            if os.path.exists(path):
+                os.remove(path)
+
+    tmp_path = f"{DEPLOYED_MANIFEST}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, DEPLOYED_MANIFEST)
+    return manifest['bundle_id']
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the serving artifacts from the raw data, reusing unchanged stages.")
+    parser.add_argument("--force", nargs="*", default=[], metavar="STAGE",
+                        help=f"Rerun these stages even if up to date (any of: {', '.join(s.name for s in STAGES)})")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--publish", action="store_true", help="Deploy the bundle to the serving paths")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    pipeline = Pipeline(n_workers=args.workers)
+    pipeline.build(force=set(args.force))
+    bundle_dir = pipeline.bundle()
+    print(f"Bundle ready: {bundle_dir} ({time.perf_counter() - start:.2f}s)")
+    if args.publish:
+        print(f"Published bundle {publish(bundle_dir)}.")
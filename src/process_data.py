@@ -3,18 +3,16 @@ import pandas as pd
 import numpy as np
 import os
 import re
-import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
+import sys
 
-# Download VADER lexicon if not present
-try:
-    nltk.data.find('sentiment/vader_lexicon.zip')
-except LookupError:
-    nltk.download('vader_lexicon')
+# Add project root to path (this file is run as a script)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.sentiment import VaderScorer
 
 # Paths
-RAW_DIR = r"D:\Travel RS\data\raw"
-PROCESSED_DIR = r"D:\Travel RS\data\processed"
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW_DIR = os.path.join(PROJECT_ROOT, "data", "raw")
+PROCESSED_DIR = os.path.join(PROJECT_ROOT, "data", "processed")
 DEST_FILE = os.path.join(RAW_DIR, "Top Indian Places to Visit.csv")
 REVIEW_FILE = os.path.join(RAW_DIR, "tripadvisor_hotel_reviews.csv")
 OUTPUT_FILE = os.path.join(PROCESSED_DIR, "destinations_with_sentiment.csv")
@@ -55,8 +53,8 @@ def clean_destinations(df):
 def synthetic_review_mapping(dest_df, review_df):
     print("Performing Synthetic Review Mapping...")
     
-    # Initialize VADER
-    sia = SentimentIntensityAnalyzer()
+    # Initialize VADER (vendored lexicon, no nltk download needed)
+    sia = VaderScorer()
     
     # Add sentiment columns
     dest_df['sentiment_score'] = 0.0
@@ -73,6 +71,7 @@ def synthetic_review_mapping(dest_df, review_df):
     # Else -> Assign mixed reviews
     
     processed_count = 0
+    assigned = {}
     
     for idx, row in dest_df.iterrows():
         rating = row['Google review rating']
@@ -97,11 +96,7 @@ def synthetic_review_mapping(dest_df, review_df):
                 elif positive_reviews:
                     chosen_reviews.append(np.random.choice(positive_reviews))
         
-        # 3. Calculate Average Sentiment Score using VADER
-        scores = [sia.polarity_scores(r)['compound'] for r in chosen_reviews]
-        avg_score = np.mean(scores) if scores else 0.0
-        
-        dest_df.at[idx, 'sentiment_score'] = round(avg_score, 4)
+        assigned[idx] = chosen_reviews
         dest_df.at[idx, 'review_count'] = num_reviews
         # Store first 2 reviews as sample text (truncated)
         dest_df.at[idx, 'sample_reviews'] = " || ".join([r[:100] + "..." for r in chosen_reviews[:2]])
@@ -110,16 +105,31 @@ def synthetic_review_mapping(dest_df, review_df):
         if processed_count % 50 == 0:
             print(f"Processed {processed_count} destinations...")
 
+    # 3. Calculate Average Sentiment Score using VADER
+    # One batch over every assigned review: reviews are drawn with replacement,
+    # so each distinct text is only scored once.
+    all_reviews = [r for chosen_reviews in assigned.values() for r in chosen_reviews]
+    # (rounded to 4 dp like nltk's polarity_scores)
+    all_scores = iter(np.round(sia.compound_batch(all_reviews), 4))
+    for idx, chosen_reviews in assigned.items():
+        scores = [next(all_scores) for _ in chosen_reviews]
+        avg_score = np.mean(scores) if scores else 0.0
+        dest_df.at[idx, 'sentiment_score'] = round(avg_score, 4)
+
     return dest_df
 
-def main():
-    if not os.path.exists(PROCESSED_DIR):
-        os.makedirs(PROCESSED_DIR)
+def main(dest_file=DEST_FILE, review_file=REVIEW_FILE, output_file=OUTPUT_FILE, seed=42):
+    if not os.path.exists(os.path.dirname(output_file)):
+        os.makedirs(os.path.dirname(output_file))
+
+    # Fixed seed: the same raw data always gives byte-identical output,
+    # so the build pipeline can skip everything downstream
+    np.random.seed(seed)
 
     # Load Data
     print("Loading datasets...")
-    dest_df = pd.read_csv(DEST_FILE)
-    review_df = pd.read_csv(REVIEW_FILE)
+    dest_df = pd.read_csv(dest_file)
+    review_df = pd.read_csv(review_file)
 
     # Step 1: Clean Destinations
     dest_df = clean_destinations(dest_df)
@@ -131,8 +141,8 @@ def main():
     final_df.columns = [c.strip().replace(" ", "_").lower() for c in final_df.columns]
 
     # Save
-    print(f"Saving to {OUTPUT_FILE}...")
-    final_df.to_csv(OUTPUT_FILE, index=False)
+    print(f"Saving to {output_file}...")
+    final_df.to_csv(output_file, index=False)
     print("Processing Complete!")
     print(final_df[['name', 'google_review_rating', 'sentiment_score', 'duration_bucket', 'budget_bucket']].head())
 
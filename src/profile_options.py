@@ -0,0 +1,65 @@
+import itertools
+
+# Sidebar choices offered by app.py.
+# Kept here so the app and the cache pre-warm enumerate exactly the same profiles.
+ACTIVITY_TYPES = ["Nature", "Heritage", "Adventure", "Religious", "Leisure"]
+PURPOSES = ["Relaxation", "Exploration", "Pilgrimage", "Family outing", "Photography"]
+TRAVEL_TIMES = ["1 Day", "2 Days", "3+ Days"]
+BUDGETS = ["Low", "Medium", "High"]
+REGIONS = ["North", "South", "East", "West", "Central"]
+ZONES = ["Northern", "Southern", "Eastern", "Western", "NorthEastern", "Central"]
+JOB_TYPES = ["Fixed Schedule", "Flexible / Remote"]
+SEASONS = ["Any", "Summer", "Winter", "Monsoon"]
+DISTANCE_LIMITS = ["Any", "150 km", "300 km", "500 km", "1000 km"]
+
+DURATION_MAP = {"1 Day": "Short", "2 Days": "Medium", "3+ Days": "Long"}
+
+# Radius around the user's region hub; None means no limit
+DISTANCE_LIMITS_KM = {"Any": None, "150 km": 150, "300 km": 300, "500 km": 500, "1000 km": 1000}
+
+# Share of the match score given to proximity when "prefer nearby" is ticked
+NEARBY_WEIGHT = 0.3
+
+# MMR trade-off used when "mix it up" is ticked
+DIVERSITY_WEIGHT = 0.3
+
+# UI labels that map onto a different vocabulary in the dataset
+TYPE_ALIASES = {"Heritage": "Historical", "Leisure": "Relaxation"}
+# Sidebar zone labels spelled differently from the catalog's `zone` values
+ZONE_ALIASES = {"NorthEastern": "North Eastern"}
+
+
+def build_profile(activity_type, purpose, time_raw, budget_pref, target_zone, job_type, season, current_region,
+                  max_distance="Any", prefer_nearby=False, diversify=False, max_budget_inr=None, query=None,
+                  around=None):
+    """
+    Turns raw sidebar selections into the profile dict the recommender expects.
+    `around` is the (lat, lon) of a place picked to plan around: it becomes the
+    origin for distances, and nearer places are preferred.
+    """
+    return {
+        "type": TYPE_ALIASES.get(activity_type, activity_type),
+        "significance": purpose,
+        "budget_bucket": budget_pref,
+        "duration_bucket": DURATION_MAP[time_raw],
+        "zone": target_zone,
+        "job_type": "Flexible" if "Flexible" in job_type else "Fixed Schedule",
+        "season": season,
+        "current_region": current_region,
+        "origin": tuple(around) if around is not None else None,
+        "max_distance_km": DISTANCE_LIMITS_KM[max_distance],
+        "distance_weight": NEARBY_WEIGHT if prefer_nearby or around is not None else 0.0,
+        "diversity": DIVERSITY_WEIGHT if diversify else 0.0,
+        "max_budget_inr": max_budget_inr,
+        "query": query.strip() if query and query.strip() else None
+    }
+
+
+def reachable_profiles():
+    """
+    Yields every profile the sidebar can produce with the distance and
+    diversity controls left at their defaults.
+    """
+    for combo in itertools.product(ACTIVITY_TYPES, PURPOSES, TRAVEL_TIMES, BUDGETS,
+                                   ZONES, JOB_TYPES, SEASONS, REGIONS):
+        yield build_profile(*combo)
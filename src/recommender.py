@@ -2,111 +2,693 @@
 import pandas as pd
 import numpy as np
 import sqlite3
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
 from src.feature_engine import TravelFeatureEngine
+from src.vector_store import DestinationVectorStore
+from src.destination_store import TEXT_COLUMNS
+from src.similarity_index import SimilarityIndex, INDEX_PATH, snapshot_fingerprint
+from src.geo_index import geocode, haversine_km, distance_decay, resolve_origin
+from src.diversity import mmr_rerank, SHORTLIST_SIZE
+from src.visit_calendar import encode_calendar, season_mask, day_bit, time_of_day_bit
+from src.search_index import SearchIndex, SEARCH_INDEX_PATH, SEARCH_COLUMNS, query_terms, text_fingerprint
+from src.autocomplete import PrefixIndex
+from src.result_cursor import ResultCursor
 
 import os
+import copy
+import logging
 
 # Get project root (parent of src)
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(PROJECT_ROOT, "data", "travel.db")
 
+logger = logging.getLogger(__name__)
+
+# Explanation templates (bound once, formatted only for displayed rows)
+INTEREST_REASON = "Aligms with your interest in {}/{}".format
+BUDGET_REASON = "matches your {} budget".format
+FREE_REASON = "is budget-friendly (Free)"
+DURATION_REASON = "fits your {} time availability".format
+SENTIMENT_REASON = "has highly positive visitor sentiment"
+SEARCH_REASON = "matches your search for \"{}\"".format
+DEFAULT_EXPLANATION = "Recommended based on overall similarity."
+
+def cosine_scores(unit_vectors, user_vector):
+    """
+    Cosine similarity of a user vector against L2-normalised destination rows.
+    einsum reduces each row on its own (unlike BLAS matmul), so scoring a shard
+    gives bit-for-bit the same values as scoring the full matrix.
+    """
+    user_unit = normalize(np.asarray(user_vector, dtype=np.float64).reshape(1, -1))[0]
+    return np.einsum('ij,j->i', unit_vectors, user_unit)
+
+def read_catalog(db_path=DB_PATH):
+    """
+    The `destinations` rows as the vector store consumes them: everything needed
+    for encoding and filtering, plus derived coordinates and calendar bitfields.
+    Bulky text columns are left out; they're fetched lazily for displayed rows.
+    """
+    conn = sqlite3.connect(db_path)
+    all_columns = [row[1] for row in conn.execute("PRAGMA table_info(destinations)")]
+    columns = [c for c in all_columns if c not in TEXT_COLUMNS]
+    query = f"SELECT {', '.join(columns)} FROM destinations"
+    df = pd.read_sql_query(query, conn)
+    conn.close()
+    # Offline geocoding from the bundled gazetteer, for radius filters and distance decay
+    df['latitude'], df['longitude'] = geocode(df['city'], df['state'])
+    # best_time_to_visit / weekly_off parsed into bitfields once, for the calendar constraints
+    for col, values in encode_calendar(df['best_time_to_visit'], df['weekly_off']).items():
+        df[col] = values
+    # Lets the store hand back rows in table order, text columns included
+    df.attrs['column_order'] = all_columns + ['latitude', 'longitude']
+    return df
+
+def read_text_columns(ids, columns, db_path=DB_PATH):
+    """
+    Fetches text columns for the given destination ids.
+    Returns: DataFrame indexed by id
+    """
+    conn = sqlite3.connect(db_path)
+    placeholders = ", ".join("?" * len(ids))
+    query = f"SELECT id, {', '.join(columns)} FROM destinations WHERE id IN ({placeholders})"
+    df = pd.read_sql_query(query, conn, params=[int(i) for i in ids])
+    conn.close()
+    return df.set_index('id')
+
+def explain_rows(df, profile, searched=False):
+    """
+    Rule-based explanation for each result row.
+    Each reason is evaluated as a boolean mask over the whole frame; strings are
+    only assembled per row at the end, so call this on the final top_n rows.
+    searched: Every row matched the profile's free-text query.
+
+    Returns: Series of explanation strings aligned with df.index
+    """
+    if df.empty:
+        return pd.Series([], index=df.index, dtype=object)
+
+    budget_pref = profile.get('budget_bucket')
+    # Quoted as its search terms: queries with the same terms share one cache entry
+    search_reason = SEARCH_REASON(' '.join(query_terms(profile.get('query')))) if searched else None
+
+    # 1. Match on Interest/Type
+    interest = ((df['type'] == profile.get('type')) | (df['significance'] == profile.get('significance'))).to_numpy()
+    # 2. Match on Budget
+    budget = (df['budget_bucket'] == budget_pref).to_numpy()
+    free = ~budget & (df['budget_bucket'] == 'Free').to_numpy() & (budget_pref == 'Low')
+    # 3. Match on Duration
+    duration = (df['duration_bucket'] == profile.get('duration_bucket')).to_numpy()
+    # 4. Sentiment Boost
+    if 'sentiment_score' in df.columns:
+        positive = (pd.to_numeric(df['sentiment_score'], errors='coerce') > 0.8).to_numpy()
+    else:
+        positive = np.zeros(len(df), dtype=bool)
+
+    explanations = []
+    columns = zip(interest, budget, free, duration, positive,
+                  df['type'], df['significance'], df['budget_bucket'], df['duration_bucket'])
+    for has_interest, has_budget, is_free, has_duration, is_positive, place_type, significance, budget_bucket, duration_bucket in columns:
+        reasons = []
+        if searched:
+            reasons.append(search_reason)
+        if has_interest:
+            reasons.append(INTEREST_REASON(place_type, significance))
+        if has_budget:
+            reasons.append(BUDGET_REASON(budget_bucket))
+        elif is_free:
+            reasons.append(FREE_REASON)
+        if has_duration:
+            reasons.append(DURATION_REASON(duration_bucket))
+        if is_positive:
+            reasons.append(SENTIMENT_REASON)
+
+        explanations.append("This place " + ", ".join(reasons) + "." if reasons else DEFAULT_EXPLANATION)
+
+    return pd.Series(explanations, index=df.index, dtype=object)
+
 class TravelRecommender:
-    def __init__(self):
-        self.feature_engine = TravelFeatureEngine()
-        self.destinations_df = self._load_destinations()
-        
-        # Pre-compute destination vectors
-        # Note: In a large production system, we would cache this.
-        if not self.destinations_df.empty:
-            self.destination_vectors = self.feature_engine.transform(self.destinations_df)
+    # Profile fields that influence recommend(), with the default used when absent.
+    # Anything else in the profile dict (e.g. display-only fields) can't change results.
+    PROFILE_DEFAULTS = {
+        'type': None,
+        'significance': None,
+        'duration_bucket': None,
+        'budget_bucket': None,
+        'zone': None,
+        'job_type': 'Flexible',
+        'visit_day': None,
+        'season': None,            # "Summer"/"Winter"/"Monsoon" ("Any" = no filter)
+        'visit_time': None,        # "Morning"/"Afternoon"/"Evening"/"Night"
+        'user_id': None,
+        # Location (see geo_index.resolve_origin); only read when one of the two below is set
+        'origin': None,
+        'origin_city': None,
+        'current_region': None,
+        'max_distance_km': None,   # Hard radius filter around the origin
+        'distance_weight': 0.0,    # Share of the match score taken from proximity
+        'diversity': 0.0,          # MMR trade-off for the final list (0 = pure match score)
+        'query': None,             # Free-text search ("Mughal tombs"); only matching places are ranked
+        'text_weight': 0.5,        # Share of the match score taken from text relevance when searching
+    }
+    LOCATION_KEYS = ('origin', 'origin_city', 'current_region')
+
+    def canonical_profile(self, profile):
+        """
+        The profile reduced to what can change recommend()'s output, as a hashable tuple.
+        Location fields are dropped unless distance filtering or scoring is on, and
+        a season is dropped if it excludes nothing in the current catalog.
+        """
+        uses_location = bool(profile.get('max_distance_km')) or bool(profile.get('distance_weight'))
+        canonical = []
+        for key, default in self.PROFILE_DEFAULTS.items():
+            value = profile.get(key, default)
+            if key in self.LOCATION_KEYS and not uses_location:
+                value = default
+            elif key == 'origin' and value is not None:
+                value = tuple(value)
+            elif key == 'season':
+                value = self._restrictive_season(value)
+            elif key == 'query':
+                value = query_terms(value) or None
+            canonical.append((key, value))
+        return tuple(canonical)
+
+    def _restrictive_season(self, season):
+        """
+        Month mask for the season, or None if no destination falls outside it.
+        Memoised per catalog version.
+        """
+        months = season_mask(season)
+        state = self.vector_store.snapshot
+        if months is None or state.vectors is None:
+            return None
+        version, seen = self._season_filters
+        if version != state.version:
+            seen = {}
+            self._season_filters = (state.version, seen)
+        if months not in seen:
+            seen[months] = bool(((state.destinations['visit_months'] & months) == 0).any())
+        return months if seen[months] else None
+
+    def __init__(self, n_workers=None, cf_model=None, cf_weight=0.0, catalog_path=None):
+        """
+        n_workers: If set, score through a pool of this many processes over
+                   shared-memory shards (for very large catalogs).
+        cf_model:  Optional ItemCooccurrenceModel trained on `interactions`.
+        cf_weight: Share of the final match score taken from the CF model, for
+                   profiles with a known 'user_id' (0 = content-based only).
+        catalog_path: Serve a read-only, memory-mapped Arrow catalog (see
+                   arrow_catalog.write_catalog; needs pyarrow) instead of travel.db.
+        """
+        # Pre-compute destination vectors.
+        # The store holds them as an immutable snapshot that refresh() can
+        # patch and swap without disturbing in-flight recommend() calls.
+        self.vector_store = DestinationVectorStore(TravelFeatureEngine(), text_loader=self._load_text_columns)
+        self.catalog_path = catalog_path
+        self.arrow_catalog = None
+        if catalog_path is not None:
+            self._load_arrow_catalog()
         else:
-            self.destination_vectors = None
+            self.vector_store.load(self._load_destinations())
 
-    def _load_destinations(self):
+        # (catalog version, {season months: excludes anything?}) for canonical_profile
+        self._season_filters = (None, {})
+
+        # "More like this" neighbour table, kept in step with the catalog
+        self.similarity_index = None
+        self._load_similarity_index()
+
+        # BM25 index over the catalog text (free-text queries) and the
+        # name prefix index (as-you-type suggestions)
+        self.search_index = None
+        self.autocomplete = None
+        self._load_text_indexes()
+
+        self.cf_model = cf_model
+        self.cf_weight = cf_weight
+        if cf_model is not None:
+            cf_model.fit_from_db(DB_PATH)
+
+        self.n_workers = n_workers
+        self.sharded_scorer = None
+        self._executor = None
+        if n_workers:
+            self._rebuild_sharded_scorer()
+
+    def _rebuild_sharded_scorer(self):
+        """
+        Re-shares the current snapshot with the worker pool.
+        Until this finishes, recommend() keeps using the in-process path.
+        """
+        if not self.n_workers:
+            return
+        # Imported here: the workers import this module
+        from src.sharded_scoring import ShardedScorer
+
+        if self._executor is None:
+            self._executor = ShardedScorer.create_executor(self.n_workers)
+        state = self.vector_store.snapshot
+        if state.vectors is None:
+            return
+
+        previous = self.sharded_scorer
+        self.sharded_scorer = ShardedScorer(state.destinations, state.vectors, state.version,
+                                            executor=self._executor, n_shards=self.n_workers)
+        if previous is not None:
+            previous.close()
+
+    def close(self):
+        """
+        Releases the worker pool and shared memory (sharded mode only).
+        """
+        if self.sharded_scorer is not None:
+            self.sharded_scorer.close()
+            self.sharded_scorer = None
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    @property
+    def feature_engine(self):
+        return self.vector_store.snapshot.feature_engine
+
+    @property
+    def destinations(self):
+        return self.vector_store.snapshot.destinations
+
+    @property
+    def destinations_df(self):
+        # Full materialisation (including text fetched from SQLite). Avoid on the request path.
+        return self.vector_store.snapshot.destinations.to_frame()
+
+    @property
+    def destination_vectors(self):
+        return self.vector_store.snapshot.vectors
+
+    @property
+    def cache_version(self):
+        """
+        Changes whenever recommend() could return something different for the same profile.
+        """
+        cf_version = self.cf_model.version if self.cf_model is not None else None
+        # Text isn't part of the snapshot (and its version), but searches and explanations read it
+        text_version = self.search_index.fingerprint if self.search_index is not None else None
+        return (self.vector_store.snapshot.version, cf_version, text_version)
+
+    def refresh(self):
+        """
+        Re-reads the catalog and re-encodes only new or edited destinations.
+        Also folds any new interactions into the CF model.
+        Returns the snapshot now being served.
+        """
+        if self.catalog_path is not None:
+            # A read-only catalog file is replaced whole, never patched
+            return self.reload()
+        if self.cf_model is not None:
+            self.cf_model.fit_from_db(DB_PATH)
+        previous = self.vector_store.snapshot
+        snapshot = self.vector_store.apply_changes(self._load_destinations())
+        # Text columns aren't in the snapshot's row hashes, so a text-only
+        # edit (e.g. a rename) leaves the snapshot as is; check the text itself
+        texts = self._read_texts()
+        text_changed = (self.search_index is None
+                        or text_fingerprint(texts['id'], texts) != self.search_index.fingerprint)
+        if snapshot is not previous:
+            self._refresh_similarity_index(previous, snapshot)
+            self._rebuild_sharded_scorer()
+        if snapshot is not previous or text_changed:
+            self._load_text_indexes(texts)
+        return snapshot
+
+    def reload(self):
+        """
+        Loads the encoder from disk and re-encodes the full catalog.
+        Used when the encoder artifact itself has been replaced.
+        """
+        if self.catalog_path is not None:
+            snapshot = self._load_arrow_catalog()
+        else:
+            feature_engine = TravelFeatureEngine()
+            feature_engine.load_encoders()
+            snapshot = self.vector_store.load(self._load_destinations(), feature_engine=feature_engine)
+        self._load_similarity_index()
+        self._load_text_indexes()
+        self._rebuild_sharded_scorer()
+        return snapshot
+
+    def _load_arrow_catalog(self):
+        """
+        Maps the Arrow catalog and swaps it in: columns, vectors and encoder
+        all come from the file, so nothing is parsed or re-encoded.
+        """
+        # Imported here: pyarrow is only needed on nodes serving this format
+        from src.arrow_catalog import ArrowCatalog
+
+        catalog = ArrowCatalog.open(self.catalog_path)
+        snapshot = self.vector_store.adopt(catalog.destinations, catalog.vectors, catalog.row_hashes,
+                                           catalog.feature_engine)
+        self.arrow_catalog = catalog
+        return snapshot
+
+    def _load_similarity_index(self):
+        """
+        Uses the persisted neighbour table if it was built from exactly this catalog,
+        otherwise builds (and persists) a new one.
+        """
+        state = self.vector_store.snapshot
+        if state.vectors is None:
+            self.similarity_index = None
+            return
+        fingerprint = snapshot_fingerprint(state)
+        if os.path.exists(INDEX_PATH):
+            try:
+                index = SimilarityIndex.load(INDEX_PATH)
+                if index.fingerprint == fingerprint:
+                    self.similarity_index = index
+                    return
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable similarity index: {e}")
+
+        index = SimilarityIndex().build(state.destinations.ids, state.vectors, fingerprint=fingerprint)
+        self._save_similarity_index(index)
+        self.similarity_index = index
+
+    def _refresh_similarity_index(self, previous, snapshot):
+        if self.similarity_index is None or snapshot.vectors is None:
+            return self._load_similarity_index()
+        # Refresh a copy so concurrent lookups keep a consistent table, then swap
+        index = copy.copy(self.similarity_index)
+        index.refresh(snapshot.destinations.ids, snapshot.vectors,
+                      DestinationVectorStore.changed_ids(previous, snapshot),
+                      fingerprint=snapshot_fingerprint(snapshot))
+        self._save_similarity_index(index)
+        self.similarity_index = index
+
+    @staticmethod
+    def _save_similarity_index(index):
+        try:
+            index.save(INDEX_PATH)
+        except OSError as e:
+            logger.warning(f"Could not persist similarity index: {e}")
+
+    def _read_texts(self):
+        """
+        The catalog's SEARCH_COLUMNS (plus 'id') for every row.
+        """
+        if self.arrow_catalog is not None:
+            return self.arrow_catalog.texts(SEARCH_COLUMNS)
         conn = sqlite3.connect(DB_PATH)
-        # Read everything needed for encoding + display
-        query = "SELECT * FROM destinations"
-        df = pd.read_sql_query(query, conn)
+        texts = pd.read_sql_query(f"SELECT id, {', '.join(SEARCH_COLUMNS)} FROM destinations", conn)
         conn.close()
-        return df
+        return texts
+
+    def _load_text_indexes(self, texts=None):
+        """
+        Reads the catalog text once (unless given) and brings the search and
+        autocomplete indexes up to date.
+        """
+        if texts is None:
+            texts = self._read_texts()
+        self._load_search_index(texts)
+
+        # Popularity and coordinates come from the snapshot's columns
+        state = self.vector_store.snapshot
+        self.autocomplete = None
+        if state.vectors is not None and 'latitude' in state.destinations:
+            positions = state.destinations.position_of(texts['id'])
+            found = positions >= 0
+            rows = state.destinations.take(positions[found], with_text=False)
+            catalog = texts.loc[found, ['id', 'name', 'city', 'state']].reset_index(drop=True)
+            for col in ['google_rating', 'google_review_lakhs', 'review_count', 'latitude', 'longitude']:
+                if col in rows.columns:
+                    catalog[col] = rows[col].to_numpy()
+            self.autocomplete = PrefixIndex.from_catalog(catalog)
+
+    def _load_search_index(self, texts):
+        """
+        Uses the persisted search index if it was built from exactly the current
+        catalog text, otherwise builds (and persists) a new one.
+        """
+        fingerprint = text_fingerprint(texts['id'], texts)
+        if os.path.exists(SEARCH_INDEX_PATH):
+            try:
+                index = SearchIndex.load(SEARCH_INDEX_PATH)
+                if index.fingerprint == fingerprint:
+                    self.search_index = index
+                    return
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable search index: {e}")
+
+        index = SearchIndex().build(texts['id'], texts, fingerprint=fingerprint)
+        try:
+            index.save(SEARCH_INDEX_PATH)
+        except OSError as e:
+            logger.warning(f"Could not persist search index: {e}")
+        self.search_index = index
+
+    def suggest(self, text, k=8):
+        """
+        As-you-type suggestions for destination, city and state names.
+        Served from an in-memory prefix index, no database access.
+
+        Returns: List of autocomplete.Suggestion (label, kind, detail, destination_id, latitude, longitude)
+        """
+        if self.autocomplete is None:
+            return []
+        return self.autocomplete.suggest(text, k)
+
+    def _text_matches(self, destinations, query):
+        """
+        Row positions matching a free-text query (in catalog order) and their
+        BM25 relevance, scaled so the best match is 1.0.
+        """
+        ids, relevance = self.search_index.search(query)
+        positions = destinations.position_of(ids)
+        found = positions >= 0
+        order = np.argsort(positions[found], kind='stable')
+        return positions[found][order], relevance[found][order]
+
+    def similar_destinations(self, destination_id, k=5):
+        """
+        "More like this": the k destinations closest to the given one.
+        Served from the precomputed neighbour table, no catalog scan.
+
+        Returns: DataFrame of destinations with a 'similarity' column
+        """
+        state = self.vector_store.snapshot
+        index = self.similarity_index
+        if index is None:
+            return pd.DataFrame()
+        neighbor_ids, similarity = index.neighbors(destination_id, k)
+        positions = state.destinations.position_of(neighbor_ids)
+        found = positions >= 0
+        results = state.destinations.take(positions[found])
+        results['similarity'] = similarity[found]
+        return results
+
+    def _load_destinations(self):
+        return read_catalog(DB_PATH)
+
+    def _load_text_columns(self, ids, columns):
+        return read_text_columns(ids, columns, DB_PATH)
 
-    def recommend(self, user_profile, top_n=5):
+    def recommend(self, user_profile, top_n=5, user_vector=None):
         """
         user_profile: Dict containing UI inputs
+        user_vector: Optional (encoder_version, vector) precomputed for this profile
+                     (see user_store); used if it matches the encoder being served.
         Returns: DataFrame of top_n destinations with 'match_score'
         """
-        if self.destination_vectors is None:
-            return pd.DataFrame()
+        # rank() pins one catalog version for the whole request
+        state, top, top_scores = self.rank(user_profile, top_n, user_vector)
+        return self._materialize(state, top, top_scores, user_profile)
 
-        # 1. Vectorize User Profile
-        user_vector = self.feature_engine.create_user_vector(user_profile)
+    def open_cursor(self, user_profile, page_size=5, limit=SHORTLIST_SIZE, user_vector=None):
+        """
+        Ranks up to `limit` results once and returns a ResultCursor over them.
+        Pages are materialised and explained only when requested, and page 0
+        is the same as recommend(user_profile, top_n=page_size).
+        (`limit` stays within the MMR shortlist so diversified pages agree too.)
+        """
+        state, top, top_scores = self.rank(user_profile, max(limit, page_size), user_vector)
+        materialize = lambda snapshot, rows, scores: self._materialize(snapshot, rows, scores, user_profile)
+        return ResultCursor(state, top, top_scores, materialize, page_size)
 
-        # 2. Compute Cosine Similarity
-        # Result shape: (1, n_destinations)
-        similarity_scores = cosine_similarity(user_vector, self.destination_vectors)
-        
-        # Flatten to 1D array
-        scores = similarity_scores[0]
-        
-        # 3. Add scores to DataFrame
-        results = self.destinations_df.copy()
-        results['match_score'] = scores
-        
-        # 4. Filter & Sort
-        # We can apply HARD FILTERS here if needed (Task 5.1), 
-        # but for pure ML, we just sort.
+    def _materialize(self, state, top, top_scores, user_profile):
+        """
+        Steps 5-6 of recommend(): builds the result rows for ranked positions.
+        """
+        if state.vectors is None:
+            return pd.DataFrame()
+        destinations = state.destinations
+
+        # 5. Materialise only the rows we return
+        top_results = destinations.take(top)
+        top_results['match_score'] = top_scores
+        origin = self._distance_origin(user_profile)
+        if origin is not None:
+            top_results['distance_km'] = haversine_km(top_results['latitude'], top_results['longitude'], *origin)
         
+        # 6. Generate Explanations
+        top_results['explanation'] = self.generate_explanations(top_results, user_profile)
+
+        return top_results
+
+    def rank(self, user_profile, top_n=5, user_vector=None):
+        """
+        Steps 1-4 of recommend(): scores and ranks the catalog without materialising rows.
+        Returns: (snapshot used, row positions, match scores)
+        """
+        # Pin one catalog version for the whole request
+        state = self.vector_store.snapshot
+        if state.vectors is None:
+            return state, np.empty(0, dtype=np.int64), np.empty(0)
+        destinations = state.destinations
+
+        # 1. Vectorize User Profile (unless a stored vector from this encoder was given)
+        if user_vector is not None and user_vector[0] == state.encoder_version:
+            user_vector = user_vector[1]
+        else:
+            user_vector = state.feature_engine.create_user_vector(user_profile)
+
+        # Collaborative signal for returning users (None if no history)
+        cf_scores = None
+        if self.cf_model is not None and self.cf_weight > 0 and user_profile.get('user_id') is not None:
+            cf_scores = self.cf_model.score(user_profile['user_id'], destinations.ids)
+
+        # With diversity on, rank a shortlist and let MMR pick the final top_n from it
+        diversity = user_profile.get('diversity') or 0.0
+        shortlist_n = max(top_n, SHORTLIST_SIZE) if diversity else top_n
+
+        # 2-4. Compute Cosine Similarity, Apply Hard Constraints, Sort
+        scorer = self.sharded_scorer
+        searched = bool(user_profile.get('query')) and self.search_index is not None
+        sharded = None
+        if not searched and scorer is not None and scorer.version == state.version:
+            # Each worker ranks its shard; we merge the local top-n lists.
+            # None if a refresh retired this scorer in the meantime.
+            sharded = scorer.top_k(user_vector, user_profile, shortlist_n, cf_scores, self.cf_weight)
+        if searched:
+            # Free-text search: only the query's matches are ranked, blended with
+            # their text relevance. Few enough rows to score in-process.
+            rows, text_scores = self._text_matches(destinations, user_profile['query'])
+            top, top_scores = self._score_and_rank(destinations.subset(rows), state.vectors[rows], user_vector,
+                                                   user_profile, shortlist_n,
+                                                   cf_scores[rows] if cf_scores is not None else None,
+                                                   self.cf_weight, text_scores=text_scores)
+            top = rows[top]
+        elif sharded is not None:
+            top, top_scores = sharded
+        else:
+            top, top_scores = self._score_and_rank(destinations, state.vectors, user_vector, user_profile, shortlist_n,
+                                                   cf_scores, self.cf_weight, geo_index=state.geo_index)
+
+        if diversity:
+            picked = mmr_rerank(state.vectors[top], top_scores, top_n, diversity)
+            top, top_scores = top[picked], top_scores[picked]
+        return state, top, top_scores
+
+    @staticmethod
+    def _distance_origin(profile):
+        """
+        The (lat, lon) distances are measured from, or None if the profile
+        doesn't ask for a radius filter or distance scoring.
+        """
+        if not profile.get('max_distance_km') and not profile.get('distance_weight'):
+            return None
+        return resolve_origin(profile)
+
+    @staticmethod
+    def _score_and_rank(destinations, vectors, user_vector, profile, top_n, cf_scores=None, cf_weight=0.0,
+                        geo_index=None, text_scores=None):
+        """
+        Scores, filters and ranks one block of the catalog.
+        cf_scores, if given, are blended in as (1 - cf_weight) * cosine + cf_weight * cf.
+        text_scores (search relevance per row), if given, are blended in by the profile's 'text_weight'.
+        geo_index (GeoGridIndex over this block), if given, answers radius queries
+        instead of measuring the distance to every row.
+        Returns: (row positions within the block, their match scores)
+        """
+        # Radius filter first, so only destinations within reach get scored
+        rows = None
+        origin = TravelRecommender._distance_origin(profile)
+        max_distance = profile.get('max_distance_km')
+        if origin is not None and max_distance and 'latitude' in destinations:
+            if geo_index is not None:
+                rows = geo_index.within(*origin, max_distance)
+            else:
+                distances = haversine_km(destinations['latitude'], destinations['longitude'], *origin)
+                rows = np.flatnonzero(distances <= max_distance)
+            destinations = destinations.subset(rows)
+            vectors = vectors[rows]
+            if cf_scores is not None:
+                cf_scores = cf_scores[rows]
+            if text_scores is not None:
+                text_scores = text_scores[rows]
+
+        # Cosine similarity against every row, shape: (n_destinations,)
+        scores = cosine_scores(vectors, user_vector)
+        if cf_scores is not None:
+            scores = (1.0 - cf_weight) * scores + cf_weight * cf_scores
+        if text_scores is not None:
+            text_weight = profile.get('text_weight', TravelRecommender.PROFILE_DEFAULTS['text_weight'])
+            scores = (1.0 - text_weight) * scores + text_weight * text_scores
+
+        # Distance decay: nearer destinations score higher
+        distance_weight = profile.get('distance_weight') or 0.0
+        if origin is not None and distance_weight and 'latitude' in destinations:
+            proximity = distance_decay(haversine_km(destinations['latitude'], destinations['longitude'], *origin))
+            scores = (1.0 - distance_weight) * scores + distance_weight * proximity
+
+        # Hard constraints are evaluated directly on the columnar store:
+        # no per-request copy of the catalog
+        candidates = np.flatnonzero(TravelRecommender._constraint_mask(destinations, profile))
+
         # Primary Sort: Match Score (Desc)
         # Secondary Sort: Google Rating (Desc) for tie-breaking
-        results = results.sort_values(by=['match_score', 'google_rating'], ascending=[False, False])
-        
-        # 5. Apply Hard Constraints
-        filtered_results = self.filter_by_constraints(results, user_profile)
-        
-        # 6. Generate Explanations
-        # Apply row-wise function to create a human-readable string
-        if not filtered_results.empty:
-            filtered_results['explanation'] = filtered_results.apply(
-                lambda row: self.generate_explanation(row, user_profile), axis=1
-            )
+        # (lexsort is stable, so remaining ties keep catalog order)
+        top = TravelRecommender._rank(candidates, scores, destinations['google_rating'], top_n)
+        if rows is not None:
+            return rows[top], scores[top]
+        return top, scores[top]
 
-        return filtered_results.head(top_n)
+    @staticmethod
+    def _rank(candidates, scores, ratings, top_n):
+        """
+        Orders candidate positions by (match score desc, rating desc) and keeps top_n.
+        """
+        order = np.lexsort((-ratings[candidates], -scores[candidates]))
+        return candidates[order[:top_n]]
 
     def generate_explanation(self, row, profile):
         """
         Creates a dynamic string explaining why this place was chosen.
         """
-        reasons = []
-        
-        # 1. Match on Interest/Type
-        if row['type'] == profile.get('type') or row['significance'] == profile.get('significance'):
-            reasons.append(f"Aligms with your interest in {row['type']}/{row['significance']}")
-            
-        # 2. Match on Budget
-        if row['budget_bucket'] == profile.get('budget_bucket'):
-            reasons.append(f"matches your {row['budget_bucket']} budget")
-        elif row['budget_bucket'] == 'Free' and profile.get('budget_bucket') == 'Low':
-             reasons.append("is budget-friendly (Free)")
-             
-        # 3. Match on Duration
-        if row['duration_bucket'] == profile.get('duration_bucket'):
-            reasons.append(f"fits your {row['duration_bucket']} time availability")
-
-        # 4. Sentiment Boost
-        if row.get('sentiment_score', 0) > 0.8:
-            reasons.append("has highly positive visitor sentiment")
-
-        if not reasons:
-            return "Recommended based on overall similarity."
-            
-        return "This place " + ", ".join(reasons) + "."
+        return self.generate_explanations(row.to_frame().T, profile).iloc[0]
+
+    def generate_explanations(self, df, profile):
+        """
+        Column-wise version of generate_explanation (see explain_rows).
+
+        Returns: Series of explanation strings aligned with df.index
+        """
+        # Every row of a search result matched the query
+        searched = self.search_index is not None and bool(query_terms(profile.get('query')))
+        return explain_rows(df, profile, searched)
 
     def filter_by_constraints(self, df, profile):
         """
         Applies business rules and hard filters.
         """
-        filtered_df = df.copy()
+        return df[self._constraint_mask(df, profile)].copy()
+
+    @staticmethod
+    def _constraint_mask(columns, profile):
+        """
+        Boolean mask of rows passing the hard constraints.
+        `columns` is anything indexable by column name: a DataFrame or a DestinationStore.
+        """
+        mask = np.ones(len(columns), dtype=bool)
         
         # --- Constraint 1: Job Type (Time Flexibility) ---
         # If Job Type is 'Fixed Schedule', strictly enforce Duration bucket.
@@ -119,28 +701,50 @@ class TravelRecommender:
             if desired_duration:
                 # We allow slight flexibility (e.g. asking for Short can show Short + Medium),
                 # but let's be strict for demonstration.
-                 filtered_df = filtered_df[filtered_df['duration_bucket'] == desired_duration]
+                mask &= np.asarray(columns['duration_bucket'] == desired_duration)
 
         # --- Constraint 2: Budget Strictness ---
         # If user says 'Low', remove 'High'. If 'High', show everything.
         budget_pref = profile.get('budget_bucket')
         if budget_pref == 'Low':
             # Remove 'High' cost places
-            filtered_df = filtered_df[filtered_df['budget_bucket'] != 'High']
+            mask &= np.asarray(columns['budget_bucket'] != 'High')
         elif budget_pref == 'Free':
-             filtered_df = filtered_df[filtered_df['budget_bucket'] == 'Free']
+            mask &= np.asarray(columns['budget_bucket'] == 'Free')
 
         # --- Constraint 3: Weekly Off (Availability) ---
         # If user plans to visit on a specific day, ensure place is open.
         # Defaults to None (Any Day)
         visit_day = profile.get('visit_day') 
         if visit_day:
-            # Data format in DB for weekly_off: "Monday" or null.
-            # We filter out places where weekly_off == visit_day
-            # Note: We need to handle NaN logic
-            filtered_df = filtered_df[filtered_df['weekly_off'] != visit_day]
+            # weekly_off is parsed at load into a day-of-week bitmask of closures
+            # (no weekly off = 0, so those places are always kept)
+            closed = TravelRecommender._calendar_column(columns, 'closed_days')
+            mask &= (closed & day_bit(visit_day)) == 0
+
+        # --- Constraint 4: Season ---
+        # Keep places whose best months overlap the chosen season.
+        # "Any" (or no season) leaves everything in.
+        months = season_mask(profile.get('season'))
+        if months is not None:
+            mask &= (TravelRecommender._calendar_column(columns, 'visit_months') & months) != 0
 
-        return filtered_df
+        # --- Constraint 5: Time of Day ---
+        time_bit = time_of_day_bit(profile.get('visit_time'))
+        if time_bit is not None:
+            mask &= (TravelRecommender._calendar_column(columns, 'visit_times') & time_bit) != 0
+
+        return mask
+
+    @staticmethod
+    def _calendar_column(columns, name):
+        """
+        One of the bitfield columns from encode_calendar. The store has them
+        precomputed; a plain DataFrame without them is parsed on the fly.
+        """
+        if name in columns:
+            return np.asarray(columns[name])
+        return encode_calendar(columns['best_time_to_visit'], columns['weekly_off'])[name]
 
 if __name__ == "__main__":
     # Test Run
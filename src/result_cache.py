@@ -0,0 +1,113 @@
+import time
+import threading
+import logging
+from collections import OrderedDict
+
+from src.profile_options import reachable_profiles
+
+logger = logging.getLogger(__name__)
+
+# How long pre-warming sleeps between checks while the app is degraded
+PREWARM_PAUSE = 5.0
+
+
+class RecommendationCache:
+    """
+    Bounded LRU memo in front of TravelRecommender.recommend.
+
+    Keys are (canonical profile, top_n, catalog/model version). The canonical profile
+    keeps only the fields that can change the result (filling in the recommender's
+    defaults), so display-only fields and no-op filters don't fragment the cache.
+    When the catalog (or CF model) version changes all entries are dropped.
+    """
+
+    def __init__(self, recommender, max_entries=4096, controller=None):
+        """
+        controller: Optional DegradationController; pre-warming pauses while
+                    it reports degraded mode, leaving the CPU to live requests.
+        """
+        self.recommender = recommender
+        self.max_entries = max_entries
+        self.controller = controller
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self._prewarm_thread = None
+
+    def canonical_profile(self, profile):
+        return self.recommender.canonical_profile(profile)
+
+    def _current_version(self):
+        version = self.recommender.cache_version
+        if version != self._version:
+            # Catalog reloaded since we last looked: everything cached is stale
+            self._entries.clear()
+            self._version = version
+        return version
+
+    def recommend(self, user_profile, top_n=5, user_vector=None):
+        """
+        Same contract as TravelRecommender.recommend.
+        Returns a copy, so callers may modify the result freely.
+        """
+        with self._lock:
+            key = (self.canonical_profile(user_profile), top_n, self._current_version())
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result.copy()
+            self.misses += 1
+
+        # Compute outside the lock so concurrent misses don't serialise
+        result = self.recommender.recommend(user_profile, top_n=top_n, user_vector=user_vector)
+        self._store(key, result)
+        return result.copy()
+
+    def _store(self, key, result):
+        with self._lock:
+            if key[2] != self._current_version():
+                return
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+    def prewarm(self, profiles=None, top_n=5):
+        """
+        Precomputes results for every reachable sidebar profile (or the given ones).
+        Profiles that canonicalise to an already cached key are skipped.
+
+        Returns: Number of entries computed.
+        """
+        computed = 0
+        for profile in profiles if profiles is not None else reachable_profiles():
+            while self.controller is not None and self.controller.degraded:
+                time.sleep(PREWARM_PAUSE)
+            with self._lock:
+                key = (self.canonical_profile(profile), top_n, self._current_version())
+                if key in self._entries:
+                    continue
+            self._store(key, self.recommender.recommend(profile, top_n=top_n))
+            computed += 1
+        logger.info(f"Recommendation cache pre-warmed with {computed} profiles.")
+        return computed
+
+    def prewarm_async(self, profiles=None, top_n=5):
+        """
+        Runs prewarm() on a background thread so startup isn't blocked.
+        """
+        if self._prewarm_thread is not None and self._prewarm_thread.is_alive():
+            return self._prewarm_thread
+        self._prewarm_thread = threading.Thread(
+            target=self.prewarm, args=(profiles, top_n), name="cache-prewarm", daemon=True
+        )
+        self._prewarm_thread.start()
+        return self._prewarm_thread
@@ -0,0 +1,115 @@
+import time
+import uuid
+import threading
+from collections import OrderedDict
+
+# Idle time after which a cursor is dropped (and its catalog snapshot released)
+CURSOR_TTL = 15 * 60
+MAX_CURSORS = 10_000
+
+
+class ResultCursor:
+    """
+    The full ranked, filtered result list of one query, paged on demand.
+
+    Ranking happens once, when the cursor is opened; it keeps only the row
+    positions and match scores, pinned to the catalog snapshot they came from.
+    Each page is materialised and explained the first time it's asked for,
+    so "Load more" costs only the new rows.
+    """
+
+    def __init__(self, snapshot, rows, scores, materialize, page_size=5):
+        """
+        Args:
+            snapshot (CatalogSnapshot): Catalog version the rows index into.
+            rows (array): Ranked row positions, best first.
+            scores (array): Match scores aligned with rows.
+            materialize (callable): f(snapshot, rows, scores) -> DataFrame of explained results.
+        """
+        self.snapshot = snapshot
+        self.rows = rows
+        self.scores = scores
+        self.page_size = page_size
+        self._materialize = materialize
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def version(self):
+        return self.snapshot.version
+
+    @property
+    def ids(self):
+        return self.snapshot.destinations.ids[self.rows] if len(self.rows) else self.rows
+
+    @property
+    def n_pages(self):
+        return -(-len(self.rows) // self.page_size)
+
+    def page(self, number):
+        """
+        Returns: DataFrame of the results on page `number` (0-based), empty past the end.
+        """
+        with self._lock:
+            result = self._pages.get(number)
+        if result is None:
+            window = slice(number * self.page_size, (number + 1) * self.page_size)
+            result = self._materialize(self.snapshot, self.rows[window], self.scores[window])
+            with self._lock:
+                self._pages[number] = result
+        return result.copy()
+
+
+class CursorStore:
+    """
+    Process-wide home of open cursors, so a session keeps only a token.
+
+    Cursors expire after `ttl` seconds without use, and the least recently
+    used are dropped beyond `max_entries`, which bounds how many old catalog
+    snapshots can be kept alive by idle sessions.
+    """
+
+    def __init__(self, ttl=CURSOR_TTL, max_entries=MAX_CURSORS):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # token -> (cursor, last used)
+        self._lock = threading.Lock()
+
+    def _evict(self, now):
+        while self._entries:
+            token, (_, last_used) = next(iter(self._entries.items()))
+            if now - last_used <= self.ttl and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[token]
+
+    def put(self, cursor):
+        """
+        Returns: Token to fetch the cursor with.
+        """
+        token = uuid.uuid4().hex
+        now = time.monotonic()
+        with self._lock:
+            self._entries[token] = (cursor, now)
+            self._evict(now)
+        return token
+
+    def get(self, token):
+        """
+        Returns: The cursor, or None if unknown or expired.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            self._entries[token] = (entry[0], now)
+            self._entries.move_to_end(token)
+            return entry[0]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,295 @@
+import os
+import time
+import sqlite3
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from src.sentiment import VaderScorer
+
+# Get project root (parent of src)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(PROJECT_ROOT, "data", "travel.db")
+
+# A review's weight in the recency-weighted score halves every HALF_LIFE_DAYS
+HALF_LIFE_DAYS = 180.0
+# destinations.sample_reviews keeps the newest few reviews, truncated like process_data does
+SAMPLE_REVIEWS = 2
+SAMPLE_CHARS = 100
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS reviews (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        destination_id INTEGER NOT NULL,
+        text TEXT,
+        compound REAL,             -- VADER compound score, -1..1
+        created_at REAL,           -- Unix seconds
+        FOREIGN KEY(destination_id) REFERENCES destinations(id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_reviews_destination ON reviews(destination_id, created_at);
+
+    -- Running per-destination aggregates, folded forward on every insert.
+    -- weighted_sum / weight_total are exponentially decayed sums as of decay_epoch.
+    CREATE TABLE IF NOT EXISTS review_aggregates (
+        destination_id INTEGER PRIMARY KEY,
+        review_count INTEGER NOT NULL,
+        compound_sum REAL NOT NULL,
+        weighted_sum REAL NOT NULL,
+        weight_total REAL NOT NULL,
+        decay_epoch REAL NOT NULL,
+        FOREIGN KEY(destination_id) REFERENCES destinations(id)
+    );
+'''
+
+AGGREGATE_COLUMNS = ['review_count', 'compound_sum', 'weighted_sum', 'weight_total', 'decay_epoch']
+
+
+def fold(aggregates, groups, compounds, timestamps, half_life_days=HALF_LIFE_DAYS):
+    """
+    Adds reviews to running per-destination aggregates without revisiting older ones.
+
+    The decayed sums are kept relative to decay_epoch (the newest timestamp
+    seen). A newer review first decays its destination's sums forward to its
+    own time; an older, late-arriving one is added with its weight already
+    decayed. Either way the result equals recomputing sum(w_i * c_i) / sum(w_i)
+    with w_i = 0.5 ** (age_i / half_life) from scratch.
+
+    Args:
+        aggregates (array): (n_destinations x 5) current state in AGGREGATE_COLUMNS
+            order; decay_epoch is -inf for a destination without one.
+        groups (array): Row of `aggregates` each new review belongs to.
+        compounds, timestamps (arrays): New reviews' scores and Unix times.
+
+    Returns: The updated (n_destinations x 5) array.
+    """
+    half_life = half_life_days * 86400.0
+    count, total, weighted, weight_total, epoch = np.asarray(aggregates, dtype=np.float64).T
+    n = len(count)
+
+    new_epoch = epoch.copy()
+    np.maximum.at(new_epoch, groups, timestamps)
+    with np.errstate(invalid='ignore'):
+        # 0 * 0.5**inf for destinations seen for the first time
+        carried = np.where(np.isfinite(epoch), 0.5 ** ((new_epoch - epoch) / half_life), 0.0)
+    weights = 0.5 ** ((new_epoch[groups] - timestamps) / half_life)
+
+    return np.column_stack([
+        count + np.bincount(groups, minlength=n),
+        total + np.bincount(groups, compounds, minlength=n),
+        weighted * carried + np.bincount(groups, weights * compounds, minlength=n),
+        weight_total * carried + np.bincount(groups, weights, minlength=n),
+        new_epoch,
+    ])
+
+
+class ReviewStore:
+    """
+    Append-only store of destination reviews in the `reviews` table.
+
+    Each insert scores the new text, folds it into the destination's running
+    aggregates (see fold) and writes the refreshed mean and count back to
+    `destinations.sentiment_score` / `review_count`, all in one transaction.
+
+    Only the touched destination rows change, so a recommender refresh (or
+    the CatalogWatcher) re-encodes just those rows. Values past the encoder's
+    fitted range saturate at encode time (DestinationVectorStore) until the
+    encoder's owner refits on the true values stored here.
+    """
+
+    def __init__(self, db_path=DB_PATH, scorer=None, half_life_days=HALF_LIFE_DAYS, seeded_at=None):
+        """
+        seeded_at: Unix time the seeded scores date from (default: now).
+        """
+        self.db_path = db_path
+        self.scorer = scorer or VaderScorer()
+        self.half_life_days = half_life_days
+        self.init_schema(seeded_at)
+
+    def _connect(self):
+        # Autocommit mode so transactions are opened explicitly (BEGIN IMMEDIATE)
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout = 5000")
+        return conn
+
+    def init_schema(self, seeded_at=None):
+        """
+        Creates the review tables if missing. Destinations that already carry a
+        processed sentiment_score / review_count are seeded from them, so their
+        score stays continuous as new reviews arrive.
+        """
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+            conn.execute('''
+                INSERT OR IGNORE INTO review_aggregates
+                    (destination_id, review_count, compound_sum, weighted_sum, weight_total, decay_epoch)
+                SELECT id, review_count, sentiment_score * review_count,
+                       sentiment_score * review_count, review_count, ?
+                FROM destinations
+                WHERE review_count > 0 AND sentiment_score IS NOT NULL
+            ''', (seeded_at if seeded_at is not None else time.time(),))
+        finally:
+            conn.close()
+
+    def add_reviews(self, destination_ids, texts, timestamps=None):
+        """
+        Appends a batch of reviews and updates their destinations' aggregates.
+
+        Args:
+            destination_ids (list): Destination id of each review.
+            texts (list): Review texts.
+            timestamps (list): Unix times (default: now).
+
+        Returns: Number of destinations whose aggregates changed.
+        """
+        if len(texts) == 0:
+            return 0
+        now = time.time()
+        batch = pd.DataFrame({
+            'destination_id': np.asarray(destination_ids, dtype=np.int64),
+            'text': list(texts),
+            'compound': np.round(self.scorer.compound_batch(list(texts)), 4),
+            'created_at': np.full(len(texts), now) if timestamps is None else np.asarray(timestamps, dtype=np.float64),
+        })
+        touched, groups = np.unique(batch['destination_id'].to_numpy(), return_inverse=True)
+        touched = touched.tolist()
+
+        conn = self._connect()
+        try:
+            # Take the write lock before reading the aggregates, so concurrent
+            # writers can't fold into the same starting state
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO reviews (destination_id, text, compound, created_at) VALUES (?, ?, ?, ?)",
+                batch.itertuples(index=False, name=None)
+            )
+            current = self._read_aggregates(conn, touched)
+            updated = fold(current, groups, batch['compound'].to_numpy(),
+                           batch['created_at'].to_numpy(), self.half_life_days)
+
+            conn.executemany('''
+                INSERT OR REPLACE INTO review_aggregates
+                    (destination_id, review_count, compound_sum, weighted_sum, weight_total, decay_epoch)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [(d, int(a[0]), *a[1:].tolist()) for d, a in zip(touched, updated)])
+            conn.executemany(
+                "UPDATE destinations SET sentiment_score = ?, review_count = ? WHERE id = ?",
+                [(round(a[1] / a[0], 4), int(a[0]), d) for d, a in zip(touched, updated)]
+            )
+            self._refresh_samples(conn, touched)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return len(touched)
+
+    def add_review(self, destination_id, text, timestamp=None):
+        return self.add_reviews([destination_id], [text], None if timestamp is None else [timestamp])
+
+    @staticmethod
+    def _read_aggregates(conn, destination_ids):
+        """
+        Aggregates for the given ids as an array in AGGREGATE_COLUMNS order
+        (an empty aggregate for ids without one).
+        """
+        placeholders = ", ".join("?" * len(destination_ids))
+        rows = conn.execute(f"""
+            SELECT destination_id, {', '.join(AGGREGATE_COLUMNS)}
+            FROM review_aggregates WHERE destination_id IN ({placeholders})
+        """, destination_ids).fetchall()
+        current = np.zeros((len(destination_ids), len(AGGREGATE_COLUMNS)))
+        current[:, -1] = -np.inf
+        position = {d: i for i, d in enumerate(destination_ids)}
+        for destination_id, *values in rows:
+            current[position[destination_id]] = values
+        return current
+
+    @staticmethod
+    def _refresh_samples(conn, destination_ids):
+        # One index seek per destination on (destination_id, created_at)
+        samples = []
+        for destination_id in destination_ids:
+            newest = conn.execute(
+                "SELECT text FROM reviews WHERE destination_id = ? ORDER BY created_at DESC, id DESC LIMIT ?",
+                (destination_id, SAMPLE_REVIEWS)
+            ).fetchall()
+            samples.append((" || ".join(text[:SAMPLE_CHARS] + "..." for (text,) in newest), destination_id))
+        conn.executemany("UPDATE destinations SET sample_reviews = ? WHERE id = ?", samples)
+
+    def aggregates(self, destination_ids=None):
+        """
+        Current aggregates as a DataFrame indexed by destination_id, with
+        'review_count', 'mean_sentiment' and 'recent_sentiment' (recency-weighted).
+        """
+        conn = self._connect()
+        try:
+            query = "SELECT * FROM review_aggregates"
+            params = []
+            if destination_ids is not None:
+                query += f" WHERE destination_id IN ({', '.join('?' * len(destination_ids))})"
+                params = [int(d) for d in destination_ids]
+            df = pd.read_sql_query(query, conn, params=params)
+        finally:
+            conn.close()
+        df['mean_sentiment'] = df['compound_sum'] / df['review_count']
+        df['recent_sentiment'] = df['weighted_sum'] / df['weight_total']
+        return df.set_index('destination_id')[['review_count', 'mean_sentiment', 'recent_sentiment']]
+
+    def recent_reviews(self, destination_id, limit=10):
+        """
+        Newest reviews for one destination: DataFrame of text, compound, created_at.
+        """
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(
+                "SELECT text, compound, created_at FROM reviews WHERE destination_id = ? "
+                "ORDER BY created_at DESC, id DESC LIMIT ?",
+                conn, params=[int(destination_id), limit]
+            )
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    # Benchmark: streaming reviews into a copy of the catalog, incremental
+    # aggregates vs. recomputing every destination's score from the full table
+    import shutil
+
+    rng = np.random.default_rng(0)
+    phrases = ["Amazing place, loved it!", "Too crowded and dirty.", "Okay, nothing special.",
+               "Breathtaking views, must visit", "Not worth the entrance fee :(",
+               "Good for families but very hot in summer", "Terrible service, never again",
+               "Peaceful and beautiful temple", "Great food stalls nearby", "Long queues but worth it"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "travel.db")
+        shutil.copy(DB_PATH, db_path)
+        store = ReviewStore(db_path)
+        ids = store.aggregates().index.to_numpy()
+
+        # A year of reviews arriving in small batches
+        n_batches, batch_size = 2_000, 50
+        clock = time.time() - 365 * 86400
+        start = time.perf_counter()
+        for _ in range(n_batches):
+            texts = [f"{rng.choice(phrases)} {rng.choice(phrases)}" for _ in range(batch_size)]
+            clock += 365 * 86400 / n_batches
+            store.add_reviews(rng.choice(ids, batch_size), texts, np.full(batch_size, clock))
+        incremental = (time.perf_counter() - start) / n_batches
+
+        # The alternative: rescore every stored review and regroup after each batch
+        conn = sqlite3.connect(db_path)
+        start = time.perf_counter()
+        reviews = pd.read_sql_query("SELECT destination_id, text FROM reviews", conn)
+        reviews['compound'] = store.scorer.compound_batch(reviews['text'].tolist())
+        reviews.groupby('destination_id')['compound'].agg(['count', 'mean'])
+        full = time.perf_counter() - start
+        conn.close()
+
+        print(f"{n_batches * batch_size:,} reviews appended in batches of {batch_size}")
+        print(f"incremental: {incremental * 1000:.2f} ms per batch")
+        print(f"full recompute over {len(reviews):,} reviews: {full * 1000:.2f} ms per batch")
+        print(store.aggregates().sort_values('review_count').tail(3).to_string())
@@ -0,0 +1,237 @@
+import os
+import re
+import time
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from src.feature_engine import ARTIFACTS_DIR
+
+SEARCH_INDEX_PATH = os.path.join(ARTIFACTS_DIR, "search_index.npz")
+
+# Indexed columns of `destinations`, with their BM25F field weights (a hit in
+# the name counts for more than the same word somewhere in a review)
+SEARCH_COLUMNS = ['name', 'city', 'state', 'type', 'significance', 'sample_reviews']
+COLUMN_WEIGHTS = {'name': 3.0, 'city': 2.0, 'state': 1.5, 'type': 2.0, 'significance': 1.5, 'sample_reviews': 1.0}
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# Best text matches handed to the recommender for blending
+MAX_MATCHES = 1000
+
+# Connecting words in natural queries ("tea gardens near Munnar") that
+# shouldn't have to appear in the text
+STOPWORDS = {
+    'a', 'an', 'and', 'around', 'at', 'best', 'by', 'for', 'from', 'in', 'into', 'near',
+    'of', 'on', 'or', 'place', 'places', 'the', 'to', 'visit', 'with',
+}
+
+_TOKEN = re.compile(r"\w+")
+
+
+def _stem(token):
+    # Just enough to fold plurals: "tombs" -> "tomb", "churches" -> "church", "cities" -> "city"
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 4 and token.endswith(('ches', 'shes', 'sses', 'xes')):
+        return token[:-2]
+    if len(token) > 3 and token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """
+    Lower-cased, plural-folded word tokens of a text (stopwords kept).
+    """
+    if not isinstance(text, str):
+        return []
+    return [_stem(t) for t in _TOKEN.findall(text.lower())]
+
+
+def query_terms(text):
+    """
+    Distinct search terms of a free-text query, stopwords dropped, in order.
+    Queries with the same terms give the same results.
+    """
+    terms = [t for t in tokenize(text) if t not in STOPWORDS]
+    return tuple(dict.fromkeys(terms))
+
+
+def text_fingerprint(ids, texts):
+    """
+    Identifies the exact text an index was built from.
+    """
+    digest = hashlib.sha1()
+    digest.update(np.asarray(ids, dtype=np.int64).tobytes())
+    for col in SEARCH_COLUMNS:
+        digest.update(pd.util.hash_pandas_object(pd.Series(texts[col]).astype(object), index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+class SearchIndex:
+    """
+    In-memory inverted index with BM25F ranking over the destinations' text.
+
+    Postings are stored CSR-style by term (row position + precomputed BM25
+    term-frequency weight), so a query reads one slice per term and sums the
+    overlaps: no scan over rows that don't mention the terms.
+
+    Each distinct column value is tokenised once, which keeps building cheap
+    for the repetitive columns (city, state, type, significance).
+    """
+
+    def __init__(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.vocabulary = {}
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.postings = np.empty(0, dtype=np.int32)
+        self.weights = np.empty(0, dtype=np.float32)
+        self.idf = np.empty(0, dtype=np.float32)
+        self.fingerprint = None
+
+    def _column_postings(self, values, weight):
+        """
+        (term ids, row positions, weighted term counts) for one text column,
+        plus the weighted length of each row.
+        """
+        codes, uniques = pd.factorize(pd.Series(values).astype(object))
+        tokens = [[self.vocabulary.setdefault(t, len(self.vocabulary)) for t in tokenize(u)] for u in uniques]
+        lengths = np.array([len(t) for t in tokens] + [0], dtype=np.int64)  # code -1 (missing) has none
+        offsets = np.concatenate([[0], np.cumsum(lengths[:-1])])
+        flat = np.fromiter((t for ts in tokens for t in ts), dtype=np.int64, count=int(lengths.sum()))
+
+        counts = lengths[codes]
+        total = int(counts.sum())
+        rows = np.repeat(np.arange(len(codes)), counts)
+        within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        terms = flat[np.repeat(offsets[np.maximum(codes, 0)], counts) + within]
+        return terms, rows, np.full(total, weight), counts * weight
+
+    def build(self, ids, texts, fingerprint=None):
+        """
+        Args:
+            ids (array): Destination ids.
+            texts (dict): SEARCH_COLUMNS -> values aligned with ids (None/NaN allowed).
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        n = len(ids)
+        self.vocabulary = {}
+        parts = [self._column_postings(texts[col], COLUMN_WEIGHTS[col]) for col in SEARCH_COLUMNS]
+        terms = np.concatenate([p[0] for p in parts])
+        rows = np.concatenate([p[1] for p in parts])
+        counts = np.concatenate([p[2] for p in parts])
+        doc_len = np.sum([p[3] for p in parts], axis=0) if n else np.empty(0)
+
+        # Merge repeats of a term in a row (across and within columns), sorted by term then row
+        keys, inverse = np.unique(terms * max(n, 1) + rows, return_inverse=True)
+        tf = np.bincount(inverse, counts)
+        terms, rows = keys // max(n, 1), keys % max(n, 1)
+
+        avg_len = doc_len.mean() if n else 1.0
+        norm = K1 * (1.0 - B + B * doc_len[rows] / max(avg_len, 1e-9))
+        df = np.bincount(terms, minlength=len(self.vocabulary))
+
+        self.ids = ids
+        self.indptr = np.concatenate([[0], np.cumsum(df)])
+        self.postings = rows.astype(np.int32)
+        self.weights = (tf * (K1 + 1.0) / (tf + norm)).astype(np.float32)
+        self.idf = np.log(1.0 + (n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        self.fingerprint = fingerprint
+        return self
+
+    def search(self, query, limit=MAX_MATCHES):
+        """
+        Destinations matching any of the query's terms, best first.
+
+        Returns: (destination ids, relevance scaled so the best match is 1.0).
+        Both are empty if nothing matches.
+        """
+        term_ids = [self.vocabulary[t] for t in query_terms(query) if t in self.vocabulary]
+        if not term_ids:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        if len(term_ids) == 1:
+            t = term_ids[0]
+            rows = self.postings[self.indptr[t]:self.indptr[t + 1]]
+            scores = self.weights[self.indptr[t]:self.indptr[t + 1]] * self.idf[t]
+        else:
+            slices = [slice(self.indptr[t], self.indptr[t + 1]) for t in term_ids]
+            hits = np.concatenate([self.postings[s] for s in slices])
+            contributions = np.concatenate([self.weights[s] * self.idf[t] for s, t in zip(slices, term_ids)])
+            # Sum each row's contributions: sort by row (radix sort for int32),
+            # then reduce over runs of equal rows
+            order = np.argsort(hits, kind='stable')
+            hits = hits[order]
+            starts = np.flatnonzero(np.r_[True, hits[1:] != hits[:-1]])
+            rows = hits[starts]
+            scores = np.add.reduceat(contributions[order].astype(np.float64), starts)
+
+        if len(rows) > limit:
+            keep = np.argpartition(-scores, limit - 1)[:limit]
+            rows, scores = rows[keep], scores[keep]
+        order = np.lexsort((rows, -scores))
+        scores = scores[order].astype(np.float64)
+        return self.ids[rows[order]], scores / scores[0]
+
+    def save(self, path=SEARCH_INDEX_PATH):
+        # Write-then-rename so readers never see a half-written file
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        terms = np.empty(len(self.vocabulary), dtype=object)
+        for term, t in self.vocabulary.items():
+            terms[t] = term
+        np.savez(tmp_path, ids=self.ids, terms=terms.astype(str), indptr=self.indptr,
+                 postings=self.postings, weights=self.weights, idf=self.idf,
+                 fingerprint=np.array(self.fingerprint or ""))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=SEARCH_INDEX_PATH):
+        index = cls()
+        with np.load(path) as data:
+            index.ids = data['ids']
+            index.vocabulary = {term: t for t, term in enumerate(data['terms'].tolist())}
+            index.indptr = data['indptr']
+            index.postings = data['postings']
+            index.weights = data['weights']
+            index.idf = data['idf']
+            index.fingerprint = str(data['fingerprint']) or None
+        return index
+
+
+if __name__ == "__main__":
+    # Benchmark: build and query latency on a synthetic 1M-row catalog
+    import sqlite3
+    from src.recommender import DB_PATH
+
+    rng = np.random.default_rng(0)
+    conn = sqlite3.connect(DB_PATH)
+    catalog = pd.read_sql_query(f"SELECT {', '.join(SEARCH_COLUMNS)} FROM destinations", conn)
+    conn.close()
+
+    n = 1_000_000
+    rows = catalog.iloc[rng.integers(0, len(catalog), n)].reset_index(drop=True)
+    # Vary the names so the vocabulary isn't just the real catalog's
+    rows['name'] = rows['name'] + " " + pd.Series(rng.integers(0, 50_000, n)).astype(str)
+    ids = np.arange(1, n + 1)
+
+    start = time.perf_counter()
+    index = SearchIndex().build(ids, rows)
+    print(f"Build: {n:,} destinations, {len(index.vocabulary):,} terms, "
+          f"{len(index.postings):,} postings in {time.perf_counter() - start:.1f}s")
+
+    for query in ["Mughal tombs", "tea gardens near Munnar", "Kerala backwaters", "fort", "temple"]:
+        index.search(query)  # warm-up
+        start = time.perf_counter()
+        for _ in range(20):
+            found, relevance = index.search(query)
+        ms = (time.perf_counter() - start) / 20 * 1000
+        matched = sum(index.indptr[index.vocabulary[t] + 1] - index.indptr[index.vocabulary[t]]
+                      for t in query_terms(query) if t in index.vocabulary)
+        print(f"{query!r:28} {ms:6.2f} ms  ({matched:,} postings scanned)")
+
+    # Sanity check on the real catalog
+    real = SearchIndex().build(np.arange(1, len(catalog) + 1), catalog)
+    found, relevance = real.search("Mughal tombs")
+    print(catalog.iloc[found[:3] - 1][['name', 'city', 'type']].to_string())
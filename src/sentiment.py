@@ -0,0 +1,293 @@
+import os
+import re
+import json
+import math
+import time
+import string
+
+import numpy as np
+import pandas as pd
+
+# Get project root (parent of src)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LEXICON_PATH = os.path.join(PROJECT_ROOT, "data", "lexicons", "vader_lexicon.json")
+
+# --- VADER constants (Hutto & Gilbert, 2014), as used by nltk.sentiment.vader ---
+B_INCR = 0.293
+B_DECR = -0.293
+C_INCR = 0.733
+N_SCALAR = -0.74
+
+NEGATE = {
+    "aint", "arent", "cannot", "cant", "couldnt", "darent", "didnt", "doesnt",
+    "ain't", "aren't", "can't", "couldn't", "daren't", "didn't", "doesn't",
+    "dont", "hadnt", "hasnt", "havent", "isnt", "mightnt", "mustnt", "neither",
+    "don't", "hadn't", "hasn't", "haven't", "isn't", "mightn't", "mustn't",
+    "neednt", "needn't", "never", "none", "nope", "nor", "not", "nothing",
+    "nowhere", "oughtnt", "shant", "shouldnt", "uhuh", "wasnt", "werent",
+    "oughtn't", "shan't", "shouldn't", "uh-uh", "wasn't", "weren't", "without",
+    "wont", "wouldnt", "won't", "wouldn't", "rarely", "seldom", "despite",
+}
+
+BOOSTER_DICT = {
+    **dict.fromkeys([
+        "absolutely", "amazingly", "awfully", "completely", "considerably", "decidedly",
+        "deeply", "effing", "enormously", "entirely", "especially", "exceptionally",
+        "extremely", "fabulously", "flipping", "flippin", "fricking", "frickin",
+        "frigging", "friggin", "fully", "fucking", "greatly", "hella", "highly",
+        "hugely", "incredibly", "intensely", "majorly", "more", "most", "particularly",
+        "purely", "quite", "really", "remarkably", "so", "substantially", "thoroughly",
+        "totally", "tremendously", "uber", "unbelievably", "unusually", "utterly", "very",
+    ], B_INCR),
+    **dict.fromkeys([
+        "almost", "barely", "hardly", "just enough", "kind of", "kinda", "kindof",
+        "kind-of", "less", "little", "marginally", "occasionally", "partly", "scarcely",
+        "slightly", "somewhat", "sort of", "sorta", "sortof", "sort-of",
+    ], B_DECR),
+}
+
+SPECIAL_CASE_IDIOMS = {
+    "the shit": 3, "the bomb": 3, "bad ass": 1.5, "yeah right": -2,
+    "cut the mustard": 2, "kiss of death": -1.5, "hand to mouth": -2,
+}
+
+PUNC_LIST = {".", "!", "?", ",", ";", ":", "-", "'", '"',
+             "!!", "!!!", "??", "???", "?!?", "!?!", "?!?!", "!?!?"}
+
+# A token is stripped to its word when it is <word><punctuation> or
+# <punctuation><word>, the word has no punctuation, and the punctuation is in PUNC_LIST
+_PUNCT = re.escape(string.punctuation)
+_TRAILING = re.compile(f"^([^{_PUNCT}]{{2,}})([{_PUNCT}]+)$")
+_LEADING = re.compile(f"^([{_PUNCT}]+)([^{_PUNCT}]{{2,}})$")
+
+
+def compile_lexicon(source_path, out_path=LEXICON_PATH):
+    """
+    Builds the vendored lexicon artifact from an upstream vader_lexicon.txt
+    (token, mean valence, std dev, raw ratings; tab separated). Only the
+    token -> mean valence table is kept.
+    """
+    lexicon = {}
+    with open(source_path, encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) >= 2:
+                lexicon[fields[0]] = float(fields[1])
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"source": "VADER sentiment lexicon (C.J. Hutto, MIT License)", "lexicon": lexicon},
+                  f, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    return len(lexicon)
+
+
+class VaderScorer:
+    """
+    Offline, dependency-free VADER compound scorer.
+
+    Follows the rules of nltk's SentimentIntensityAnalyzer (boosters, negation,
+    "but", "least", idioms, ALL-CAPS emphasis, !/? amplification), but:
+    - the lexicon is a precompiled JSON table shipped with the repo, so no
+      nltk import and no download;
+    - tokens are stripped with two regexes instead of building a dict of
+      every word x punctuation combination per call;
+    - compound_batch() scores each distinct text once.
+    """
+
+    def __init__(self, lexicon_path=LEXICON_PATH):
+        with open(lexicon_path, encoding="utf-8") as f:
+            self.lexicon = json.load(f)["lexicon"]
+
+    @staticmethod
+    def tokenize(text):
+        tokens = []
+        for token in text.split():
+            if len(token) <= 1:
+                continue
+            match = _TRAILING.match(token)
+            if match and match.group(2) in PUNC_LIST:
+                token = match.group(1)
+            else:
+                match = _LEADING.match(token)
+                if match and match.group(1) in PUNC_LIST:
+                    token = match.group(2)
+            tokens.append(token)
+        return tokens
+
+    def compound(self, text):
+        """
+        VADER compound score in [-1, 1] for one text.
+        """
+        if not isinstance(text, str):
+            text = str(text)
+        tokens = self.tokenize(text)
+        if not tokens:
+            return 0.0
+        lower = [t.lower() for t in tokens]
+        lexicon = self.lexicon
+
+        upper = [t.isupper() for t in tokens]
+        n_upper = sum(upper)
+        is_cap_diff = 0 < len(tokens) - n_upper < len(tokens)
+
+        # nltk scores every repeat of a token at its first position
+        first_index = {}
+        for idx, token in enumerate(tokens):
+            first_index.setdefault(token, idx)
+
+        sentiments = []
+        for token in tokens:
+            i = first_index[token]
+            word = lower[i]
+            if word in BOOSTER_DICT or (word == "kind" and i < len(tokens) - 1 and lower[i + 1] == "of"):
+                sentiments.append(0)
+                continue
+
+            valence = lexicon.get(word)
+            if valence is None:
+                sentiments.append(0)
+                continue
+
+            if upper[i] and is_cap_diff:
+                valence += C_INCR if valence > 0 else -C_INCR
+
+            for start_i in range(3):
+                if i <= start_i:
+                    break
+                prev = lower[i - start_i - 1]
+                if prev in lexicon:
+                    continue
+                scalar = BOOSTER_DICT.get(prev, 0.0)
+                if scalar:
+                    if valence < 0:
+                        scalar = -scalar
+                    if upper[i - start_i - 1] and is_cap_diff:
+                        scalar += C_INCR if valence > 0 else -C_INCR
+                    scalar *= (1.0, 0.95, 0.9)[start_i]
+                valence += scalar
+                valence = self._never_check(valence, tokens, lower, start_i, i)
+                if start_i == 2:
+                    valence = self._idioms_check(valence, tokens, i)
+
+            valence = self._least_check(valence, lower, lexicon, i)
+            sentiments.append(valence)
+
+        if "but" in lower:
+            bi = lower.index("but")
+            sentiments = [s * 0.5 if k < bi else s * 1.5 if k > bi else s for k, s in enumerate(sentiments)]
+
+        total = float(sum(sentiments))
+        amplifier = min(text.count("!"), 4) * 0.292
+        qm_count = text.count("?")
+        if qm_count > 1:
+            amplifier += qm_count * 0.18 if qm_count <= 3 else 0.96
+        if total > 0:
+            total += amplifier
+        elif total < 0:
+            total -= amplifier
+        return total / math.sqrt(total * total + 15)
+
+    @staticmethod
+    def _negated(word):
+        word = word.lower()
+        return word in NEGATE or "n't" in word
+
+    def _never_check(self, valence, tokens, lower, start_i, i):
+        if start_i == 0:
+            if self._negated(tokens[i - 1]):
+                valence *= N_SCALAR
+        elif start_i == 1:
+            if tokens[i - 2] == "never" and tokens[i - 1] in ("so", "this"):
+                valence *= 1.5
+            elif self._negated(tokens[i - 2]):
+                valence *= N_SCALAR
+        else:
+            if (tokens[i - 3] == "never" and tokens[i - 2] in ("so", "this")) or tokens[i - 1] in ("so", "this"):
+                valence *= 1.25
+            elif self._negated(tokens[i - 3]):
+                valence *= N_SCALAR
+        return valence
+
+    @staticmethod
+    def _idioms_check(valence, tokens, i):
+        onezero = f"{tokens[i - 1]} {tokens[i]}"
+        twoonezero = f"{tokens[i - 2]} {tokens[i - 1]} {tokens[i]}"
+        twoone = f"{tokens[i - 2]} {tokens[i - 1]}"
+        threetwoone = f"{tokens[i - 3]} {tokens[i - 2]} {tokens[i - 1]}"
+        threetwo = f"{tokens[i - 3]} {tokens[i - 2]}"
+        for seq in (onezero, twoonezero, twoone, threetwoone, threetwo):
+            if seq in SPECIAL_CASE_IDIOMS:
+                valence = SPECIAL_CASE_IDIOMS[seq]
+                break
+        if len(tokens) - 1 > i:
+            zeroone = f"{tokens[i]} {tokens[i + 1]}"
+            if zeroone in SPECIAL_CASE_IDIOMS:
+                valence = SPECIAL_CASE_IDIOMS[zeroone]
+        if len(tokens) - 1 > i + 1:
+            zeroonetwo = f"{tokens[i]} {tokens[i + 1]} {tokens[i + 2]}"
+            if zeroonetwo in SPECIAL_CASE_IDIOMS:
+                valence = SPECIAL_CASE_IDIOMS[zeroonetwo]
+        if threetwo in BOOSTER_DICT or twoone in BOOSTER_DICT:
+            valence += B_DECR
+        return valence
+
+    @staticmethod
+    def _least_check(valence, lower, lexicon, i):
+        if i > 0 and lower[i - 1] == "least" and lower[i - 1] not in lexicon:
+            if i == 1 or lower[i - 2] not in ("at", "very"):
+                valence *= N_SCALAR
+        return valence
+
+    def compound_batch(self, texts):
+        """
+        Compound scores for an array of texts. Each distinct text is scored once.
+        Returns: np.ndarray aligned with texts
+        """
+        codes, uniques = pd.factorize(pd.Series(texts, dtype=object), use_na_sentinel=False)
+        scores = np.array([self.compound(text) for text in uniques], dtype=np.float64)
+        return scores[codes]
+
+
+if __name__ == "__main__":
+    # Benchmark + compatibility check against nltk's VADER (if installed)
+    scorer = VaderScorer()
+    rng = np.random.default_rng(0)
+    words = list(scorer.lexicon)
+    fillers = ["the", "room", "hotel", "staff", "was", "and", "view", "we", "stayed", "food", "but",
+               "not", "very", "really", "never", "so", "kind of", "at least", "least", "!", "?"]
+    reviews = []
+    for _ in range(2_000):
+        tokens = rng.choice(fillers, rng.integers(5, 40)).tolist()
+        for pos in rng.integers(0, len(tokens), rng.integers(1, 6)):
+            word = rng.choice(words)
+            tokens[pos] = word.upper() if rng.random() < 0.1 else word
+        text = " ".join(tokens)
+        reviews.append(text + rng.choice(["", ".", "!", "!!!", "??"]))
+    # Review pools are sampled with replacement downstream, so texts repeat
+    batch = rng.choice(reviews, 20_000).tolist()
+
+    start = time.perf_counter()
+    fast = scorer.compound_batch(batch)
+    fast_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for text in reviews:
+        scorer.compound(text)
+    single_s = time.perf_counter() - start
+    print(f"VaderScorer: {len(reviews) / single_s:9,.0f} texts/s per call, "
+          f"{len(batch) / fast_s:9,.0f} texts/s batched ({len(batch):,} texts, {len(reviews):,} distinct)")
+
+    try:
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer, VaderConstants
+    except ImportError:
+        print("nltk not installed; skipping the comparison")
+    else:
+        # Same lexicon table on both sides, so only the scoring code is compared
+        sia = SentimentIntensityAnalyzer.__new__(SentimentIntensityAnalyzer)
+        sia.lexicon = dict(scorer.lexicon)
+        sia.constants = VaderConstants()
+        start = time.perf_counter()
+        reference = np.array([sia.polarity_scores(text)['compound'] for text in batch])
+        nltk_s = time.perf_counter() - start
+        print(f"nltk:        {len(batch) / nltk_s:9,.0f} texts/s per call "
+              f"-> batched speedup {nltk_s / fast_s:.0f}x, per call {nltk_s / len(batch) / (single_s / len(reviews)):.1f}x")
+        diff = np.abs(np.round(fast, 4) - reference)
+        print(f"max |compound diff| = {diff.max():.4f}, exact (4 dp) on {np.mean(diff == 0):.1%} of texts")
@@ -2,26 +2,30 @@
 import sqlite3
 import pandas as pd
 import os
+import sys
 import json
 
-# Configuration
+# Add project root to path (this file is run as a script)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.review_store import ReviewStore
+
 # Configuration
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(PROJECT_ROOT, "data", "travel.db")
 CSV_PATH = os.path.join(PROJECT_ROOT, "data", "processed", "destinations_with_sentiment.csv")
 
-def init_db():
-    print(f"Initializing database at {DB_PATH}...")
+def init_db(db_path=DB_PATH):
+    print(f"Initializing database at {db_path}...")
     
     # Remove old DB if exists to ensure clean slate (optional, but good for dev)
-    if os.path.exists(DB_PATH):
+    if os.path.exists(db_path):
         try:
-            os.remove(DB_PATH)
+            os.remove(db_path)
             print("Removed existing database.")
         except Exception as e:
             print(f"Warning: Could not remove existing DB: {e}")
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
     # 1. Create Users Table
@@ -57,6 +61,7 @@ def init_db():
             entrance_fee REAL,
             budget_bucket TEXT,
             google_rating REAL,
+            google_review_lakhs REAL,  -- Google review volume, used for popularity ordering
             sentiment_score REAL,
             review_count INTEGER,
             sample_reviews TEXT,
@@ -84,15 +89,15 @@ def init_db():
     conn.close()
     print("Database schema created successfully.")
 
-def populate_destinations():
-    print(f"Loading data from {CSV_PATH}...")
-    if not os.path.exists(CSV_PATH):
+def populate_destinations(db_path=DB_PATH, csv_path=CSV_PATH):
+    print(f"Loading data from {csv_path}...")
+    if not os.path.exists(csv_path):
         print("Error: Processed CSV not found.")
         return
 
-    df = pd.read_csv(CSV_PATH)
+    df = pd.read_csv(csv_path)
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
     # Insert data row by row (or use to_sql)
@@ -110,14 +115,15 @@ def populate_destinations():
                     name, zone, state, city, type, significance, 
                     time_needed_hrs, duration_bucket, 
                     entrance_fee, budget_bucket, 
-                    google_rating, sentiment_score, review_count, 
+                    google_rating, google_review_lakhs, sentiment_score, review_count, 
                     sample_reviews, best_time_to_visit, weekly_off
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 row['name'], row['zone'], row['state'], row['city'], row['type'], row['significance'],
                 row['time_needed_hrs'], row['duration_bucket'],
                 row['entrance_fee'], row['budget_bucket'],
-                row['google_review_rating'], row['sentiment_score'], row['review_count'],
+                row['google_review_rating'], row['number_of_google_review_in_lakhs'],
+                row['sentiment_score'], row['review_count'],
                 row['sample_reviews'], row['best_time_to_visit'], row['weekly_off']
             ))
             count += 1
@@ -128,9 +134,9 @@ def populate_destinations():
     conn.close()
     print(f"Successfully inserted {count} destinations.")
 
-def create_dummy_user():
+def create_dummy_user(db_path=DB_PATH):
     # Insert a dummy profile for testing
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
     print("Creating dummy user (Student Profile)...")
@@ -142,7 +148,13 @@ def create_dummy_user():
     conn.commit()
     conn.close()
 
+def init_reviews(db_path=DB_PATH, seeded_at=None):
+    # Review tables, with running aggregates seeded from the processed sentiment scores
+    print("Creating 'reviews' and 'review_aggregates' tables...")
+    ReviewStore(db_path, seeded_at=seeded_at)
+
 if __name__ == "__main__":
     init_db()
     populate_destinations()
+    init_reviews()
     create_dummy_user()
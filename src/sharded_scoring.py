@@ -0,0 +1,236 @@
+import os
+import time
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from src.destination_store import DestinationStore
+from src.recommender import TravelRecommender
+
+# Per-worker state: the catalog version this process is attached to.
+# Workers keep their attachment between tasks and only re-attach when a new
+# snapshot is shared.
+_worker = {'key': None, 'blocks': [], 'destinations': None, 'vectors': None}
+
+
+def _share_array(array, blocks):
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+    blocks.append(shm)
+    return (shm.name, array.shape, array.dtype.str)
+
+
+def _attach_array(block, attached):
+    name, shape, dtype = block
+    # Workers share the coordinator's resource tracker, which unlinks the
+    # block when the coordinator calls close()
+    shm = shared_memory.SharedMemory(name=name)
+    attached.append(shm)
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _attach(spec):
+    if _worker['key'] == spec['key']:
+        return _worker['destinations'], _worker['vectors']
+
+    # Drop the previous version before attaching the new one
+    _worker['destinations'] = _worker['vectors'] = None
+    for shm in _worker['blocks']:
+        shm.close()
+
+    attached = []
+    columns = {}
+    for col, (kind, block, categories) in spec['columns'].items():
+        values = _attach_array(block, attached)
+        if kind == 'cat':
+            values = pd.Categorical.from_codes(values, dtype=pd.CategoricalDtype(categories))
+        columns[col] = values
+
+    ids = _attach_array(spec['ids'], attached)
+    _worker.update(
+        key=spec['key'],
+        blocks=attached,
+        destinations=DestinationStore(ids, columns, spec['column_order']),
+        vectors=_attach_array(spec['vectors'], attached),
+    )
+    return _worker['destinations'], _worker['vectors']
+
+
+def _score_shard(spec, start, stop, user_vector, profile, top_n, cf_scores=None, cf_weight=0.0):
+    """
+    Worker task: local top-n of rows [start, stop) with hard constraints applied.
+    Returns global row positions and their scores.
+    """
+    destinations, vectors = _attach(spec)
+    top, scores = TravelRecommender._score_and_rank(
+        destinations.slice(start, stop), vectors[start:stop], user_vector, profile, top_n,
+        cf_scores, cf_weight
+    )
+    return top + start, scores
+
+
+class ShardedScorer:
+    """
+    Scores one catalog snapshot across a process pool.
+
+    The unit vectors and the (non-text) columns of the DestinationStore are
+    copied once into `multiprocessing.shared_memory` blocks; workers attach to
+    them zero-copy. Each worker ranks a contiguous shard with the same code as
+    the single-process path, and the coordinator merges the local top-n lists.
+    Since every global top-n row is in its shard's local top-n, and ties are
+    broken by catalog position in both stages, results match the in-process
+    path exactly.
+
+    The blocks outlive close() until every top_k call already running on
+    them has finished, so replacing the scorer on refresh never pulls shared
+    memory out from under a worker that is about to attach.
+    """
+
+    def __init__(self, destinations, vectors, version, executor, n_shards=None):
+        self.version = version
+        self.destinations = destinations
+        self.executor = executor
+        self._blocks = []
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._closed = False
+
+        columns = {}
+        for col in destinations.column_names:
+            values = destinations[col]
+            if isinstance(values, pd.Categorical):
+                columns[col] = ('cat', _share_array(values.codes, self._blocks), list(values.categories))
+            else:
+                columns[col] = ('num', _share_array(values, self._blocks), None)
+
+        vectors_block = _share_array(np.ascontiguousarray(vectors), self._blocks)
+        self.spec = {
+            'key': vectors_block[0],
+            'ids': _share_array(destinations.ids, self._blocks),
+            'vectors': vectors_block,
+            'columns': columns,
+            'column_order': destinations.column_order,
+        }
+
+        n_shards = n_shards or os.cpu_count()
+        bounds = np.linspace(0, len(destinations), n_shards + 1).astype(int)
+        self.shards = [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+    @staticmethod
+    def create_executor(n_workers):
+        # 'spawn' avoids forking a process that may be running Streamlit/watcher threads
+        return ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context('spawn'))
+
+    def top_k(self, user_vector, profile, top_n, cf_scores=None, cf_weight=0.0):
+        """
+        Returns: (global row positions, match scores) of the top_n rows, or
+                 None if this scorer has been closed (score in-process instead).
+        cf_scores (per-request, aligned with the catalog) are sent sliced per shard.
+        """
+        with self._lock:
+            if self._closed:
+                return None
+            self._in_flight += 1
+        futures = []
+        try:
+            futures = [
+                self.executor.submit(_score_shard, self.spec, start, stop, user_vector, profile, top_n,
+                                     cf_scores[start:stop] if cf_scores is not None else None, cf_weight)
+                for start, stop in self.shards
+            ]
+            results = [f.result() for f in futures]
+        finally:
+            # Every shard task must be done with the blocks before they may go
+            wait(futures)
+            with self._lock:
+                self._in_flight -= 1
+                release = self._closed and self._in_flight == 0
+            if release:
+                self._release()
+
+        # Shards are in catalog order, so concatenation keeps position tie-breaking intact
+        positions = np.concatenate([r[0] for r in results])
+        scores = np.concatenate([r[1] for r in results])
+        ratings = self.destinations['google_rating'][positions]
+        order = TravelRecommender._rank(np.arange(len(positions)), scores, ratings, top_n)
+        return positions[order], scores[order]
+
+    def close(self):
+        """
+        Retires the scorer. Its shared memory is unlinked now, or by the last
+        top_k call still in flight.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            release = self._in_flight == 0
+        if release:
+            self._release()
+
+    def _release(self):
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+
+
+if __name__ == "__main__":
+    # Benchmark: synthetic catalog built by tiling the real one
+    import warnings
+    warnings.filterwarnings('ignore')
+
+    base = TravelRecommender()
+    state = base.vector_store.snapshot
+    frame = state.destinations.to_frame(with_text=False)
+
+    profile = {
+        'type': 'Nature',
+        'significance': 'Relaxation',
+        'duration_bucket': 'Short',
+        'budget_bucket': 'Low',
+        'zone': 'Southern',
+        'job_type': 'Fixed Schedule',
+        'visit_day': 'Monday'
+    }
+    user_vector = state.feature_engine.create_user_vector(profile)
+
+    repeats = 2000  # ~650k rows
+    rng = np.random.default_rng(0)
+    big = pd.concat([frame] * repeats, ignore_index=True)
+    big['id'] = np.arange(1, len(big) + 1)
+    # Jitter ratings so the synthetic catalog isn't one giant tie
+    big['google_rating'] = np.round(big['google_rating'] + rng.normal(0, 0.2, len(big)), 1)
+    destinations = DestinationStore.from_frame(big)
+    vectors = np.tile(state.vectors, (repeats, 1))
+    vectors += rng.normal(0, 0.01, vectors.shape)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    print(f"Synthetic catalog: {len(destinations):,} rows x {vectors.shape[1]} dims")
+
+    def timed(fn, runs=5):
+        fn()  # warm-up
+        start = time.perf_counter()
+        for _ in range(runs):
+            result = fn()
+        return result, (time.perf_counter() - start) / runs * 1000
+
+    (ref_top, ref_scores), single_ms = timed(
+        lambda: TravelRecommender._score_and_rank(destinations, vectors, user_vector, profile, 5)
+    )
+    print(f"single-process: {single_ms:8.1f} ms")
+
+    for n_workers in [2, 4, os.cpu_count()]:
+        executor = ShardedScorer.create_executor(n_workers)
+        scorer = ShardedScorer(destinations, vectors, version=1, executor=executor, n_shards=n_workers)
+        try:
+            (top, scores), ms = timed(lambda: scorer.top_k(user_vector, profile, 5))
+            exact = np.array_equal(top, ref_top) and np.array_equal(scores, ref_scores)
+            print(f"{n_workers:2d} workers:     {ms:8.1f} ms  speedup {single_ms / ms:4.1f}x  exact={exact}")
+        finally:
+            scorer.close()
+            executor.shutdown()
@@ -0,0 +1,216 @@
+import os
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.feature_engine import ARTIFACTS_DIR
+
+INDEX_PATH = os.path.join(ARTIFACTS_DIR, "similarity_index.npz")
+
+
+def snapshot_fingerprint(snapshot):
+    """
+    Identifies the exact catalog content an index was built from.
+    """
+    digest = hashlib.sha1()
+    digest.update(snapshot.destinations.ids.tobytes())
+    digest.update(snapshot.row_hashes.tobytes())
+    digest.update(str(snapshot.encoder_version).encode())
+    return digest.hexdigest()[:16]
+
+
+class SimilarityIndex:
+    """
+    Precomputed k-nearest-neighbour table over destination vectors ("more like this").
+
+    Built blockwise: each block of rows is compared against the full catalog and
+    only its top-k survive, so the N x N similarity matrix never exists in memory.
+    Blocks run on a thread pool (numpy releases the GIL inside matmul/argpartition).
+    """
+
+    def __init__(self, k=10):
+        self.k = k
+        self.ids = np.empty(0, dtype=np.int64)
+        self.neighbor_ids = np.empty((0, k), dtype=np.int64)
+        self.neighbor_scores = np.empty((0, k), dtype=np.float32)
+        self.fingerprint = None
+        self._positions = pd.Index(self.ids)
+
+    @staticmethod
+    def _top_k(similarities, k):
+        """
+        Row-wise top-k of a (rows x candidates) block, sorted by score (desc).
+        Returns: (column indices, scores)
+        """
+        k = min(k, similarities.shape[1])
+        if k == 0:
+            return (np.empty((similarities.shape[0], 0), dtype=np.int64),
+                    np.empty((similarities.shape[0], 0), dtype=np.float32))
+        part = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        part_scores = np.take_along_axis(similarities, part, axis=1)
+        order = np.argsort(-part_scores, axis=1, kind='stable')
+        return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+    def _compute_rows(self, rows, unit_vectors, block_size, n_jobs):
+        """
+        Exact top-k neighbours for the given row positions.
+        Returns: (neighbour positions, scores), each (len(rows) x k)
+        """
+        k = min(self.k, max(len(unit_vectors) - 1, 0))
+        out_pos = np.full((len(rows), self.k), -1, dtype=np.int64)
+        out_scores = np.full((len(rows), self.k), -np.inf, dtype=np.float32)
+
+        def run(start):
+            block = rows[start:start + block_size]
+            similarities = unit_vectors[block] @ unit_vectors.T
+            # A destination is not its own neighbour
+            similarities[np.arange(len(block)), block] = -np.inf
+            cols, scores = self._top_k(similarities, k)
+            out_pos[start:start + len(block), :k] = cols
+            out_scores[start:start + len(block), :k] = scores
+
+        with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as pool:
+            list(pool.map(run, range(0, len(rows), block_size)))
+        return out_pos, out_scores
+
+    def _set(self, ids, positions, scores, fingerprint):
+        # Stored by id (not position) so the table survives catalog reordering
+        if len(ids):
+            neighbor_ids = np.where(positions >= 0, ids[np.clip(positions, 0, None)], -1)
+        else:
+            neighbor_ids = positions
+        self.ids = ids
+        self.neighbor_ids = neighbor_ids
+        self.neighbor_scores = scores
+        self.fingerprint = fingerprint
+        self._positions = pd.Index(ids)
+
+    def build(self, ids, unit_vectors, fingerprint=None, block_size=1024, n_jobs=None):
+        """
+        Computes the full table.
+
+        Args:
+            ids (array): Destination ids, aligned with unit_vectors.
+            unit_vectors (array): L2-normalised destination vectors.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        rows = np.arange(len(ids))
+        positions, scores = self._compute_rows(rows, unit_vectors, block_size, n_jobs)
+        self._set(ids, positions, scores, fingerprint)
+        return self
+
+    def refresh(self, ids, unit_vectors, changed_ids, fingerprint=None, block_size=1024, n_jobs=None):
+        """
+        Brings the table up to date after some destinations were added, edited or removed.
+
+        - Rows for new/edited destinations, and rows whose neighbour list mentions an
+          edited or removed destination, are recomputed exactly.
+        - Every other row only needs to consider the edited/new destinations as
+          extra candidates, merged into its existing top-k.
+
+        Args:
+            ids, unit_vectors: The new catalog.
+            changed_ids (array): Ids that are new or whose vector changed.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        changed_ids = np.asarray(changed_ids, dtype=np.int64)
+        removed_ids = np.setdiff1d(self.ids, ids)
+        stale_ids = np.union1d(changed_ids, removed_ids)
+
+        old_rows = self._positions.get_indexer(ids)
+        recompute = (old_rows < 0) | np.isin(ids, changed_ids)
+        known = ~recompute
+        recompute[known] = np.isin(self.neighbor_ids[old_rows[known]], stale_ids).any(axis=1)
+
+        id_to_pos = pd.Index(ids)
+        positions = np.full((len(ids), self.k), -1, dtype=np.int64)
+        scores = np.full((len(ids), self.k), -np.inf, dtype=np.float32)
+
+        # Rows we can patch: keep the old list, offer the changed destinations as candidates
+        keep = np.flatnonzero(~recompute)
+        if len(keep):
+            old = old_rows[keep]
+            kept_pos = id_to_pos.get_indexer(self.neighbor_ids[old].ravel()).reshape(len(keep), -1)
+            kept_scores = np.where(kept_pos >= 0, self.neighbor_scores[old], -np.inf)
+            changed_pos = id_to_pos.get_indexer(changed_ids)
+            changed_pos = changed_pos[changed_pos >= 0]
+            for start in range(0, len(keep), block_size):
+                block = keep[start:start + block_size]
+                extra = (unit_vectors[block] @ unit_vectors[changed_pos].T).astype(np.float32)
+                candidates = np.hstack([kept_pos[start:start + len(block)], np.broadcast_to(changed_pos, extra.shape)])
+                candidate_scores = np.hstack([kept_scores[start:start + len(block)], extra])
+                cols, top_scores = self._top_k(candidate_scores, self.k)
+                positions[block] = np.take_along_axis(candidates, cols, axis=1)
+                scores[block] = top_scores
+
+        rows = np.flatnonzero(recompute)
+        if len(rows):
+            positions[rows], scores[rows] = self._compute_rows(rows, unit_vectors, block_size, n_jobs)
+
+        scores[positions < 0] = -np.inf
+        self._set(ids, positions, scores, fingerprint)
+        return len(rows)
+
+    def neighbors(self, destination_id, k=None):
+        """
+        Returns: (neighbour ids, similarity scores) for one destination, best first.
+        """
+        try:
+            row = self._positions.get_loc(destination_id)
+        except KeyError:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        k = k or self.k
+        found = self.neighbor_ids[row, :k]
+        valid = found >= 0
+        return found[valid], self.neighbor_scores[row, :k][valid]
+
+    def save(self, path=INDEX_PATH):
+        # Write-then-rename so readers never see a half-written file
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, ids=self.ids, neighbor_ids=self.neighbor_ids,
+                 neighbor_scores=self.neighbor_scores, k=self.k,
+                 fingerprint=np.array(self.fingerprint or ""))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        with np.load(path) as data:
+            index = cls(k=int(data['k']))
+            index.ids = data['ids']
+            index.neighbor_ids = data['neighbor_ids']
+            index.neighbor_scores = data['neighbor_scores']
+            index.fingerprint = str(data['fingerprint']) or None
+        index._positions = pd.Index(index.ids)
+        return index
+
+
+if __name__ == "__main__":
+    # Benchmark: blockwise build and incremental refresh on a synthetic catalog
+    rng = np.random.default_rng(0)
+    n, dims = 50_000, 117
+    vectors = rng.random((n, dims)) * (rng.random((n, dims)) < 0.08)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    ids = np.arange(1, n + 1)
+
+    start = time.perf_counter()
+    index = SimilarityIndex(k=10).build(ids, vectors)
+    print(f"Build: {n:,} destinations in {time.perf_counter() - start:.1f}s")
+
+    # Edit 100 destinations and check the refresh against a full rebuild
+    changed = rng.choice(n, 100, replace=False)
+    vectors[changed] = rng.random((100, dims))
+    vectors[changed] /= np.linalg.norm(vectors[changed], axis=1, keepdims=True)
+    start = time.perf_counter()
+    recomputed = index.refresh(ids, vectors, ids[changed])
+    print(f"Refresh: 100 edits in {time.perf_counter() - start:.2f}s ({recomputed} rows recomputed)")
+
+    full = SimilarityIndex(k=10).build(ids, vectors)
+    print(f"Refresh matches full rebuild: {np.allclose(index.neighbor_scores, full.neighbor_scores, atol=1e-6)}")
+
+    start = time.perf_counter()
+    for destination_id in rng.integers(1, n + 1, 10_000):
+        index.neighbors(destination_id, 5)
+    print(f"Lookup: {(time.perf_counter() - start) / 10_000 * 1e6:.1f} us")
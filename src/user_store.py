@@ -0,0 +1,227 @@
+import os
+import json
+import sqlite3
+import logging
+from collections import namedtuple
+
+import numpy as np
+
+from src.recommender import DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# Kept out of travel.db: every commit there bumps its data_version, and each
+# serving process's CatalogWatcher would refresh the catalog on every save
+USERS_DB_PATH = os.path.join(os.path.dirname(DB_PATH), "users.db")
+
+# Columns added to `users` for stored profiles (databases created before them are migrated)
+PROFILE_COLUMNS = {
+    'profile_json': 'TEXT',        # Full profile dict as built by profile_options.build_profile
+    'user_vector': 'BLOB',         # Encoded profile, float64 bytes
+    'encoder_version': 'TEXT',     # Encoder that produced user_vector
+    'updated_at': 'TIMESTAMP',
+}
+
+# The original preference columns, and the profile field each one holds
+PREFERENCE_COLUMNS = {
+    'activity_type_pref': 'type',
+    'travel_interest_pref': 'significance',
+    'duration_pref': 'duration_bucket',
+    'budget_pref': 'budget_bucket',
+    'location_zone_pref': 'zone',
+}
+
+# Users re-encoded per batch by recompute_vectors
+RECOMPUTE_BATCH = 1000
+
+# A returning user: their last profile and its vector as (encoder_version, vector)
+StoredUser = namedtuple('StoredUser', ['user_id', 'username', 'profile', 'user_vector'])
+
+
+class UserStore:
+    """
+    Saved user profiles in the `users` table of their own database
+    (users.db), each with its encoded user vector cached as a blob and tagged
+    with the encoder version that built it. Users already in travel.db are
+    imported, ids unchanged, when the store is first created.
+
+    A returning user's vector is used as-is while that encoder is being served;
+    a stale one is re-encoded on read, and recompute_vectors() re-encodes
+    everybody in bulk after the encoder changes.
+    """
+
+    def __init__(self, db_path=USERS_DB_PATH, legacy_db_path=DB_PATH):
+        """
+        legacy_db_path: Database whose `users` table is imported into an empty
+                        store (None to skip).
+        """
+        self.db_path = db_path
+        self.init_schema()
+        if legacy_db_path is not None and os.path.abspath(legacy_db_path) != os.path.abspath(db_path):
+            self._import_users(legacy_db_path)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA busy_timeout = 5000")
+        return conn
+
+    def init_schema(self):
+        """
+        Adds the profile columns to an existing `users` table (or creates it).
+        """
+        conn = self._connect()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS users (
+                    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username TEXT,
+                    activity_type_pref TEXT,
+                    travel_interest_pref TEXT,
+                    duration_pref TEXT,
+                    budget_pref TEXT,
+                    location_zone_pref TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(users)")}
+            for column, sql_type in PROFILE_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE users ADD COLUMN {column} {sql_type}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _import_users(self, legacy_db_path):
+        """
+        Copies the `users` table of `legacy_db_path` into this store if it has
+        no users yet. Ids are kept, so `interactions` rows still match.
+        """
+        if not os.path.exists(legacy_db_path):
+            return
+        conn = self._connect()
+        try:
+            if conn.execute("SELECT 1 FROM users LIMIT 1").fetchone() is not None:
+                return
+            conn.execute("ATTACH DATABASE ? AS legacy", (legacy_db_path,))
+            legacy_columns = {row[1] for row in conn.execute("PRAGMA legacy.table_info(users)")}
+            columns = [row[1] for row in conn.execute("PRAGMA main.table_info(users)") if row[1] in legacy_columns]
+            if columns:
+                column_list = ', '.join(columns)
+                with conn:
+                    imported = conn.execute(
+                        f"INSERT INTO main.users ({column_list}) SELECT {column_list} FROM legacy.users").rowcount
+                if imported:
+                    logger.info(f"Imported {imported} users from {legacy_db_path} into {self.db_path}.")
+            conn.execute("DETACH DATABASE legacy")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _profile(profile_json, preferences):
+        """
+        The stored profile, or for users saved before profiles were stored,
+        one rebuilt from their preference columns.
+        """
+        if profile_json:
+            return json.loads(profile_json)
+        return {field: value for field, value in zip(PREFERENCE_COLUMNS.values(), preferences)}
+
+    def load(self, username, feature_engine):
+        """
+        Returns: StoredUser for `username` with a vector valid for `feature_engine`
+                 (re-encoded and saved if it was stale), or None if unknown.
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                f"SELECT user_id, profile_json, user_vector, encoder_version, {', '.join(PREFERENCE_COLUMNS)} "
+                f"FROM users WHERE username = ? ORDER BY user_id DESC LIMIT 1", (username,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+
+        user_id, profile_json, blob, encoder_version = row[:4]
+        profile = self._profile(profile_json, row[4:])
+        if blob is not None and encoder_version == feature_engine.encoder_version:
+            vector = np.frombuffer(blob, dtype=np.float64).reshape(1, -1)
+        else:
+            vector = feature_engine.create_user_vector(profile)
+            self._write_vectors(feature_engine.encoder_version, [user_id], vector)
+        return StoredUser(user_id, username, profile, (feature_engine.encoder_version, vector))
+
+    def save(self, username, profile, feature_engine):
+        """
+        Stores `profile` (and its vector) as the user's current profile.
+        Returns: The StoredUser saved.
+        """
+        vector = feature_engine.create_user_vector(profile)
+        columns = [*PREFERENCE_COLUMNS, 'profile_json', 'user_vector', 'encoder_version']
+        values = [*(profile.get(field) for field in PREFERENCE_COLUMNS.values()), json.dumps(profile),
+                  sqlite3.Binary(np.ascontiguousarray(vector, dtype=np.float64)), feature_engine.encoder_version]
+
+        conn = self._connect()
+        try:
+            with conn:
+                row = conn.execute("SELECT user_id FROM users WHERE username = ? ORDER BY user_id DESC LIMIT 1",
+                                   (username,)).fetchone()
+                if row is not None:
+                    user_id = row[0]
+                    assignments = ', '.join(f"{column} = ?" for column in columns)
+                    conn.execute(f"UPDATE users SET {assignments}, updated_at = CURRENT_TIMESTAMP WHERE user_id = ?",
+                                 (*values, user_id))
+                else:
+                    user_id = conn.execute(
+                        f"INSERT INTO users (username, {', '.join(columns)}, updated_at) "
+                        f"VALUES (?, {', '.join('?' * len(values))}, CURRENT_TIMESTAMP)",
+                        (username, *values)
+                    ).lastrowid
+        finally:
+            conn.close()
+        return StoredUser(user_id, username, profile, (feature_engine.encoder_version, vector))
+
+    def _write_vectors(self, encoder_version, user_ids, vectors):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float64)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "UPDATE users SET user_vector = ?, encoder_version = ? WHERE user_id = ?",
+                    [(sqlite3.Binary(vector), encoder_version, int(user_id)) for user_id, vector in zip(user_ids, vectors)]
+                )
+        finally:
+            conn.close()
+
+    def recompute_vectors(self, feature_engine, batch_size=RECOMPUTE_BATCH):
+        """
+        Re-encodes every user whose vector is missing or from another encoder,
+        a batch at a time through one transform call each.
+        Returns: Number of users re-encoded.
+        """
+        encoder_version = feature_engine.encoder_version
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT user_id, profile_json, {', '.join(PREFERENCE_COLUMNS)} FROM users "
+                f"WHERE user_vector IS NULL OR encoder_version IS NOT ?", (encoder_version,)
+            ).fetchall()
+        finally:
+            conn.close()
+
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            profiles = [self._profile(row[1], row[2:]) for row in batch]
+            self._write_vectors(encoder_version, [row[0] for row in batch],
+                                feature_engine.create_user_vectors(profiles))
+        if rows:
+            logger.info(f"Re-encoded {len(rows)} stored user profiles for encoder {encoder_version}.")
+        return len(rows)
+
+    def on_catalog_change(self, previous, current):
+        """
+        CatalogWatcher hook: re-encodes stored profiles when the served encoder changed.
+        """
+        if previous is None or previous.encoder_version != current.encoder_version:
+            self.recompute_vectors(current.feature_engine)
@@ -0,0 +1,168 @@
+import threading
+import logging
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import normalize
+
+from src.feature_engine import TravelFeatureEngine
+from src.destination_store import DestinationStore
+from src.geo_index import GeoGridIndex
+
+logger = logging.getLogger(__name__)
+
+# One immutable, self-consistent view of the catalog.
+# Readers grab `store.snapshot` once and use it for the whole request, so a
+# concurrent swap never mixes rows, vectors and encoders from different versions.
+CatalogSnapshot = namedtuple('CatalogSnapshot', [
+    'version',          # Monotonic counter, bumped on every swap
+    'encoder_version',  # Hash of the encoder used to build `vectors`
+    'feature_engine',   # The TravelFeatureEngine that produced `vectors`
+    'destinations',     # DestinationStore of catalog rows, aligned with `vectors`
+    'vectors',          # Encoded destination matrix, rows L2-normalised (or None if the catalog is empty)
+    'row_hashes',       # Per-row content hash used to detect changed rows
+    'geo_index',        # GeoGridIndex over the destinations' coordinates (None if not geocoded)
+])
+
+
+class DestinationVectorStore:
+    """
+    Keeps encoded destination vectors in step with the `destinations` table.
+
+    Changes are applied incrementally: rows whose content hash is unchanged keep
+    their existing vectors, and only new or edited rows go through the encoder.
+    Changed rows that introduce a new category or push a numeric column outside
+    the fitted scaler range need a refit. Only a store created with refit=True
+    (the encoder's owner, e.g. an offline job) refits and saves the shared
+    encoder; serving stores encode such rows with the current encoder and pick
+    up the refitted one when it is published (see pipeline, CatalogWatcher).
+    """
+
+    def __init__(self, feature_engine=None, text_loader=None, refit=False):
+        self.feature_engine = feature_engine or TravelFeatureEngine()
+        # f(ids, columns) used by the DestinationStore to fetch text for displayed rows
+        self.text_loader = text_loader
+        self.refit = refit
+        self.snapshot = None
+        # Serialises writers only. Readers never take this lock.
+        self._write_lock = threading.Lock()
+
+    @staticmethod
+    def _encode(feature_engine, df):
+        # Rows are stored unit-length so cosine similarity is a plain dot product
+        # Numbers past the fitted range saturate until the encoder is refitted
+        return normalize(feature_engine.transform(df, clip=True))
+
+    @staticmethod
+    def _row_hashes(df):
+        if df.empty:
+            return np.empty(0, dtype=np.uint64)
+        return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+    def _swap(self, feature_engine, df, vectors, row_hashes, destinations=None):
+        version = self.snapshot.version + 1 if self.snapshot is not None else 1
+        if feature_engine.column_transformer is None:
+            feature_engine.load_encoders()
+        self.feature_engine = feature_engine
+        if destinations is None:
+            previous = self.snapshot.destinations if self.snapshot is not None else None
+            destinations = DestinationStore.from_frame(df, self.text_loader, previous=previous)
+        geo_index = None
+        if 'latitude' in destinations and 'longitude' in destinations:
+            geo_index = GeoGridIndex(destinations['latitude'], destinations['longitude'])
+        # Single reference assignment: atomic for readers.
+        self.snapshot = CatalogSnapshot(
+            version=version,
+            encoder_version=feature_engine.encoder_version,
+            feature_engine=feature_engine,
+            destinations=destinations,
+            vectors=vectors,
+            row_hashes=row_hashes,
+            geo_index=geo_index,
+        )
+        return self.snapshot
+
+    def load(self, df, feature_engine=None):
+        """
+        Encodes the whole catalog and swaps it in as a new version.
+        """
+        with self._write_lock:
+            engine = feature_engine or self.feature_engine
+            df = df.reset_index(drop=True)
+            vectors = self._encode(engine, df) if not df.empty else None
+            return self._swap(engine, df, vectors, self._row_hashes(df))
+
+    def adopt(self, destinations, vectors, row_hashes, feature_engine):
+        """
+        Swaps in a catalog encoded elsewhere (e.g. a memory-mapped Arrow
+        catalog) as a new version, without re-encoding anything.
+        """
+        with self._write_lock:
+            return self._swap(feature_engine, None, vectors, row_hashes, destinations=destinations)
+
+    def apply_changes(self, df):
+        """
+        Brings the store in line with `df` (the full, current catalog).
+
+        Unchanged rows are copied across by id, new and edited rows are encoded,
+        and rows missing from `df` are dropped. The result is built as a new
+        array and swapped in, so in-flight readers keep their old snapshot.
+
+        Returns:
+            CatalogSnapshot: The current snapshot (unchanged if nothing differed).
+        """
+        with self._write_lock:
+            current = self.snapshot
+            df = df.reset_index(drop=True)
+            if current is None or current.vectors is None or df.empty:
+                vectors = self._encode(self.feature_engine, df) if not df.empty else None
+                return self._swap(self.feature_engine, df, vectors, self._row_hashes(df))
+
+            hashes = self._row_hashes(df)
+            positions = current.destinations.position_of(df['id'])
+
+            # A row is reusable if its id existed before and its content is identical
+            unchanged = positions >= 0
+            unchanged[unchanged] = hashes[unchanged] == current.row_hashes[positions[unchanged]]
+
+            if unchanged.all() and len(df) == len(current.destinations):
+                return current
+
+            changed = df[~unchanged]
+            engine = current.feature_engine
+
+            if engine.needs_refit(changed):
+                # Vocabulary grew or a numeric range moved: this changes the
+                # layout/scale of every vector, so re-encode under a new encoder.
+                if self.refit:
+                    logger.info(f"Catalog change needs a refit ({len(changed)} changed rows). "
+                                f"Re-encoding all destinations...")
+                    engine = TravelFeatureEngine()
+                    engine.fit_and_save(df)
+                    return self._swap(engine, df, self._encode(engine, df), hashes)
+                # Unseen categories encode as all-zero, out-of-range numbers
+                # saturate, until the encoder owner publishes a refit
+                logger.warning(f"{len(changed)} changed rows fall outside encoder {engine.encoder_version}; "
+                               f"encoding them as-is until a refitted encoder is published.")
+
+            vectors = np.empty((len(df), current.vectors.shape[1]), dtype=current.vectors.dtype)
+            vectors[unchanged] = current.vectors[positions[unchanged]]
+            if not changed.empty:
+                vectors[~unchanged] = self._encode(engine, changed)
+
+            logger.info(f"Patched vector store: {len(changed)} rows re-encoded, {int(unchanged.sum())} reused.")
+            return self._swap(engine, df, vectors, hashes)
+
+    @staticmethod
+    def changed_ids(old, new):
+        """
+        Ids whose vector differs between two snapshots (new rows included).
+        Everything counts as changed if the encoder differs.
+        """
+        if old is None or old.encoder_version != new.encoder_version:
+            return new.destinations.ids
+        positions = old.destinations.position_of(new.destinations.ids)
+        changed = positions < 0
+        changed[~changed] = new.row_hashes[~changed] != old.row_hashes[positions[~changed]]
+        return new.destinations.ids[changed]
@@ -0,0 +1,131 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Bitfield layouts for the parsed `best_time_to_visit` / `weekly_off` columns.
+# Parsed once per catalog load (per distinct value), then constraints are bit tests.
+MONTHS = ['january', 'february', 'march', 'april', 'may', 'june', 'july',
+          'august', 'september', 'october', 'november', 'december']
+DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+TIMES_OF_DAY = ['morning', 'afternoon', 'evening', 'night']
+
+ALL_MONTHS = (1 << len(MONTHS)) - 1
+ALL_TIMES = (1 << len(TIMES_OF_DAY)) - 1
+
+
+def _month_index(token):
+    # Full names and abbreviations of at least 3 letters ("sept", "oct")
+    if len(token) < 3:
+        return None
+    for i, month in enumerate(MONTHS):
+        if month.startswith(token):
+            return i
+    return None
+
+
+def _months(*names):
+    return sum(1 << _month_index(name) for name in names)
+
+
+# Indian travel seasons, as offered in the sidebar
+SEASON_MONTHS = {
+    'summer': _months('mar', 'apr', 'may', 'jun'),
+    'monsoon': _months('jul', 'aug', 'sep'),
+    'winter': _months('oct', 'nov', 'dec', 'jan', 'feb'),
+    'spring': _months('feb', 'mar', 'apr'),
+    'autumn': _months('sep', 'oct', 'nov'),
+}
+
+_TOKEN = re.compile(r"[a-z]+")
+_MONTH_RANGE = re.compile(r"\b([a-z]+)\.?\s*(?:-|–|to|till|until|through)\s*([a-z]+)")
+
+
+def parse_best_time(text):
+    """
+    Parses free text like "October to March, Morning" or "Winter" or "All".
+
+    Returns: (month bitmask, time-of-day bitmask). Whatever the text doesn't
+    mention is unrestricted, so "Morning" means every month, mornings only.
+    """
+    if text is None or (isinstance(text, float) and np.isnan(text)):
+        return ALL_MONTHS, ALL_TIMES
+    text = str(text).strip().lower()
+
+    months = 0
+    for start, end in _MONTH_RANGE.findall(text):
+        a, b = _month_index(start), _month_index(end)
+        if a is not None and b is not None:
+            # Ranges may wrap the year end ("October to March")
+            span = range(a, b + 1) if a <= b else [*range(a, 12), *range(0, b + 1)]
+            months |= sum(1 << m for m in span)
+
+    times = 0
+    for token in _TOKEN.findall(text):
+        month = _month_index(token)
+        if month is not None:
+            months |= 1 << month
+        if token in SEASON_MONTHS:
+            months |= SEASON_MONTHS[token]
+        if token.rstrip('s') in TIMES_OF_DAY:  # "evenings"
+            times |= 1 << TIMES_OF_DAY.index(token.rstrip('s'))
+
+    return months or ALL_MONTHS, times or ALL_TIMES
+
+
+def parse_weekly_off(text):
+    """
+    Parses "Monday", "Mon, Tue" etc. into a day-of-week bitmask of closures.
+    Values that name no day (NaN, "Yes", "None") mean no known closure day.
+    """
+    if text is None or (isinstance(text, float) and np.isnan(text)):
+        return 0
+    mask = 0
+    for token in _TOKEN.findall(str(text).lower()):
+        for i, day in enumerate(DAYS):
+            if len(token) >= 3 and day.startswith(token):
+                mask |= 1 << i
+    return mask
+
+
+def encode_calendar(best_time, weekly_off):
+    """
+    Bitfield columns for a catalog. Each distinct text value is parsed once.
+
+    Returns: dict of 'visit_months', 'visit_times', 'closed_days' int arrays.
+    """
+    best_time = pd.Series(best_time).astype(object)
+    weekly_off = pd.Series(weekly_off).astype(object)
+
+    codes, uniques = pd.factorize(best_time, use_na_sentinel=False)
+    parsed = np.array([parse_best_time(value) for value in uniques], dtype=np.int64).reshape(-1, 2)
+    day_codes, day_uniques = pd.factorize(weekly_off, use_na_sentinel=False)
+    days = np.array([parse_weekly_off(value) for value in day_uniques], dtype=np.int64)
+
+    return {
+        'visit_months': parsed[codes, 0],
+        'visit_times': parsed[codes, 1],
+        'closed_days': days[day_codes],
+    }
+
+
+def season_mask(season):
+    """
+    Month bitmask for a sidebar season ("Summer", ...), or None for "Any"/unknown.
+    """
+    return SEASON_MONTHS.get(str(season).strip().lower()) if season else None
+
+
+def day_bit(day):
+    """
+    Bit for a day name ("Monday", "mon"), or 0 if it isn't one.
+    """
+    return parse_weekly_off(day) if day else 0
+
+
+def time_of_day_bit(name):
+    """
+    Bit for "Morning"/"Afternoon"/"Evening"/"Night", or None otherwise.
+    """
+    name = str(name).strip().lower() if name else None
+    return 1 << TIMES_OF_DAY.index(name) if name in TIMES_OF_DAY else None
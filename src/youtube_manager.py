@@ -1,27 +1,50 @@
 import requests
 import logging
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
 from src.config import YOUTUBE_API_KEY
+from src.api_scheduler import QuotaExceeded, PRIORITY_INTERACTIVE
+from src.degradation import UPSTREAM_TIMEOUT
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Last good search results kept per destination, served while degraded
+VLOG_CACHE_SIZE = 1024
+
 class YouTubeVlogManager:
-    def __init__(self):
+    def __init__(self, scheduler=None, controller=None):
+        """
+        scheduler: Optional ApiScheduler shared across sessions; searches then
+                   wait their turn for the 'youtube' quota instead of racing for it.
+        controller: Optional DegradationController; while it reports degraded
+                    mode YouTube isn't called and cached (or mock) vlogs are served.
+        """
+        self.scheduler = scheduler
+        self.controller = controller
+        self._cache = OrderedDict()  # (destination, max_results) -> videos
+        self._cache_lock = threading.Lock()
         self.api_key = YOUTUBE_API_KEY
         self.base_url = "https://www.googleapis.com/youtube/v3/search"
 
-    def search_vlogs(self, destination_name, max_results=3):
+    def search_vlogs(self, destination_name, max_results=3, priority=PRIORITY_INTERACTIVE):
         """
         Searches for travel vlogs for a specific destination.
         
         Args:
             destination_name (str): Name of the place (e.g., "Munnar Tea Gardens")
             max_results (int): Number of videos to return.
+            priority (int): Scheduler priority (PRIORITY_BACKGROUND for prefetch).
             
         Returns:
             list: List of dicts [{'title': ..., 'video_id': ...}, ...]
         """
+        if self.controller is not None and self.controller.degraded:
+            cached = self._cached(destination_name, max_results)
+            return cached if cached is not None else self._get_mock_data(destination_name)
+
         query = f"{destination_name} travel vlog India"
         
         params = {
@@ -33,7 +56,11 @@ class YouTubeVlogManager:
         }
         
         try:
-            response = requests.get(self.base_url, params=params)
+            get = lambda: self._get(params)
+            if self.scheduler is not None:
+                response = self.scheduler.call('youtube', get, priority)
+            else:
+                response = get()
             
             if response.status_code == 200:
                 data = response.json()
@@ -45,6 +72,7 @@ class YouTubeVlogManager:
                         'thumbnail': item['snippet']['thumbnails']['high']['url']
                     }
                     videos.append(video_data)
+                self._remember(destination_name, max_results, videos)
                 return videos
             elif response.status_code == 403:
                 logger.error(f"YouTube 403 Error: {response.text}")
@@ -52,6 +80,11 @@ class YouTubeVlogManager:
             else:
                 logger.error(f"YouTube API Error {response.status_code}: {response.text}")
                 return []
+
+        except QuotaExceeded as e:
+            # Out of quota: degrade immediately instead of queueing behind it
+            logger.warning(f"YouTube search not admitted: {e}")
+            return self._get_mock_data(destination_name)
                 
         except Exception as e:
             logger.error(f"Exception searching YouTube: {e}")
@@ -59,6 +92,24 @@ class YouTubeVlogManager:
 
         return self._get_mock_data(destination_name)
 
+    def _get(self, params):
+        with self.controller.track('youtube') if self.controller is not None else nullcontext():
+            return requests.get(self.base_url, params=params, timeout=UPSTREAM_TIMEOUT)
+
+    def _cached(self, destination, max_results):
+        with self._cache_lock:
+            videos = self._cache.get((destination, max_results))
+            if videos is not None:
+                self._cache.move_to_end((destination, max_results))
+            return videos
+
+    def _remember(self, destination, max_results, videos):
+        with self._cache_lock:
+            self._cache[(destination, max_results)] = videos
+            self._cache.move_to_end((destination, max_results))
+            while len(self._cache) > VLOG_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
     def _get_mock_data(self, destination):
         logger.warning(f"Using MOCK YouTube data for {destination}")
         return [
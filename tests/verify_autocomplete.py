@@ -0,0 +1,72 @@
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+
+from termcolor import colored
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from src import recommender
+
+NEW_NAME = "Zanzibar Spice Palace"
+
+
+def run_tests():
+    print(colored("=== VoyageSense Autocomplete Refresh Verification ===", "cyan", attrs=['bold']))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Work on a copy; persisted indexes go to the temp dir too
+        recommender.DB_PATH = os.path.join(tmp, "travel.db")
+        recommender.INDEX_PATH = os.path.join(tmp, "similarity_index.npz")
+        recommender.SEARCH_INDEX_PATH = os.path.join(tmp, "search_index.npz")
+        shutil.copy(os.path.join(PROJECT_ROOT, "data", "travel.db"), recommender.DB_PATH)
+
+        engine = recommender.TravelRecommender()
+        destination_id = int(engine.destinations.ids[0])
+        cache_version = engine.cache_version
+
+        print(colored(f"\n[1] Renaming destination {destination_id} to '{NEW_NAME}' and refreshing...", "blue"))
+        conn = sqlite3.connect(recommender.DB_PATH)
+        with conn:
+            conn.execute("UPDATE destinations SET name = ? WHERE id = ?", (NEW_NAME, destination_id))
+        conn.close()
+        engine.refresh()
+
+        failures = []
+        suggestions = engine.suggest("zanz")
+        print(f"   suggest('zanz'): {[s.label for s in suggestions]}")
+        if [(s.label, s.destination_id) for s in suggestions[:1]] != [(NEW_NAME, destination_id)]:
+            failures.append("autocomplete doesn't suggest the new name")
+        ids, _ = engine.search_index.search("Zanzibar")
+        if destination_id not in ids.tolist():
+            failures.append("search index doesn't find the new name")
+        if engine.cache_version == cache_version:
+            failures.append("cache version unchanged, cached results would keep the old name")
+
+        print(colored("\n[2] Refreshing again with nothing changed...", "blue"))
+        cache_version = engine.cache_version
+        engine.refresh()
+        if engine.cache_version != cache_version:
+            failures.append("an unchanged refresh invalidated the cache")
+
+    if failures:
+        for failure in failures:
+            print(colored(f"FAIL: {failure}", "red"))
+    else:
+        print(colored("PASS: The rename reached autocomplete, search and the cache version; "
+                      "a no-op refresh kept them.", "green"))
+
+    print("\n" + "=" * 40)
+    if not failures:
+        print(colored("OVERALL STATUS: AUTOCOMPLETE OK [OK]", "green", attrs=['bold']))
+    else:
+        print(colored("OVERALL STATUS: AUTOCOMPLETE FAILURE [X]", "red", attrs=['bold']))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run_tests()
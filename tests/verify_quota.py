@@ -0,0 +1,285 @@
+import os
+import sys
+import json
+import time
+import types
+import sqlite3
+import tempfile
+import threading
+import multiprocessing as mp
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from termcolor import colored
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+# Only the local stub servers are called, so API keys aren't needed
+try:
+    import src.config  # noqa: F401
+except ImportError:
+    sys.modules['src.config'] = types.SimpleNamespace(GEMINI_API_KEY="test", GEMINI_MODEL="stub",
+                                                      YOUTUBE_API_KEY="test")
+
+from src import api_scheduler
+from src.api_scheduler import (ApiScheduler, Quota,
+                               PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND)
+from src.llm_explainer import TravelLLMExplainer
+from src.youtube_manager import YouTubeVlogManager
+
+# Small quotas so a few seconds of load exhausts them
+TEST_QUOTAS = {
+    'gemini': Quota(capacity=4, refill_per_sec=8.0, cost=1, background_reserve=0.5),
+    'youtube': Quota(capacity=300, refill_per_sec=400.0, cost=100, background_reserve=0.34),
+}
+N_PROCESSES = 4
+SESSIONS_PER_PROCESS = 8
+CALLS_PER_SESSION = 6
+INTERACTIVE_TIMEOUT = 1.5
+BACKGROUND_TIMEOUT = 3.0
+FAILURE_TEXTS = ("Our guide is busy", "Service temporarily unavailable", "Could not")
+
+
+class StubApi:
+    """
+    Local stand-in for Gemini and YouTube. Enforces the same quota server-side
+    (answering 429 when exceeded), so any overspend by the clients shows up.
+    """
+
+    def __init__(self, quotas):
+        self.quotas = quotas
+        self.lock = threading.Lock()
+        self.tokens = {name: float(q.capacity) for name, q in quotas.items()}
+        self.updated = {name: time.monotonic() for name in quotas}
+        self.served = {name: 0 for name in quotas}
+        self.throttled = {name: 0 for name in quotas}
+
+    def admit(self, name):
+        quota = self.quotas[name]
+        with self.lock:
+            now = time.monotonic()
+            # One call of slack: a request can arrive a moment after the
+            # client took its token, bunching up with the next one
+            self.tokens[name] = min(quota.capacity + quota.cost,
+                                    self.tokens[name] + (now - self.updated[name]) * quota.refill_per_sec)
+            self.updated[name] = now
+            if self.tokens[name] + 1e-6 < quota.cost:
+                self.throttled[name] += 1
+                return False
+            self.tokens[name] -= quota.cost
+            self.served[name] += 1
+            return True
+
+    def serve(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if not api.admit('gemini'):
+                    return self._reply(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}})
+                time.sleep(0.02)  # Model latency
+                self._reply(200, {"candidates": [{"content": {"parts": [{"text": "A lovely match."}]}}]})
+
+            def do_GET(self):
+                if not api.admit('youtube'):
+                    return self._reply(403, {"error": {"code": 403, "message": "quotaExceeded"}})
+                self._reply(200, {"items": [{
+                    "id": {"videoId": "stub123"},
+                    "snippet": {"title": "Stub vlog", "thumbnails": {"high": {"url": "http://stub/thumb.jpg"}}},
+                }]})
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def _session_worker(args):
+    """
+    One process: several concurrent "sessions" sharing a scheduler, as
+    Streamlit sessions share one per process. Returns per-call outcomes.
+    """
+    base_url, db_path, seed = args
+    import logging
+    logging.disable(logging.WARNING)
+    # Test-sized deadlines in place of the production ones
+    api_scheduler.INTERACTIVE_TIMEOUT = INTERACTIVE_TIMEOUT
+    api_scheduler.BACKGROUND_TIMEOUT = BACKGROUND_TIMEOUT
+
+    scheduler = ApiScheduler(TEST_QUOTAS, db_path=db_path, n_workers=4)
+    explainer = TravelLLMExplainer(scheduler=scheduler)
+    explainer.api_url = f"{base_url}/v1beta/models/stub:generateContent"
+    youtube = YouTubeVlogManager(scheduler=scheduler)
+    youtube.base_url = f"{base_url}/youtube/v3/search"
+
+    rng = np.random.default_rng(seed)
+    outcomes = []
+    lock = threading.Lock()
+
+    def session(session_seed):
+        local = np.random.default_rng(session_seed)
+        for _ in range(CALLS_PER_SESSION):
+            # Mostly background prefetch, with users clicking "View Details" now and then
+            priority = PRIORITY_INTERACTIVE if local.random() < 0.3 else PRIORITY_BACKGROUND
+            timeout = INTERACTIVE_TIMEOUT if priority == PRIORITY_INTERACTIVE else BACKGROUND_TIMEOUT
+            start = time.perf_counter()
+            if local.random() < 0.7:
+                text = explainer.generate_detailed_explanation({'name': 'Stub'}, {}, priority=priority)
+                ok = not text.startswith(FAILURE_TEXTS)
+            else:
+                ok = youtube.search_vlogs('Stub', priority=priority)[0]['video_id'] == "stub123"
+            with lock:
+                outcomes.append((priority, ok, time.perf_counter() - start, timeout))
+            time.sleep(local.uniform(0.0, 0.2))
+
+    threads = [threading.Thread(target=session, args=(int(rng.integers(1 << 31)),))
+               for _ in range(SESSIONS_PER_PROCESS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    scheduler.close()
+    return outcomes
+
+
+def check_no_overspend(stub, outcomes):
+    print(colored("\n[1] Shared quota across processes...", "blue"))
+    throttled = sum(stub.throttled.values())
+    print(f"   Stub served {stub.served}, throttled {stub.throttled}, {len(outcomes)} calls attempted")
+    if throttled == 0:
+        print(colored("PASS: No call exceeded the upstream quota.", "green"))
+        return True
+    print(colored(f"FAIL: {throttled} calls hit the upstream quota.", "red"))
+    return False
+
+
+def check_priorities(outcomes):
+    print(colored("\n[2] Interactive calls served ahead of background work...", "blue"))
+    rates = {}
+    for priority, label in [(PRIORITY_INTERACTIVE, "interactive"), (PRIORITY_BACKGROUND, "background")]:
+        ok = [o[1] for o in outcomes if o[0] == priority]
+        rates[priority] = np.mean(ok) if ok else 0.0
+        print(f"   {label:12s} {len(ok):4d} calls, {rates[priority]:.0%} served")
+    if rates[PRIORITY_INTERACTIVE] >= rates[PRIORITY_BACKGROUND]:
+        print(colored("PASS: Interactive success rate is at least the background rate.", "green"))
+        return True
+    print(colored("FAIL: Background calls fared better than interactive ones.", "red"))
+    return False
+
+
+def check_fast_rejection(outcomes):
+    print(colored("\n[3] Rejected calls give up by their deadline, not after it...", "blue"))
+    rejected = [(elapsed, timeout) for _, ok, elapsed, timeout in outcomes if not ok]
+    if not rejected:
+        print(colored("WARN: Nothing was rejected; load too light to tell.", "yellow"))
+        return True
+    late = [e for e, t in rejected if e > t + 0.5]
+    median = np.median([e / t for e, t in rejected])
+    print(f"   {len(rejected)} rejected, median {median:.0%} of their timeout")
+    if not late:
+        print(colored("PASS: Every rejected call returned within its deadline.", "green"))
+        return True
+    print(colored(f"FAIL: {len(late)} rejected calls overran their deadline.", "red"))
+    return False
+
+
+def check_preemption(base_url, db_path):
+    print(colored("\n[4] A queued interactive call jumps the background queue...", "blue"))
+    quotas = {'gemini': Quota(capacity=1, refill_per_sec=10.0, cost=1, background_reserve=0.0)}
+    scheduler = ApiScheduler(quotas, db_path=db_path, n_workers=1)
+    order = []
+    try:
+        background = [scheduler.submit('gemini', lambda i=i: order.append(f"bg{i}"), PRIORITY_BACKGROUND, 10.0)
+                      for i in range(10)]
+        time.sleep(0.15)
+        urgent = scheduler.submit('gemini', lambda: order.append("user"), PRIORITY_INTERACTIVE, 10.0)
+        urgent.result()
+        for f in background:
+            f.result()
+    finally:
+        scheduler.close()
+    position = order.index("user")
+    print(f"   Run order: {' '.join(order)}")
+    if position <= 3:
+        print(colored(f"PASS: Interactive call ran at position {position + 1} of {len(order)}.", "green"))
+        return True
+    print(colored(f"FAIL: Interactive call waited behind {position} background calls.", "red"))
+    return False
+
+
+def check_locked_quota_db(db_path):
+    print(colored("\n[5] A call gives up by its deadline while quota.db is locked, and the worker survives...", "blue"))
+    quotas = {'gemini': Quota(capacity=5, refill_per_sec=10.0, cost=1, background_reserve=0.0)}
+    scheduler = ApiScheduler(quotas, db_path=db_path, n_workers=1)
+    run_timeout, api_scheduler.RUN_TIMEOUT = api_scheduler.RUN_TIMEOUT, 0.5
+    # Holds the write lock, so the worker blocks taking quota
+    blocker = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        blocker.execute("BEGIN EXCLUSIVE")
+        started = time.monotonic()
+        try:
+            scheduler.call('gemini', lambda: "locked", PRIORITY_INTERACTIVE, 1.0)
+            error = None
+        except Exception as e:
+            error = e
+        elapsed = time.monotonic() - started
+        blocker.execute("ROLLBACK")
+        after = scheduler.call('gemini', lambda: "served", PRIORITY_INTERACTIVE, 5.0)
+    finally:
+        api_scheduler.RUN_TIMEOUT = run_timeout
+        blocker.close()
+        scheduler.close()
+    print(f"   While locked: {type(error).__name__} after {elapsed:.1f}s; afterwards: {after}")
+    if isinstance(error, api_scheduler.QuotaExceeded) and elapsed < 3.0 and after == "served":
+        print(colored("PASS: The caller was released at its deadline and the worker kept serving.", "green"))
+        return True
+    print(colored("FAIL: Locked quota.db hung the call or stopped the worker.", "red"))
+    return False
+
+
+def run_tests():
+    print(colored("=== VoyageSense API Quota Scheduler Verification ===", "cyan", attrs=['bold']))
+
+    stub = StubApi(TEST_QUOTAS)
+    server = stub.serve()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "quota.db")
+        args = [(base_url, db_path, seed) for seed in range(N_PROCESSES)]
+        print(f"Simulating {N_PROCESSES} processes x {SESSIONS_PER_PROCESS} sessions x {CALLS_PER_SESSION} calls")
+        with mp.get_context('spawn').Pool(N_PROCESSES) as pool:
+            outcomes = [o for chunk in pool.map(_session_worker, args) for o in chunk]
+
+        results = [
+            check_no_overspend(stub, outcomes),
+            check_priorities(outcomes),
+            check_fast_rejection(outcomes),
+            check_preemption(base_url, os.path.join(tmp, "preempt.db")),
+            check_locked_quota_db(os.path.join(tmp, "locked.db")),
+        ]
+    server.shutdown()
+
+    print("\n" + "=" * 40)
+    if all(results):
+        print(colored("OVERALL STATUS: SCHEDULER OK [OK]", "green", attrs=['bold']))
+    else:
+        print(colored("OVERALL STATUS: SCHEDULER FAILURE [X]", "red", attrs=['bold']))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run_tests()
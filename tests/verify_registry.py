@@ -0,0 +1,111 @@
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+
+import numpy as np
+from termcolor import colored
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from src import recommender
+from src import catalog_registry
+from src.catalog_registry import CatalogRegistry
+from src.feature_engine import ENCODER_PATH
+from src.profile_options import build_profile, ACTIVITY_TYPES, PURPOSES, ZONES, ZONE_ALIASES
+
+ZONE = "Southern"
+
+
+def sidebar_profile(activity_type, purpose, zone):
+    return build_profile(activity_type, purpose, "2 Days", "Low", zone, "Flexible / Remote", "Any", "South")
+
+
+def check_every_zone_routes(registry):
+    print(colored("\n[1] Routing every sidebar zone...", "blue"))
+    failures = []
+    for zone in ZONES:
+        results = registry.recommend("india", sidebar_profile("Nature", "Relaxation", zone))
+        zones = set(results['zone']) if not results.empty else set()
+        print(f"   {zone:<13} -> {len(results)} results from {sorted(zones)}")
+        if results.empty or zones != {ZONE_ALIASES.get(zone, zone)}:
+            failures.append(zone)
+    if not failures:
+        print(colored(f"PASS: All {len(ZONES)} zones route to their own segment.", "green"))
+        return True
+    print(colored(f"FAIL: No (or foreign) results for {', '.join(failures)}.", "red"))
+    return False
+
+
+def check_matches_recommender(registry, zone_engine):
+    print(colored(f"\n[2] Registry vs. TravelRecommender over the {ZONE} rows only...", "blue"))
+    mismatches = []
+    profiles = [sidebar_profile(t, p, ZONE) for t in ACTIVITY_TYPES for p in PURPOSES]
+    for profile in profiles:
+        expected = zone_engine.recommend(profile)
+        actual = registry.recommend("india", profile)
+        if (expected['id'].tolist() != actual['id'].tolist()
+                or not np.allclose(expected['match_score'], actual['match_score'])):
+            mismatches.append(f"{profile['type']}/{profile['significance']}")
+    if not mismatches:
+        print(colored(f"PASS: Same ids and scores for {len(profiles)} profiles.", "green"))
+        return True
+    print(colored(f"FAIL: Results differ for {', '.join(mismatches)}.", "red"))
+    return False
+
+
+def check_encoder_shared(registry, zone_db):
+    print(colored(f"\n[3] Registering a second ({ZONE}-only) catalog...", "blue"))
+    registry.register("south", zone_db)
+    engines = registry.feature_engines()
+    print(f"   Encoders in use: {engines}")
+    own_encoder = os.path.exists(catalog_registry.encoder_path_for("south"))
+    if len(engines) == 1 and sorted(next(iter(engines.values()))) == ["india", "south"] and not own_encoder:
+        print(colored("PASS: Both catalogs share one encoder; none was fitted for the second.", "green"))
+        return True
+    print(colored("FAIL: The second catalog didn't reuse the loaded encoder.", "red"))
+    return False
+
+
+def run_tests():
+    print(colored("=== VoyageSense Catalog Registry Verification ===", "cyan", attrs=['bold']))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Copies only: the zone-only recommender and any encoder fitted here stay in tmp
+        full_db = os.path.join(tmp, "travel.db")
+        zone_db = os.path.join(tmp, "zone.db")
+        encoder_path = os.path.join(tmp, "feature_encoder.pkl")
+        shutil.copy(recommender.DB_PATH, full_db)
+        shutil.copy(recommender.DB_PATH, zone_db)
+        shutil.copy(ENCODER_PATH, encoder_path)
+        with sqlite3.connect(zone_db) as conn:
+            conn.execute("DELETE FROM destinations WHERE zone IS NOT ?", (ZONE,))
+        catalog_registry.ARTIFACTS_DIR = tmp
+
+        registry = CatalogRegistry()
+        registry.register("india", full_db, encoder_path=encoder_path)
+
+        recommender.DB_PATH = zone_db
+        recommender.INDEX_PATH = os.path.join(tmp, "similarity_index.npz")
+        recommender.SEARCH_INDEX_PATH = os.path.join(tmp, "search_index.npz")
+        zone_engine = recommender.TravelRecommender()
+
+        results = [
+            check_every_zone_routes(registry),
+            check_matches_recommender(registry, zone_engine),
+            check_encoder_shared(registry, zone_db),
+        ]
+
+    print("\n" + "=" * 40)
+    if all(results):
+        print(colored("OVERALL STATUS: REGISTRY OK [OK]", "green", attrs=['bold']))
+    else:
+        print(colored("OVERALL STATUS: REGISTRY FAILURE [X]", "red", attrs=['bold']))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,87 @@
+import os
+import sys
+import shutil
+import tempfile
+
+import numpy as np
+from termcolor import colored
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from src.feature_engine import TravelFeatureEngine, ENCODER_PATH
+from src.vector_store import DestinationVectorStore
+from src.review_store import ReviewStore
+from src.recommender import DB_PATH, read_catalog
+
+N_REVIEWS = 20
+REVIEWS = ["Absolutely stunning, best trip ever!", "Horrible, dirty and overcrowded.",
+           "Loved every minute, so peaceful", "Worst experience, total waste of money"]
+
+
+def run_tests():
+    print(colored("=== VoyageSense Review Stream Verification ===", "cyan", attrs=['bold']))
+    print(colored(f"\n[1] Streaming {N_REVIEWS} single reviews into destinations at the fitted review_count max...", "blue"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "travel.db")
+        encoder_path = os.path.join(tmp, "feature_encoder.pkl")
+        shutil.copy(DB_PATH, db_path)
+        shutil.copy(ENCODER_PATH, encoder_path)
+
+        engine = TravelFeatureEngine()
+        engine.load_encoders(encoder_path)
+        store = DestinationVectorStore(engine)
+        snapshot = store.load(read_catalog(db_path))
+        reviews = ReviewStore(db_path)
+
+        # The rows a new review pushes past the scaler's range first
+        scaler = engine.column_transformer.named_transformers_['num']
+        count_max = scaler.data_max_[engine.numerical_columns.index('review_count')]
+        counts = np.asarray(snapshot.destinations['review_count'])
+        targets = snapshot.destinations.ids[counts >= count_max]
+        print(f"   {len(targets)} destinations already at review_count {count_max:g}")
+
+        failures = []
+        for i in range(N_REVIEWS):
+            destination_id = int(targets[i % len(targets)])
+            reviews.add_review(destination_id, REVIEWS[i % len(REVIEWS)])
+            df = read_catalog(db_path)
+            previous, snapshot = snapshot, store.apply_changes(df)
+            changed = DestinationVectorStore.changed_ids(previous, snapshot).tolist()
+            if snapshot.encoder_version != engine.encoder_version:
+                failures.append(f"review {i + 1}: encoder changed to {snapshot.encoder_version}")
+            if changed != [destination_id]:
+                failures.append(f"review {i + 1}: re-encoded {changed}, expected [{destination_id}]")
+
+            # The true count is stored; only its encoding saturates at the fitted max
+            stored = int(df.loc[df['id'] == destination_id, 'review_count'].iloc[0])
+            exact = int(reviews.aggregates([destination_id])['review_count'].iloc[0])
+            if stored != exact:
+                failures.append(f"review {i + 1}: destinations.review_count {stored}, aggregate {exact}")
+            row = df[df['id'] == destination_id].assign(review_count=count_max)
+            position = snapshot.destinations.position_of([destination_id])[0]
+            if not np.allclose(snapshot.vectors[position], DestinationVectorStore._encode(engine, row)[0]):
+                failures.append(f"review {i + 1}: count {stored} encoded past the fitted range")
+
+        print(f"   Stored counts now up to {int(read_catalog(db_path)['review_count'].max())}, "
+              f"encoded at most as {count_max:g}")
+
+    if failures:
+        for failure in failures:
+            print(colored(f"FAIL: {failure}", "red"))
+    else:
+        print(colored(f"PASS: {N_REVIEWS} reviews stored exactly and patched one row each "
+                      f"under encoder {engine.encoder_version}.", "green"))
+
+    print("\n" + "=" * 40)
+    if not failures:
+        print(colored("OVERALL STATUS: REVIEW STREAM OK [OK]", "green", attrs=['bold']))
+    else:
+        print(colored("OVERALL STATUS: REVIEW STREAM FAILURE [X]", "red", attrs=['bold']))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run_tests()